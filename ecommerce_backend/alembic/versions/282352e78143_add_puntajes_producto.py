@@ -0,0 +1,41 @@
+"""add puntajes_producto ranking table
+
+Revision ID: 282352e78143
+Revises: 7500226847a6
+Create Date: 2026-10-19 19:32:40.105871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '282352e78143'
+down_revision = '7500226847a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('puntajes_producto',
+    sa.Column('producto_id', sa.Integer(), nullable=False),
+    sa.Column('unidades_vendidas', sa.Integer(), nullable=False),
+    sa.Column('tendencia', sa.Float(), nullable=True),
+    sa.Column('suma_puntuaciones', sa.Integer(), nullable=False),
+    sa.Column('cantidad_calificaciones', sa.Integer(), nullable=False),
+    sa.Column('valoracion', sa.Float(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['producto_id'], ['productos.id'], ),
+    sa.PrimaryKeyConstraint('producto_id')
+    )
+    op.create_index(op.f('ix_puntajes_producto_unidades_vendidas'), 'puntajes_producto', ['unidades_vendidas'], unique=False)
+    op.create_index(op.f('ix_puntajes_producto_tendencia'), 'puntajes_producto', ['tendencia'], unique=False)
+    op.create_index(op.f('ix_puntajes_producto_valoracion'), 'puntajes_producto', ['valoracion'], unique=False)
+    # Después de migrar, poblar con: python -m scripts.recalcular_rankings
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_puntajes_producto_valoracion'), table_name='puntajes_producto')
+    op.drop_index(op.f('ix_puntajes_producto_tendencia'), table_name='puntajes_producto')
+    op.drop_index(op.f('ix_puntajes_producto_unidades_vendidas'), table_name='puntajes_producto')
+    op.drop_table('puntajes_producto')
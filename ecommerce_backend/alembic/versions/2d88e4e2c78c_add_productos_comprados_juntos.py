@@ -0,0 +1,44 @@
+"""add productos_comprados_juntos and productos_relacionados
+
+Revision ID: 2d88e4e2c78c
+Revises: 282352e78143
+Create Date: 2026-10-19 19:58:03.772914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d88e4e2c78c'
+down_revision = '282352e78143'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('productos_comprados_juntos',
+    sa.Column('producto_id', sa.Integer(), nullable=False),
+    sa.Column('relacionado_id', sa.Integer(), nullable=False),
+    sa.Column('veces', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['producto_id'], ['productos.id'], ),
+    sa.ForeignKeyConstraint(['relacionado_id'], ['productos.id'], ),
+    sa.PrimaryKeyConstraint('producto_id', 'relacionado_id')
+    )
+    op.create_index('ix_comprados_juntos_producto_veces', 'productos_comprados_juntos', ['producto_id', 'veces'], unique=False)
+    op.create_table('productos_relacionados',
+    sa.Column('producto_id', sa.Integer(), nullable=False),
+    sa.Column('posicion', sa.Integer(), nullable=False),
+    sa.Column('relacionado_id', sa.Integer(), nullable=False),
+    sa.Column('veces', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['producto_id'], ['productos.id'], ),
+    sa.ForeignKeyConstraint(['relacionado_id'], ['productos.id'], ),
+    sa.PrimaryKeyConstraint('producto_id', 'posicion')
+    )
+    # Después de migrar, poblar con: python -m scripts.recalcular_relacionados
+
+
+def downgrade() -> None:
+    op.drop_table('productos_relacionados')
+    op.drop_index('ix_comprados_juntos_producto_veces', table_name='productos_comprados_juntos')
+    op.drop_table('productos_comprados_juntos')
@@ -0,0 +1,37 @@
+"""add ventas_diarias_producto rollup table
+
+Revision ID: 7500226847a6
+Revises: 6a2607415a70
+Create Date: 2026-10-19 19:05:12.418230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7500226847a6'
+down_revision = '6a2607415a70'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('ventas_diarias_producto',
+    sa.Column('vendedor_id', sa.Integer(), nullable=False),
+    sa.Column('producto_id', sa.Integer(), nullable=False),
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('ingresos', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('unidades', sa.Integer(), nullable=False),
+    sa.Column('pedidos', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['producto_id'], ['productos.id'], ),
+    sa.ForeignKeyConstraint(['vendedor_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('vendedor_id', 'producto_id', 'dia')
+    )
+    op.create_index('ix_ventas_diarias_vendedor_dia', 'ventas_diarias_producto', ['vendedor_id', 'dia'], unique=False)
+    # Después de migrar, poblar con: python -m scripts.backfill_ventas
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ventas_diarias_vendedor_dia', table_name='ventas_diarias_producto')
+    op.drop_table('ventas_diarias_producto')
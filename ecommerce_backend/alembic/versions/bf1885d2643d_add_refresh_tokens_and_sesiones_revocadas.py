@@ -0,0 +1,49 @@
+"""add refresh_tokens and sesiones_revocadas
+
+Revision ID: bf1885d2643d
+Revises: 2d88e4e2c78c
+Create Date: 2026-10-19 18:56:16.040802
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bf1885d2643d'
+down_revision = '2d88e4e2c78c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('refresh_tokens',
+    sa.Column('jti', sa.String(length=32), nullable=False),
+    sa.Column('familia', sa.String(length=32), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('usado', sa.Boolean(), nullable=False),
+    sa.Column('expira_en', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index(op.f('ix_refresh_tokens_familia'), 'refresh_tokens', ['familia'], unique=False)
+    op.create_index(op.f('ix_refresh_tokens_usuario_id'), 'refresh_tokens', ['usuario_id'], unique=False)
+    op.create_table('sesiones_revocadas',
+    sa.Column('familia', sa.String(length=32), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('motivo', sa.String(length=20), nullable=False),
+    sa.Column('expira_en', sa.DateTime(), nullable=False),
+    sa.Column('revocada_en', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('familia')
+    )
+    op.create_index(op.f('ix_sesiones_revocadas_revocada_en'), 'sesiones_revocadas', ['revocada_en'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sesiones_revocadas_revocada_en'), table_name='sesiones_revocadas')
+    op.drop_table('sesiones_revocadas')
+    op.drop_index(op.f('ix_refresh_tokens_usuario_id'), table_name='refresh_tokens')
+    op.drop_index(op.f('ix_refresh_tokens_familia'), table_name='refresh_tokens')
+    op.drop_table('refresh_tokens')
@@ -0,0 +1,30 @@
+"""add indices for order exports
+
+Revision ID: c4e8a1d5b7f2
+Revises: bf1885d2643d
+Create Date: 2026-10-19 19:40:12.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8a1d5b7f2'
+down_revision = 'bf1885d2643d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_pedidos_fecha_pedido'), 'pedidos', ['fecha_pedido'], unique=False)
+    op.create_index(op.f('ix_items_pedido_pedido_id'), 'items_pedido', ['pedido_id'], unique=False)
+    op.create_index(op.f('ix_items_pedido_producto_id'), 'items_pedido', ['producto_id'], unique=False)
+    op.create_index(op.f('ix_productos_vendedor_id'), 'productos', ['vendedor_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_productos_vendedor_id'), table_name='productos')
+    op.drop_index(op.f('ix_items_pedido_producto_id'), table_name='items_pedido')
+    op.drop_index(op.f('ix_items_pedido_pedido_id'), table_name='items_pedido')
+    op.drop_index(op.f('ix_pedidos_fecha_pedido'), table_name='pedidos')
@@ -0,0 +1,43 @@
+"""puntajes_producto: one row per product, scores not null
+
+Revision ID: d7f3b9a2c6e1
+Revises: c4e8a1d5b7f2
+Create Date: 2026-10-19 21:05:37.412930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7f3b9a2c6e1'
+down_revision = 'c4e8a1d5b7f2'
+branch_labels = None
+depends_on = None
+
+# Igual que app.models.ranking
+TENDENCIA_SIN_VENTAS = -1e9
+VALORACION_SIN_CALIFICACIONES = 0.0
+
+
+def upgrade() -> None:
+    # Filas para los productos sin ventas ni calificaciones
+    op.execute(
+        "INSERT INTO puntajes_producto "
+        "(producto_id, unidades_vendidas, tendencia, suma_puntuaciones, cantidad_calificaciones, valoracion) "
+        f"SELECT p.id, 0, {TENDENCIA_SIN_VENTAS!r}, 0, 0, {VALORACION_SIN_CALIFICACIONES!r} FROM productos p "
+        "WHERE NOT EXISTS (SELECT 1 FROM puntajes_producto pp WHERE pp.producto_id = p.id)"
+    )
+    op.execute(f"UPDATE puntajes_producto SET tendencia = {TENDENCIA_SIN_VENTAS!r} WHERE tendencia IS NULL")
+    op.execute(f"UPDATE puntajes_producto SET valoracion = {VALORACION_SIN_CALIFICACIONES!r} WHERE valoracion IS NULL")
+    with op.batch_alter_table('puntajes_producto') as batch_op:
+        batch_op.alter_column('tendencia', existing_type=sa.Float(), nullable=False)
+        batch_op.alter_column('valoracion', existing_type=sa.Float(), nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('puntajes_producto') as batch_op:
+        batch_op.alter_column('tendencia', existing_type=sa.Float(), nullable=True)
+        batch_op.alter_column('valoracion', existing_type=sa.Float(), nullable=True)
+    op.execute(f"UPDATE puntajes_producto SET tendencia = NULL WHERE tendencia = {TENDENCIA_SIN_VENTAS!r}")
+    op.execute(f"UPDATE puntajes_producto SET valoracion = NULL WHERE cantidad_calificaciones = 0")
@@ -0,0 +1,60 @@
+"""sesiones_revocadas: increasing id for incremental sync
+
+Revision ID: e2a6c8f4b1d3
+Revises: d7f3b9a2c6e1
+Create Date: 2026-10-19 21:48:12.604517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a6c8f4b1d3'
+down_revision = 'd7f3b9a2c6e1'
+branch_labels = None
+depends_on = None
+
+_COLUMNAS = "familia, usuario_id, motivo, expira_en, revocada_en"
+
+
+def upgrade() -> None:
+    # Cambia la clave primaria: se copia a una tabla nueva (numerada en el orden en que se revocaron)
+    op.create_table('sesiones_revocadas_nueva',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('familia', sa.String(length=32), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('motivo', sa.String(length=20), nullable=False),
+    sa.Column('expira_en', sa.DateTime(), nullable=False),
+    sa.Column('revocada_en', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(
+        f"INSERT INTO sesiones_revocadas_nueva ({_COLUMNAS}) "
+        f"SELECT {_COLUMNAS} FROM sesiones_revocadas ORDER BY revocada_en, familia"
+    )
+    op.drop_index(op.f('ix_sesiones_revocadas_revocada_en'), table_name='sesiones_revocadas')
+    op.drop_table('sesiones_revocadas')
+    op.rename_table('sesiones_revocadas_nueva', 'sesiones_revocadas')
+    op.create_index(op.f('ix_sesiones_revocadas_familia'), 'sesiones_revocadas', ['familia'], unique=True)
+
+
+def downgrade() -> None:
+    op.create_table('sesiones_revocadas_vieja',
+    sa.Column('familia', sa.String(length=32), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('motivo', sa.String(length=20), nullable=False),
+    sa.Column('expira_en', sa.DateTime(), nullable=False),
+    sa.Column('revocada_en', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('familia')
+    )
+    op.execute(
+        f"INSERT INTO sesiones_revocadas_vieja ({_COLUMNAS}) "
+        f"SELECT {_COLUMNAS} FROM sesiones_revocadas"
+    )
+    op.drop_index(op.f('ix_sesiones_revocadas_familia'), table_name='sesiones_revocadas')
+    op.drop_table('sesiones_revocadas')
+    op.rename_table('sesiones_revocadas_vieja', 'sesiones_revocadas')
+    op.create_index(op.f('ix_sesiones_revocadas_revocada_en'), 'sesiones_revocadas', ['revocada_en'], unique=False)
@@ -1,11 +1,15 @@
 from fastapi import APIRouter
 from app.api.api_v1.endpoints import auth, usuarios, productos, conversaciones
-from app.api.api_v1.endpoints import pedidos_router
+from app.api.api_v1.endpoints import pedidos_router, ventas
+from app.api.rutas import asignar_pool
 
 api_router = APIRouter()
 
-api_router.include_router(auth.router, prefix="/auth", tags=["autenticación"])
-api_router.include_router(usuarios.router, prefix="/usuarios", tags=["usuarios"])  # ← CAMBIO: /users → /usuarios
-api_router.include_router(productos.router, prefix="/products", tags=["productos"])
-api_router.include_router(conversaciones.router, prefix="/conversations", tags=["mensajería"])
-api_router.include_router(pedidos_router.router, prefix="", tags=["pedidos"])
\ No newline at end of file
+# Cada router corre sus endpoints sync en su propio pool de hilos (tamaños en
+# THREAD_POOLS); un endpoint puede elegir otro con @en_pool (p. ej. el export)
+api_router.include_router(asignar_pool(auth.router, "auth"), prefix="/auth", tags=["autenticación"])
+api_router.include_router(asignar_pool(usuarios.router, "usuarios"), prefix="/usuarios", tags=["usuarios"])  # ← CAMBIO: /users → /usuarios
+api_router.include_router(asignar_pool(productos.router, "catalogo"), prefix="/products", tags=["productos"])
+api_router.include_router(asignar_pool(conversaciones.router, "mensajeria"), prefix="/conversations", tags=["mensajería"])
+api_router.include_router(asignar_pool(pedidos_router.router, "pedidos"), prefix="", tags=["pedidos"])
+api_router.include_router(asignar_pool(ventas.router, "reportes"), prefix="/ventas", tags=["ventas"])
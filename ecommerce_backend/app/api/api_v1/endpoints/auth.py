@@ -1,19 +1,27 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from pydantic import EmailStr
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.database import get_db
-from app.schemas.auth import RegisterRequest, AuthResponse
+from app.schemas.auth import RegisterRequest, AuthResponse, RefreshRequest, DisponibilidadResponse
 from app.schemas.usuario import UsuarioCreate, UsuarioPublico, Token
-from app.crud.usuario import create_user, authenticate_user
-from app.core.security import create_access_token
+from app.schemas.respuesta import respuesta_json
+from app.crud.usuario import create_user, authenticate_user_async, get_user_by_id
+from app.crud.sesion import crear_sesion, rotar_refresh_token, revocar_sesion
+from app.crud.disponibilidad import username_disponible, email_disponible
+from app.core.security import create_access_token, decode_token, get_password_hash_async
 from app.core.config import settings
+from app.core.rate_limit import verificar_intento_login, registrar_resultado_login
+from app.api.rutas import RutaMedida
 
-router = APIRouter()
+router = APIRouter(route_class=RutaMedida)
 
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-def register_user(
+async def register_user(
     user_data: RegisterRequest,
     db: Session = Depends(get_db)
 ):
@@ -32,24 +40,23 @@ def register_user(
     """
     try:
         # Crear el usuario usando el CRUD
-        user_create = UsuarioCreate(**user_data.dict())
-        new_user = create_user(db=db, user=user_create)
+        user_create = UsuarioCreate(**user_data.model_dump())
+        # bcrypt corre en el pool de contraseñas, no en el threadpool de la API
+        password_hash = await get_password_hash_async(user_create.password)
+        new_user = await run_in_threadpool(create_user, db, user_create, password_hash)
         
-        # Generar token de acceso
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": new_user.username}, 
-            expires_delta=access_token_expires
-        )
+        # Preparar respuesta (antes del commit de la sesión, que expira el objeto)
+        user_public = UsuarioPublico.model_validate(new_user)
         
-        # Preparar respuesta
-        user_public = UsuarioPublico.from_orm(new_user)
+        # Generar token de acceso
+        access_token, refresh_token = await _emitir_tokens(db, new_user)
         
-        return AuthResponse(
-            access_token=access_token,
-            token_type="bearer",
-            user=user_public.dict()
-        )
+        return respuesta_json(AuthResponse, {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "user": user_public,
+            "refresh_token": refresh_token
+        }, status_code=status.HTTP_201_CREATED)
         
     except ValueError as e:
         raise HTTPException(
@@ -62,8 +69,32 @@ def register_user(
             detail="Error interno del servidor"
         )
 
+@router.get("/disponibilidad", response_model=DisponibilidadResponse)
+def verificar_disponibilidad(
+    username: Optional[str] = Query(None, description="Username a verificar"),
+    # Validado y normalizado como en el registro (dominio en minúsculas): 422 si no es un email
+    email: Optional[EmailStr] = Query(None, description="Email a verificar"),
+    db: Session = Depends(get_db)
+):
+    """
+    Indica si un username y/o email están libres (para validar el formulario de registro)
+    
+    Se responde desde memoria; el registro sigue validando contra la base.
+    """
+    if not username and not email:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Indicar username o email"
+        )
+    
+    return DisponibilidadResponse(
+        username=username_disponible(db, username) if username else None,
+        email=email_disponible(db, email) if email else None
+    )
+
 @router.post("/login", response_model=Token)
-def login_user(
+async def login_user(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
@@ -75,8 +106,12 @@ def login_user(
     
     Retorna un token de acceso válido por el tiempo configurado.
     """
+    # Frenar fuerza bruta antes de tocar la base o bcrypt
+    verificar_intento_login(request.client.host if request.client else None, form_data.username)
+    
     # Autenticar usuario (username en OAuth2 es el email en nuestro caso)
-    user = authenticate_user(db, email=form_data.username, password=form_data.password)
+    user = await authenticate_user_async(db, email=form_data.username, password=form_data.password)
+    registrar_resultado_login(form_data.username, exitoso=user is not None)
     
     if not user:
         raise HTTPException(
@@ -91,21 +126,19 @@ def login_user(
             detail="Usuario inactivo"
         )
     
-    # Crear token de acceso
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username},
-        expires_delta=access_token_expires
-    )
+    # Crear token de acceso y de refresco
+    access_token, refresh_token = await _emitir_tokens(db, user)
     
     return Token(
         access_token=access_token,
         token_type="bearer",
-        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60  # en segundos
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,  # en segundos
+        refresh_token=refresh_token
     )
 
 @router.post("/login-simple", response_model=AuthResponse)
-def login_simple(
+async def login_simple(
+    request: Request,
     login_data: dict,
     db: Session = Depends(get_db)
 ):
@@ -124,8 +157,12 @@ def login_simple(
             detail="Email y contraseña son requeridos"
         )
     
+    # Frenar fuerza bruta antes de tocar la base o bcrypt
+    verificar_intento_login(request.client.host if request.client else None, email)
+    
     # Autenticar usuario
-    user = authenticate_user(db, email=email, password=password)
+    user = await authenticate_user_async(db, email=email, password=password)
+    registrar_resultado_login(email, exitoso=user is not None)
     
     if not user:
         raise HTTPException(
@@ -139,18 +176,89 @@ def login_simple(
             detail="Usuario inactivo"
         )
     
-    # Crear token
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username},
-        expires_delta=access_token_expires
+    # Preparar respuesta (antes del commit de la sesión, que expira el objeto)
+    user_public = UsuarioPublico.model_validate(user)
+    
+    # Crear tokens
+    access_token, refresh_token = await _emitir_tokens(db, user)
+    
+    return respuesta_json(AuthResponse, {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "user": user_public,
+        "refresh_token": refresh_token
+    })
+
+@router.post("/refresh", response_model=Token)
+async def refresh_tokens(
+    data: RefreshRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Canjea un refresh token por un access token nuevo (sin contraseña ni bcrypt)
+    
+    El refresh token se rota: el recibido deja de servir y se devuelve otro.
+    Reusar uno ya canjeado cierra la sesión completa.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Refresh token inválido",
+        headers={"WWW-Authenticate": "Bearer"},
     )
+    payload = decode_token(data.refresh_token, credentials_exception, tipo="refresh")
     
-    # Preparar respuesta
-    user_public = UsuarioPublico.from_orm(user)
+    try:
+        usuario_id, refresh_token, familia = await run_in_threadpool(rotar_refresh_token, db, payload)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
-    return AuthResponse(
-        access_token=access_token,
+    user = await run_in_threadpool(get_user_by_id, db, usuario_id)
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Usuario inactivo"
+        )
+    
+    return Token(
+        access_token=_crear_access_token(user.username, familia),
         token_type="bearer",
-        user=user_public.dict()
-    )
\ No newline at end of file
+        expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        refresh_token=refresh_token
+    )
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    data: RefreshRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Cierra la sesión: revoca el refresh token y los access tokens emitidos con él
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Refresh token inválido"
+    )
+    payload = decode_token(data.refresh_token, credentials_exception, tipo="refresh")
+    await run_in_threadpool(revocar_sesion, db, payload)
+
+def _crear_access_token(username: str, familia: str) -> str:
+    """Access token asociado a una familia de sesión (claim "fam") para poder revocarlo"""
+    return create_access_token(
+        data={"sub": username, "fam": familia},
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+
+async def _emitir_tokens(db: Session, user) -> Tuple[str, str]:
+    """
+    Inicia una sesión nueva y retorna (access_token, refresh_token)
+    
+    El commit expira `user`: leer sus atributos después haría una consulta
+    desde el event loop, por eso el username se toma antes.
+    """
+    username = user.username
+    refresh_token, familia = await run_in_threadpool(crear_sesion, db, user.id, username)
+    return _crear_access_token(username, familia), refresh_token
\ No newline at end of file
@@ -3,15 +3,18 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query, Background
 from sqlalchemy.orm import Session
 from app.utils.notifications import enviar_notificacion_mensaje, enviar_notificacion_email_simulado
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.schemas.mensaje import (
     ConversacionCreate,
     ConversacionResponse,
     ConversacionConUsuario,
     MensajeCreate,
     MensajeResponse,
-    MensajeConRemitente
+    MensajeConRemitente,
+    LISTA_CONVERSACIONES,
+    LISTA_MENSAJES
 )
+from app.schemas.respuesta import respuesta_json
 from app.crud.mensaje import (
     get_conversacion_by_id,
     get_conversacion_entre_usuarios,
@@ -26,8 +29,9 @@ from app.crud.mensaje import (
 from app.crud.usuario import get_user_by_id
 from app.api.deps import get_current_active_user
 from app.models.usuario import Usuario
+from app.api.rutas import RutaMedida
 
-router = APIRouter()
+router = APIRouter(route_class=RutaMedida)
 
 @router.post("/", response_model=ConversacionResponse, status_code=status.HTTP_201_CREATED)
 def crear_conversacion(
@@ -71,7 +75,7 @@ def crear_conversacion(
 def listar_conversaciones(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
@@ -101,23 +105,24 @@ def listar_conversaciones(
         # Contar mensajes no leídos
         mensajes_no_leidos = get_mensajes_no_leidos_count(db, conv.id, current_user.id)
         
-        result.append(ConversacionConUsuario(
-            id=conv.id,
-            otro_usuario_id=otro_usuario.id,
-            otro_usuario_username=otro_usuario.username,
-            otro_usuario_nombre=f"{otro_usuario.nombre} {otro_usuario.apellido}",
-            ultimo_mensaje=ultimo_mensaje.contenido[:50] + "..." if ultimo_mensaje and len(ultimo_mensaje.contenido) > 50 else (ultimo_mensaje.contenido if ultimo_mensaje else None),
-            ultimo_mensaje_fecha=ultimo_mensaje.created_at if ultimo_mensaje else None,
-            mensajes_no_leidos=mensajes_no_leidos,
-            created_at=conv.created_at
-        ))
-    
-    return result
+        result.append({
+            "id": conv.id,
+            "otro_usuario_id": otro_usuario.id,
+            "otro_usuario_username": otro_usuario.username,
+            "otro_usuario_nombre": f"{otro_usuario.nombre} {otro_usuario.apellido}",
+            "ultimo_mensaje": ultimo_mensaje.contenido[:50] + "..." if ultimo_mensaje and len(ultimo_mensaje.contenido) > 50 else (ultimo_mensaje.contenido if ultimo_mensaje else None),
+            "ultimo_mensaje_fecha": ultimo_mensaje.created_at if ultimo_mensaje else None,
+            "mensajes_no_leidos": mensajes_no_leidos,
+            "created_at": conv.created_at
+        })
+    
+    # Se valida y serializa una sola vez, con el adaptador precompilado
+    return respuesta_json(LISTA_CONVERSACIONES, result)
 
 @router.get("/{conversacion_id}", response_model=ConversacionResponse)
 def obtener_conversacion(
     conversacion_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
@@ -240,15 +245,16 @@ def listar_mensajes(
         if not remitente:
             continue
         
-        result.append(MensajeConRemitente(
-            id=mensaje.id,
-            conversacion_id=mensaje.conversacion_id,
-            remitente_id=mensaje.remitente_id,
-            remitente_username=remitente.username,
-            remitente_nombre=f"{remitente.nombre} {remitente.apellido}",
-            contenido=mensaje.contenido,
-            created_at=mensaje.created_at,
-            is_read=mensaje.is_read
-        ))
-    
-    return result
\ No newline at end of file
+        result.append({
+            "id": mensaje.id,
+            "conversacion_id": mensaje.conversacion_id,
+            "remitente_id": mensaje.remitente_id,
+            "remitente_username": remitente.username,
+            "remitente_nombre": f"{remitente.nombre} {remitente.apellido}",
+            "contenido": mensaje.contenido,
+            "created_at": mensaje.created_at,
+            "is_read": mensaje.is_read
+        })
+    
+    # Se valida y serializa una sola vez, con el adaptador precompilado
+    return respuesta_json(LISTA_MENSAJES, result)
\ No newline at end of file
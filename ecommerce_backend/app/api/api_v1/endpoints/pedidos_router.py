@@ -1,16 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
-from pydantic import BaseModel
+from typing import Iterator, List, Literal, Optional
+from pydantic import BaseModel, Field
 
+from app import database
 from app.database import get_db
-from app.models.pedido import Pedido, ItemPedido
-from app.models.producto import Producto
-from app.api.deps import get_current_user
+from app.crud.pedido import (
+    create_pedido,
+    get_pedidos_usuario,
+    iterar_items_exportacion,
+    COLUMNAS_EXPORTACION,
+    COLUMNAS_EXPORTACION_VENDEDOR
+)
+from app.core.config import settings
+from app.core.exportacion import MEDIA_TYPES, filas_csv, filas_ndjson
+from app.core.pools import iterar_en_pool
+from app.api.deps import get_current_user, get_current_active_user, es_admin
 from app.models.usuario import Usuario 
+from app.api.rutas import RutaMedida, en_pool
 
-router = APIRouter()
+router = APIRouter(route_class=RutaMedida)
 
 # Esquemas para requests
 class ItemPedidoRequest(BaseModel):
@@ -19,7 +31,7 @@ class ItemPedidoRequest(BaseModel):
     precio_unitario: float
 
 class CrearPedidoRequest(BaseModel):
-    items: List[ItemPedidoRequest]
+    items: List[ItemPedidoRequest] = Field(max_length=settings.PEDIDO_MAX_ITEMS)
 
 @router.post("/orders/")
 async def crear_pedido(
@@ -31,78 +43,21 @@ async def crear_pedido(
     Crear un nuevo pedido con sus items
     """
     try:
-        # Calcular total y validar productos
-        total_pedido = 0
-        items_validados = []
-        
-        for item in pedido_data.items:
-            # Verificar que el producto existe
-            producto = db.query(Producto).filter(Producto.id == item.producto_id).first()
-            if not producto:
-                raise HTTPException(status_code=404, detail=f"Producto {item.producto_id} no encontrado")
-            
-            # Verificar stock
-            if producto.stock < item.cantidad:
-                raise HTTPException(status_code=400, detail=f"Stock insuficiente para {producto.nombre}")
-            
-            total_pedido += item.precio_unitario * item.cantidad
-            items_validados.append({
-                "producto": producto,
-                "cantidad": item.cantidad,
-                "precio_unitario": item.precio_unitario,
-                "subtotal": item.precio_unitario * item.cantidad
-            })
-        
-        # Crear pedido principal
-        nuevo_pedido = Pedido(
-            usuario_id=current_user.id,
-            total=total_pedido,
-            estado="pendiente",
-            direccion_envio="Dirección por defecto",
-            fecha_pedido=datetime.now()
+        # La escritura corre fuera del event loop (puede esperar al group commit)
+        pedido = await run_in_threadpool(
+            create_pedido, db, current_user.id, pedido_data.items
         )
-        db.add(nuevo_pedido)
-        db.flush()  # Para obtener ID
-        
-        # Crear items y actualizar stock
-        items_creados = []
-        for item_data in items_validados:
-            # Crear item del pedido
-            item_pedido = ItemPedido(
-                pedido_id=nuevo_pedido.id,
-                producto_id=item_data["producto"].id,
-                cantidad=item_data["cantidad"],
-                precio_unitario=item_data["precio_unitario"],
-                subtotal=item_data["subtotal"]
-            )
-            db.add(item_pedido)
-            
-            # Reducir stock
-            item_data["producto"].stock -= item_data["cantidad"]
-            
-            items_creados.append({
-                "producto_id": item_data["producto"].id,
-                "nombre": item_data["producto"].nombre,
-                "cantidad": item_data["cantidad"],
-                "precio_unitario": item_data["precio_unitario"],
-                "subtotal": item_data["subtotal"]
-            })
-        
-        db.commit()
         
         return {
             "message": "Pedido creado exitosamente",
-            "pedido_id": nuevo_pedido.id,
-            "total": float(total_pedido),
-            "items": items_creados,
-            "estado": "pendiente"
+            **pedido
         }
         
-    except HTTPException:
-        db.rollback()
-        raise
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 @router.get("/orders/")
@@ -113,7 +68,9 @@ async def obtener_pedidos(
     """
     Obtener pedidos del usuario
     """
-    pedidos = db.query(Pedido).filter(Pedido.usuario_id == current_user.id).all()
+    # La consulta no puede bloquear el event loop: si el pool de conexiones se
+    # agota, esperaría a conexiones que solo liberan otros requests del loop
+    pedidos = await run_in_threadpool(get_pedidos_usuario, db, current_user.id)
     return [
         {
             "id": p.id,
@@ -124,3 +81,67 @@ async def obtener_pedidos(
         }
         for p in pedidos
     ]
+
+@router.get("/orders/export")
+@en_pool("exportes")
+def exportar_pedidos(
+    formato: Literal["ndjson", "csv"] = Query("ndjson"),
+    desde: Optional[date] = Query(None, description="Día inicial de fecha_pedido (inclusive)"),
+    hasta: Optional[date] = Query(None, description="Día final de fecha_pedido (inclusive)"),
+    vendedor_id: Optional[int] = Query(None, description="Solo administradores: items de un vendedor"),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Exporta pedidos con sus items (una fila por item) como NDJSON o CSV
+    
+    Un vendedor exporta los items de sus productos, sin el total de cada
+    pedido (incluiría lo comprado a otros vendedores); un administrador
+    (ADMIN_EMAILS) exporta todo o filtra por vendedor_id. La respuesta se arma
+    a medida que se lee el cursor: la memoria no depende del tamaño del export.
+    """
+    if desde and hasta and desde > hasta:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha 'desde' no puede ser posterior a 'hasta'"
+        )
+    
+    admin = es_admin(current_user)
+    if not admin:
+        if vendedor_id is not None and vendedor_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Solo un administrador puede exportar pedidos de otro vendedor"
+            )
+        vendedor_id = current_user.id
+    
+    nombre = "pedidos" + "".join(f"_{d.isoformat()}" for d in (desde, hasta) if d)
+    return StreamingResponse(
+        iterar_en_pool("exportes", _contenido_exportacion(formato, desde, hasta, vendedor_id, admin)),
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nombre}.{formato}"'}
+    )
+
+def _contenido_exportacion(
+    formato: str,
+    desde: Optional[date],
+    hasta: Optional[date],
+    vendedor_id: Optional[int],
+    incluir_total: bool
+) -> Iterator[bytes]:
+    """
+    Cuerpo del export (se recorre en el pool "exportes")
+    
+    Usa su propia sesión de lectura: la del request puede cerrarse antes de
+    que termine de enviarse la respuesta.
+    """
+    db = database.SessionLectura()
+    try:
+        filas = iterar_items_exportacion(
+            db, desde=desde, hasta=hasta, vendedor_id=vendedor_id, incluir_total=incluir_total
+        )
+        if formato == "csv":
+            yield from filas_csv(filas, COLUMNAS_EXPORTACION if incluir_total else COLUMNAS_EXPORTACION_VENDEDOR)
+        else:
+            yield from filas_ndjson(filas)
+    finally:
+        db.close()
@@ -1,19 +1,29 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.schemas.producto import (
     ProductoCreate,
     ProductoUpdate,
     ProductoResponse,
-    ProductosPaginados
+    ProductoDetalle,
+    ProductosPaginados,
+    PAGINA_PRODUCTOS,
+    LISTA_PRODUCTOS
 )
 from app.schemas.calificacion import (  # ← AGREGAR ESTOS IMPORTS
     CalificacionCreate,
     CalificacionResponse,
     CalificacionConUsuario
 )
+from app.schemas.proyeccion import (
+    parse_fields,
+    modelo_recortado,
+    pagina_recortada,
+    respuesta_parcial
+)
+from app.schemas.respuesta import respuesta_json
 from app.crud.usuario import get_user_by_id
 from app.crud.producto import (
     get_producto_by_id,
@@ -31,10 +41,12 @@ from app.crud.calificacion import (  # ← AGREGAR ESTOS IMPORTS
     get_promedio_calificacion,
     get_calificacion_usuario_producto
 )
+from app.crud.recomendacion import get_productos_relacionados
 from app.api.deps import get_current_active_user
 from app.models.usuario import Usuario
+from app.api.rutas import RutaMedida
 
-router = APIRouter()
+router = APIRouter(route_class=RutaMedida)
 
 @router.post("/", response_model=ProductoResponse, status_code=status.HTTP_201_CREATED)
 def crear_producto(
@@ -65,15 +77,26 @@ def listar_productos(
     categoria: Optional[str] = Query(None, description="Filtrar por categoría"),
     vendedor_id: Optional[int] = Query(None, description="Filtrar por vendedor"),
     search: Optional[str] = Query(None, description="Buscar por nombre o descripción"),
-    db: Session = Depends(get_db)
+    sort: Optional[Literal["trending", "best_selling", "top_rated"]] = Query(
+        None, description="Ordenar por popularidad (por defecto, más recientes)"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Campos a incluir, separados por coma (ej: id,nombre,precio,imagen_url)"
+    ),
+    db: Session = Depends(get_read_db)
 ):
     """
     Lista todos los productos con paginación
+    
+    Con `fields` solo se leen de la base y se serializan las columnas pedidas.
     """
     skip = (page - 1) * page_size
+    campos = parse_fields(fields, ProductoResponse)
     
     if search:
-        productos = search_productos(db, search_term=search, skip=skip, limit=page_size)
+        productos = search_productos(
+            db, search_term=search, skip=skip, limit=page_size, orden=sort, columnas=campos
+        )
         total = len(productos)
     else:
         productos = get_productos(
@@ -82,7 +105,9 @@ def listar_productos(
             limit=page_size,
             categoria=categoria,
             vendedor_id=vendedor_id,
-            activos_solo=True
+            activos_solo=True,
+            orden=sort,
+            columnas=campos
         )
         total = get_productos_count(
             db=db,
@@ -91,37 +116,15 @@ def listar_productos(
             activos_solo=True
         )
     
-    # Transformar productos para incluir información del vendedor
-    productos_transformados = []
-    for producto in productos:
-        vendedor = get_user_by_id(db, producto.vendedor_id)
-        producto_dict = {
-            "id": producto.id,
-            "nombre": producto.nombre,
-            "descripcion": producto.descripcion,
-            "precio": float(producto.precio),
-            "stock": producto.stock,
-            "categoria": producto.categoria,
-            "imagen_url": producto.imagen_url,
-            "vendedor_id": producto.vendedor_id,
-            "vendedor_username": producto.vendedor.username if producto.vendedor else None,
-            "vendedor_nombre": f"{producto.vendedor.nombre} {producto.vendedor.apellido}" if producto.vendedor else None,
-            "is_active": producto.is_active,
-            "created_at": producto.created_at,
-            "updated_at": producto.updated_at
-        }
-        productos_transformados.append(producto_dict)
-    
-    return {
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "productos": productos_transformados
-    }
+    # Los objetos ORM se validan y serializan una sola vez, directo a bytes
+    pagina = {"total": total, "page": page, "page_size": page_size, "productos": productos}
+    if campos:
+        return respuesta_parcial(pagina_recortada(ProductosPaginados, "productos", campos), pagina)
+    return respuesta_json(PAGINA_PRODUCTOS, pagina)
 
 @router.get("/mis-productos", response_model=List[ProductoResponse])
 def listar_mis_productos(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
@@ -132,17 +135,27 @@ def listar_mis_productos(
         vendedor_id=current_user.id,
         activos_solo=True
     )
-    return productos
+    return respuesta_json(LISTA_PRODUCTOS, productos)
 
-@router.get("/{producto_id}", response_model=ProductoResponse)
+@router.get("/{producto_id}", response_model=ProductoDetalle)
 def obtener_producto(
     producto_id: int,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(
+        None, description="Campos a incluir, separados por coma (ej: id,nombre,precio,relacionados)"
+    ),
+    db: Session = Depends(get_read_db)
 ):
     """
-    Obtiene un producto específico por ID con información del vendedor
+    Obtiene un producto específico por ID y los productos comprados
+    frecuentemente junto a él
     """
-    producto = get_producto_by_id(db, producto_id)
+    campos = parse_fields(fields, ProductoDetalle)
+    columnas = None
+    if campos:
+        # is_active siempre se lee para validar la disponibilidad
+        columnas = tuple(c for c in campos if c != "relacionados") + ("is_active",)
+    
+    producto = get_producto_by_id(db, producto_id, columnas=columnas)
     
     if not producto:
         raise HTTPException(
@@ -156,24 +169,14 @@ def obtener_producto(
             detail="Producto no disponible"
         )
     
-    # Agregar información del vendedor
-    vendedor = get_user_by_id(db, producto.vendedor_id)
+    incluidos = campos or tuple(ProductoDetalle.model_fields)
+    datos = {c: getattr(producto, c) for c in incluidos if c != "relacionados"}
+    if "relacionados" in incluidos:
+        datos["relacionados"] = get_productos_relacionados(db, producto_id)
     
-    return {
-        "id": producto.id,
-        "nombre": producto.nombre,
-        "descripcion": producto.descripcion,
-        "precio": float(producto.precio),
-        "stock": producto.stock,
-        "categoria": producto.categoria,
-        "imagen_url": producto.imagen_url,
-        "vendedor_id": producto.vendedor_id,
-        "vendedor_username": vendedor.username if vendedor else None,
-        "vendedor_nombre_completo": f"{vendedor.nombre} {vendedor.apellido}" if vendedor else None,
-        "is_active": producto.is_active,
-        "created_at": producto.created_at,
-        "updated_at": producto.updated_at
-    }
+    if campos:
+        return respuesta_parcial(modelo_recortado(ProductoDetalle, campos), datos)
+    return respuesta_json(ProductoDetalle, datos)
 
 @router.put("/{producto_id}", response_model=ProductoResponse)
 def actualizar_producto(
@@ -265,7 +268,7 @@ def obtener_calificaciones(
     producto_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Obtener todas las calificaciones de un producto"""
     producto = get_producto_by_id(db, producto_id)
@@ -300,7 +303,7 @@ def obtener_calificaciones(
 @router.get("/{producto_id}/reviews/my-review")
 def obtener_mi_calificacion(
     producto_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """Obtener la calificación del usuario actual para este producto"""
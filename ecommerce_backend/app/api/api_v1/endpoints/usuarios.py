@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session, load_only
 from app.api import deps
 from app.schemas.usuario import UsuarioPublico, UsuarioCompleto, UsuarioUpdate
+from app.schemas.proyeccion import parse_fields, modelo_recortado, respuesta_parcial
 from app.models.usuario import Usuario
-from typing import List
+from app.core.cache import invalidar_usuario
+from typing import List, Optional
+from app.api.rutas import RutaMedida
 
-router = APIRouter()
+router = APIRouter(route_class=RutaMedida)
 
 # ⚠️ IMPORTANTE: Los endpoints específicos deben ir ANTES de los dinámicos
 # /me debe ir ANTES de /{username} para que FastAPI no lo confunda
@@ -21,11 +24,15 @@ def get_current_user_profile_legacy(
 
 @router.get("/me", response_model=UsuarioCompleto)
 def get_current_user_profile(
+    fields: Optional[str] = Query(None, description="Campos a incluir, separados por coma"),
     current_user: Usuario = Depends(deps.get_current_user)
 ):
     """
     Obtener perfil completo del usuario autenticado
     """
+    campos = parse_fields(fields, UsuarioCompleto)
+    if campos:
+        return respuesta_parcial(modelo_recortado(UsuarioCompleto, campos), current_user)
     return current_user
 
 @router.put("/me", response_model=UsuarioCompleto)
@@ -40,7 +47,7 @@ def update_current_user_profile(
     """
     try:
         # Obtener solo los campos que se enviaron (exclude_unset=True)
-        update_data = user_update.dict(exclude_unset=True)
+        update_data = user_update.model_dump(exclude_unset=True)
         
         # Actualizar campos del usuario actual
         for field, value in update_data.items():
@@ -49,6 +56,7 @@ def update_current_user_profile(
         
         # Guardar cambios
         db.commit()
+        invalidar_usuario(current_user.username)
         db.refresh(current_user)
         
         return current_user
@@ -64,15 +72,24 @@ def update_current_user_profile(
 @router.get("/{username}", response_model=UsuarioPublico)
 def get_user_by_username(
     username: str,
-    db: Session = Depends(deps.get_db)
+    fields: Optional[str] = Query(None, description="Campos a incluir, separados por coma"),
+    db: Session = Depends(deps.get_read_db)
 ):
     """
     Obtener usuario público por username
     """
-    usuario = db.query(Usuario).filter(Usuario.username == username).first()
+    campos = parse_fields(fields, UsuarioPublico)
+    
+    query = db.query(Usuario)
+    if campos:
+        query = query.options(load_only(*(getattr(Usuario, c) for c in campos)))
+    usuario = query.filter(Usuario.username == username).first()
     if not usuario:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuario no encontrado"
         )
+    
+    if campos:
+        return respuesta_parcial(modelo_recortado(UsuarioPublico, campos), usuario)
     return usuario
\ No newline at end of file
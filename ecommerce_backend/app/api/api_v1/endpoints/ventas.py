@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.schemas.venta import VentasDiariasResponse, VentasPorProductoResponse
+from app.crud.venta import get_ventas_diarias, get_ventas_por_producto
+from app.api.deps import get_current_active_user
+from app.models.usuario import Usuario
+from app.api.rutas import RutaMedida
+
+router = APIRouter(route_class=RutaMedida)
+
+# Rango máximo consultable de una vez (la serie se arma día por día)
+MAX_DIAS_RANGO = 366
+
+def _validar_rango(desde: Optional[date], hasta: Optional[date]):
+    """Completa el rango por defecto (últimos 30 días) y lo valida"""
+    hasta = hasta or date.today()
+    desde = desde or hasta - timedelta(days=29)
+    
+    if desde > hasta:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha 'desde' no puede ser posterior a 'hasta'"
+        )
+    if (hasta - desde).days >= MAX_DIAS_RANGO:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El rango no puede superar {MAX_DIAS_RANGO} días"
+        )
+    return desde, hasta
+
+@router.get("/diarias", response_model=VentasDiariasResponse)
+def ventas_diarias(
+    desde: Optional[date] = Query(None, description="Día inicial (por defecto, hace 30 días)"),
+    hasta: Optional[date] = Query(None, description="Día final (por defecto, hoy)"),
+    producto_id: Optional[int] = Query(None, description="Filtrar por un producto propio"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Serie diaria de ingresos, unidades vendidas y pedidos del vendedor autenticado
+    
+    Se lee del rollup ventas_diarias_producto, sin recorrer el historial de pedidos.
+    """
+    desde, hasta = _validar_rango(desde, hasta)
+    serie = get_ventas_diarias(
+        db,
+        vendedor_id=current_user.id,
+        desde=desde,
+        hasta=hasta,
+        producto_id=producto_id
+    )
+    
+    return {
+        "desde": desde,
+        "hasta": hasta,
+        "producto_id": producto_id,
+        "total_ingresos": round(sum(d["ingresos"] for d in serie), 2),
+        "total_unidades": sum(d["unidades"] for d in serie),
+        "serie": serie
+    }
+
+@router.get("/productos", response_model=VentasPorProductoResponse)
+def ventas_por_producto(
+    desde: Optional[date] = Query(None, description="Día inicial (por defecto, hace 30 días)"),
+    hasta: Optional[date] = Query(None, description="Día final (por defecto, hoy)"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Ventas por producto del vendedor autenticado en el rango indicado
+    """
+    desde, hasta = _validar_rango(desde, hasta)
+    
+    return {
+        "desde": desde,
+        "hasta": hasta,
+        "productos": get_ventas_por_producto(db, current_user.id, desde, hasta)
+    }
@@ -1,10 +1,16 @@
+import hashlib
+import time
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.core.security import verify_token
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.database import get_db, get_read_db
+from app.core.config import settings
+from app.core.security import decode_token
+from app.core.cache import tokens_cache, usuarios_cache
 from app.crud.usuario import get_user_by_username
+from app.crud.sesion import sesion_revocada
 from app.models.usuario import Usuario
 
 # Configurar el esquema de seguridad Bearer
@@ -20,7 +26,7 @@ def get_current_user(
     Esta función:
     1. Extrae el token del header Authorization
     2. Verifica que el token sea válido
-    3. Obtiene el usuario de la base de datos
+    3. Obtiene el usuario (caché en memoria o base de datos)
     4. Retorna el usuario o lanza una excepción
     """
     credentials_exception = HTTPException(
@@ -30,15 +36,51 @@ def get_current_user(
     )
     
     # Verificar el token y obtener el username
-    username = verify_token(credentials.credentials, credentials_exception)
+    payload = _payload_desde_token(credentials.credentials, credentials_exception)
+    username = payload["sub"]
     
-    # Buscar el usuario en la base de datos
-    user = get_user_by_username(db, username=username)
+    # Sesión cerrada (logout o refresh token robado): casi siempre se resuelve en memoria
+    if payload.get("fam") and sesion_revocada(db, payload["fam"]):
+        raise credentials_exception
+    
+    # Buscar el usuario (snapshot en caché o base de datos)
+    user = _cargar_usuario(db, username)
     if user is None:
         raise credentials_exception
         
     return user
 
+def _payload_desde_token(token: str, credentials_exception: HTTPException) -> dict:
+    """Decodifica el token una sola vez y recuerda el resultado hasta que expire"""
+    clave = hashlib.sha256(token.encode()).digest()
+    payload = tokens_cache.get(clave)
+    if payload is None:
+        completo = decode_token(token, credentials_exception)
+        payload = {"sub": completo["sub"], "fam": completo.get("fam")}
+        tokens_cache.set(clave, payload, ttl=completo["exp"] - time.time())
+    return payload
+
+def _cargar_usuario(db: Session, username: str) -> Optional[Usuario]:
+    """
+    Obtiene el usuario desde el snapshot en caché o, si no está, desde la base
+    
+    El snapshot se vuelve a asociar a la sesión del request con merge(load=False),
+    sin consultar la base: el objeto se comporta como uno recién cargado (se puede
+    modificar y confirmar, y sus relaciones se cargan de forma perezosa).
+    """
+    snapshot = usuarios_cache.get(username)
+    if snapshot is not None:
+        user = Usuario(**snapshot)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+    
+    generacion = usuarios_cache.generacion
+    user = get_user_by_username(db, username=username)
+    if user is not None:
+        snapshot = {attr.key: getattr(user, attr.key) for attr in inspect(Usuario).column_attrs}
+        usuarios_cache.set_si_vigente(username, snapshot, generacion)
+    return user
+
 def get_current_active_user(current_user: Usuario = Depends(get_current_user)) -> Usuario:
     """
     Dependencia para obtener el usuario actual activo
@@ -50,6 +92,10 @@ def get_current_active_user(current_user: Usuario = Depends(get_current_user)) -
         )
     return current_user
 
+def es_admin(usuario: Usuario) -> bool:
+    """Indica si el usuario figura en settings.ADMIN_EMAILS"""
+    return usuario.email in settings.ADMIN_EMAILS
+
 # Dependencia opcional para rutas que pueden o no requerir autenticación
 def get_current_user_optional(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -0,0 +1,116 @@
+# app/api/rutas.py
+# Clase de ruta que mide cuánto tarda el endpoint y cuánto la serialización,
+# y que corre los endpoints sync en el pool de hilos asignado
+import functools
+import inspect
+import time
+from typing import Any, Callable
+from fastapi import APIRouter
+from fastapi.routing import APIRoute
+from app.core.config import settings
+from app.core.metricas import tiempos_request
+from app.core.pools import obtener_pool
+
+def _medir_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Envuelve el endpoint para anotar cuándo empieza y termina
+
+    Se conserva la firma (functools.wraps) para que FastAPI resuelva las
+    dependencias igual, y el tipo sync/async para que los endpoints sync
+    sigan corriendo en el threadpool.
+    """
+    if getattr(endpoint, "_medido", False):
+        return endpoint
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def endpoint_medido(*args, **kwargs):
+            tiempos = tiempos_request.get()
+            if tiempos is None:
+                return await endpoint(*args, **kwargs)
+            tiempos.inicio_endpoint = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                tiempos.fin_endpoint = time.perf_counter()
+    else:
+        @functools.wraps(endpoint)
+        def endpoint_medido(*args, **kwargs):
+            tiempos = tiempos_request.get()
+            if tiempos is None:
+                return endpoint(*args, **kwargs)
+            tiempos.inicio_endpoint = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                tiempos.fin_endpoint = time.perf_counter()
+
+    endpoint_medido._medido = True
+    return endpoint_medido
+
+def en_pool(nombre: str) -> Callable:
+    """Decorador: el endpoint sync corre en el pool `nombre` (tiene prioridad sobre el del router)"""
+    def decorador(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        endpoint._pool = nombre
+        return endpoint
+    return decorador
+
+def asignar_pool(router: APIRouter, nombre: str) -> APIRouter:
+    """
+    Asigna el pool `nombre` a los endpoints sync del router que no tengan uno
+
+    Llamar antes de include_router: las rutas incluidas toman el endpoint de
+    estas rutas.
+    """
+    for ruta in router.routes:
+        if isinstance(ruta, APIRoute) and not hasattr(ruta.endpoint, "_pool"):
+            ruta.endpoint._pool = nombre
+            ruta.endpoint = _correr_en_pool(ruta.endpoint)
+    return router
+
+def _correr_en_pool(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Convierte el endpoint sync con _pool en uno async que lo corre en ese pool
+
+    FastAPI ve una corrutina y ya no lo manda al threadpool de Starlette. La
+    firma se conserva igual que en _medir_endpoint.
+    """
+    nombre = getattr(endpoint, "_pool", None)
+    if nombre is None or not settings.THREAD_POOLS_ENABLED or inspect.iscoroutinefunction(endpoint):
+        return endpoint
+    pool = obtener_pool(nombre)
+
+    @functools.wraps(endpoint)
+    async def endpoint_en_pool(*args, **kwargs):
+        return await pool.ejecutar(endpoint, *args, **kwargs)
+
+    return endpoint_en_pool
+
+class RutaMedida(APIRoute):
+    """
+    APIRoute que separa el tiempo del request en dependencias, endpoint y serialización
+
+    Lo que pasa entre que el endpoint devuelve y el handler termina es la
+    validación y serialización de la respuesta (response_model). Los tiempos
+    quedan en el TiemposRequest del request (ver MetricsMiddleware). El
+    tiempo de endpoint se mide dentro del hilo: la espera en la cola del pool
+    no cuenta (está en las métricas del pool).
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, _correr_en_pool(_medir_endpoint(endpoint)), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def handler_medido(request):
+            tiempos = tiempos_request.get()
+            if tiempos is None:
+                return await handler(request)
+            tiempos.inicio_handler = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                tiempos.fin_handler = time.perf_counter()
+
+        return handler_medido
@@ -0,0 +1,134 @@
+# app/core/admision.py
+# Control de admisión por clase de ruta: concurrencia máxima y cola acotada (por proceso)
+import asyncio
+import math
+from collections import deque
+from typing import Deque, Dict, Optional
+from .config import settings
+
+# Motivos de rechazo (etiqueta "reason" en /metrics)
+COLA_LLENA = "queue_full"
+ESPERA_ESTIMADA = "deadline"
+ESPERA_VENCIDA = "timeout"
+
+class ClaseAdmision:
+    """
+    Semáforo con cola FIFO acotada y plazo de espera, para un solo event loop
+
+    Un request entra si hay lugar; si no, espera en la cola. Se rechaza sin
+    esperar si la cola está llena o si la espera estimada (posición en la cola
+    × duración media / límite) supera el plazo: no tiene sentido hacer esperar
+    a alguien que igual va a vencer. Si aun así el plazo vence en la cola, se
+    rechaza en ese momento.
+
+    La duración media es un promedio exponencial de lo que tardan los
+    requests admitidos.
+    """
+
+    def __init__(self, nombre: str, limite: int, max_cola: int, espera_max: float):
+        self.nombre = nombre
+        self.limite = max(limite, 1)
+        self.max_cola = max(max_cola, 0)
+        self.espera_max = espera_max
+        self.en_curso = 0
+        self.duracion_media: Optional[float] = None
+        self.admitidos = 0
+        self.espera_total = 0.0
+        self.rechazos: Dict[str, int] = {COLA_LLENA: 0, ESPERA_ESTIMADA: 0, ESPERA_VENCIDA: 0}
+        self._cola: Deque[asyncio.Future] = deque()
+
+    @property
+    def en_cola(self) -> int:
+        return len(self._cola)
+
+    def espera_estimada(self, posicion: int) -> float:
+        if self.duracion_media is None:
+            return 0.0
+        return posicion * self.duracion_media / self.limite
+
+    def reintentar_en(self) -> int:
+        """Segundos sugeridos para el header Retry-After"""
+        return max(1, math.ceil(self.espera_estimada(len(self._cola) + 1)))
+
+    async def entrar(self) -> Optional[str]:
+        """None si el request fue admitido (llamar a salir al terminar); si no, el motivo del rechazo"""
+        if self.en_curso < self.limite and not self._cola:
+            self.en_curso += 1
+            self.admitidos += 1
+            return None
+
+        if len(self._cola) >= self.max_cola:
+            self.rechazos[COLA_LLENA] += 1
+            return COLA_LLENA
+        if self.espera_estimada(len(self._cola) + 1) > self.espera_max:
+            self.rechazos[ESPERA_ESTIMADA] += 1
+            return ESPERA_ESTIMADA
+
+        loop = asyncio.get_running_loop()
+        turno = loop.create_future()
+        self._cola.append(turno)
+        inicio = loop.time()
+        try:
+            await asyncio.wait_for(asyncio.shield(turno), self.espera_max)
+        except asyncio.TimeoutError:
+            if turno.done() and not turno.cancelled():
+                # El lugar llegó justo al vencer el plazo: se usa
+                pass
+            else:
+                turno.cancel()
+                self._quitar(turno)
+                self.rechazos[ESPERA_VENCIDA] += 1
+                return ESPERA_VENCIDA
+        except asyncio.CancelledError:
+            # Cliente desconectado mientras esperaba: si ya se le había pasado el lugar, se libera
+            if turno.done() and not turno.cancelled():
+                self.salir(None)
+            else:
+                turno.cancel()
+                self._quitar(turno)
+            raise
+        self.espera_total += loop.time() - inicio
+        self.admitidos += 1
+        return None
+
+    def salir(self, duracion: Optional[float]) -> None:
+        """Libera el lugar (o se lo pasa al primero de la cola)"""
+        if duracion is not None:
+            self.duracion_media = duracion if self.duracion_media is None else (
+                0.9 * self.duracion_media + 0.1 * duracion
+            )
+        while self._cola:
+            turno = self._cola.popleft()
+            if not turno.done():
+                turno.set_result(None)  # El lugar pasa directo: en_curso no cambia
+                return
+        self.en_curso -= 1
+
+    def _quitar(self, turno: asyncio.Future) -> None:
+        try:
+            self._cola.remove(turno)
+        except ValueError:
+            pass
+
+def crear_clases() -> Dict[str, ClaseAdmision]:
+    """Una clase por tipo de carga, con los límites de la configuración"""
+    return {
+        "auth": ClaseAdmision(
+            "auth", settings.ADMISSION_AUTH_LIMIT,
+            settings.ADMISSION_AUTH_QUEUE, settings.ADMISSION_AUTH_MAX_WAIT_SECONDS
+        ),
+        "catalogo": ClaseAdmision(
+            "catalogo", settings.ADMISSION_CATALOG_LIMIT,
+            settings.ADMISSION_CATALOG_QUEUE, settings.ADMISSION_CATALOG_MAX_WAIT_SECONDS
+        ),
+        "mensajeria": ClaseAdmision(
+            "mensajeria", settings.ADMISSION_MESSAGING_LIMIT,
+            settings.ADMISSION_MESSAGING_QUEUE, settings.ADMISSION_MESSAGING_MAX_WAIT_SECONDS
+        ),
+        "checkout": ClaseAdmision(
+            "checkout", settings.ADMISSION_CHECKOUT_LIMIT,
+            settings.ADMISSION_CHECKOUT_QUEUE, settings.ADMISSION_CHECKOUT_MAX_WAIT_SECONDS
+        ),
+    }
+
+clases_admision = crear_clases()
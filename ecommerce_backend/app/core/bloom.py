@@ -0,0 +1,52 @@
+# app/core/bloom.py
+# Filtro de Bloom en memoria: "seguro que no está" sin consultar la base
+import hashlib
+import math
+import threading
+from typing import Iterable
+
+class BloomFilter:
+    """
+    Conjunto probabilístico sin falsos negativos
+
+    Si `x in filtro` es False, x nunca se agregó. Si es True, x probablemente
+    se agregó (con una tasa de falsos positivos cercana a `tasa_error` mientras
+    no se superen `capacidad` elementos). No admite borrar: se reconstruye.
+    """
+
+    def __init__(self, capacidad: int, tasa_error: float = 0.01):
+        capacidad = max(capacidad, 1)
+        self.capacidad = capacidad
+        self.tasa_error = tasa_error
+        self.bits = max(int(-capacidad * math.log(tasa_error) / (math.log(2) ** 2)), 8)
+        self.hashes = max(int(round(self.bits / capacidad * math.log(2))), 1)
+        self.elementos = 0
+        self._tabla = bytearray((self.bits + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _posiciones(self, valor: str):
+        # Doble hashing (Kirsch-Mitzenmacher) a partir de un solo blake2b
+        digest = hashlib.blake2b(valor.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, valor: str) -> None:
+        posiciones = self._posiciones(valor)
+        with self._lock:
+            for posicion in posiciones:
+                self._tabla[posicion >> 3] |= 1 << (posicion & 7)
+            self.elementos += 1
+
+    def update(self, valores: Iterable[str]) -> None:
+        for valor in valores:
+            self.add(valor)
+
+    def __contains__(self, valor: str) -> bool:
+        tabla = self._tabla
+        return all(tabla[p >> 3] & (1 << (p & 7)) for p in self._posiciones(valor))
+
+    @property
+    def saturado(self) -> bool:
+        """True si ya tiene más elementos que los previstos (conviene reconstruirlo)"""
+        return self.elementos > self.capacidad
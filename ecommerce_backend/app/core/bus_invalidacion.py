@@ -0,0 +1,276 @@
+# app/core/bus_invalidacion.py
+# Bus local de invalidaciones entre workers (sockets Unix de datagramas, sin servicios externos)
+import hashlib
+import json
+import logging
+import os
+import queue
+import socket
+import stat
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .config import settings
+
+logger = logging.getLogger("app.bus")
+
+_SUFIJO = ".sock"
+_MAX_LOTE = 200  # Eventos por datagrama (~15 KB)
+_MAX_DATAGRAMA = 65536
+# Credenciales del emisor de cada datagrama (Linux: struct ucred = pid, uid, gid)
+_UCRED = struct.Struct("iII")
+_CON_CREDENCIALES = hasattr(socket, "SO_PASSCRED") and hasattr(socket, "SCM_CREDENTIALS")
+
+class BusInvalidacion:
+    """
+    Difunde eventos (entidad, id, versión) a todos los workers de la máquina
+
+    Cada worker escucha en un socket Unix de datagramas propio,
+    <directorio>/<pid>.sock. publicar aplica el evento en el proceso y lo
+    encola; un hilo lo manda, agrupado con los demás pendientes en un solo
+    datagrama, a cada socket del directorio. Así la escritura que publica no
+    espera a los otros workers. Los sockets de workers muertos se borran al
+    primer envío fallido. Mientras el bus no se inicia (scripts, tests, un
+    solo proceso) publicar solo aplica el evento en el proceso actual.
+
+    Solo el usuario del proceso puede mandar eventos: el directorio tiene que
+    ser suyo con modo 0700, los sockets son 0600 y, en Linux, se descartan los
+    datagramas cuyo emisor (SCM_CREDENTIALS) sea otro usuario.
+
+    La versión es time.time_ns() de quien publica (el mismo reloj para todos
+    los workers de la máquina) y se publica después del commit: un evento con
+    versión menor o igual a la última aplicada para esa entidad ya está
+    cubierto y se descarta.
+    """
+
+    def __init__(self, max_versiones: int = 100000, espera_envio: float = 0.25):
+        self.max_versiones = max_versiones
+        self.espera_envio = espera_envio  # Máximo que se espera a un worker con la cola llena
+        self.directorio: Optional[str] = None
+        self.publicados = 0
+        self.recibidos = 0
+        self.descartados = 0  # Duplicados o con versión vieja
+        self.perdidos = 0  # No se pudieron entregar (worker que no drena su cola a tiempo)
+        self.rechazados = 0  # Datagramas de otro usuario (o sin credenciales)
+        self._handlers: Dict[str, List[Callable[[Any], None]]] = {}
+        self._versiones: "OrderedDict[Tuple[str, Any], int]" = OrderedDict()
+        self._ultima_version = 0
+        self._lock = threading.Lock()
+        self._socket: Optional[socket.socket] = None
+        self._envio: Optional[socket.socket] = None
+        self._ruta: Optional[str] = None
+        self._hilo: Optional[threading.Thread] = None
+        self._hilo_envio: Optional[threading.Thread] = None
+        self._pendientes: "queue.SimpleQueue[Optional[dict]]" = queue.SimpleQueue()
+
+    @property
+    def activo(self) -> bool:
+        return self._socket is not None
+
+    def suscribir(self, entidad: str, handler: Callable[[Any], None]) -> None:
+        """Registra la invalidación local de una entidad (recibe el id)"""
+        self._handlers.setdefault(entidad, []).append(handler)
+
+    def publicar(self, entidad: str, id_entidad: Any) -> int:
+        """Aplica el evento en este proceso y lo difunde al resto; retorna la versión"""
+        with self._lock:
+            version = max(time.time_ns(), self._ultima_version + 1)
+            self._ultima_version = version
+            self.publicados += 1
+        self._aplicar(entidad, id_entidad, version)
+        if self._envio is not None:
+            self._pendientes.put({"e": entidad, "id": id_entidad, "v": version})
+        return version
+
+    def _aplicar(self, entidad: str, id_entidad: Any, version: int) -> bool:
+        clave = (entidad, id_entidad)
+        with self._lock:
+            if self._versiones.get(clave, 0) >= version:
+                self.descartados += 1
+                return False
+            self._versiones[clave] = version
+            self._versiones.move_to_end(clave)
+            while len(self._versiones) > self.max_versiones:
+                self._versiones.popitem(last=False)
+        for handler in self._handlers.get(entidad, ()):
+            try:
+                handler(id_entidad)
+            except Exception:
+                logger.exception("Falló la invalidación", extra={"entidad": entidad})
+        return True
+
+    def _enviar_pendientes(self, envio: socket.socket) -> None:
+        while True:
+            evento = self._pendientes.get()
+            if evento is None:
+                return
+            lote = [evento]
+            while len(lote) < _MAX_LOTE:
+                try:
+                    siguiente = self._pendientes.get_nowait()
+                except queue.Empty:
+                    break
+                if siguiente is None:
+                    self._difundir(envio, lote)
+                    return
+                lote.append(siguiente)
+            self._difundir(envio, lote)
+
+    def _difundir(self, envio: socket.socket, lote: List[dict]) -> None:
+        datos = json.dumps({"pid": os.getpid(), "eventos": lote}, separators=(",", ":")).encode("utf-8")
+        try:
+            nombres = os.listdir(self.directorio)
+        except OSError:
+            return
+        for nombre in nombres:
+            ruta = os.path.join(self.directorio, nombre)
+            if not nombre.endswith(_SUFIJO) or ruta == self._ruta:
+                continue
+            try:
+                envio.sendto(datos, ruta)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Worker que ya no existe: nadie escucha en ese socket
+                try:
+                    os.unlink(ruta)
+                except OSError:
+                    pass
+            except OSError:
+                # Cola del receptor llena durante espera_envio (worker colgado o muy atrasado)
+                with self._lock:
+                    self.perdidos += len(lote)
+
+    def _recibir(self, sock: socket.socket) -> Optional[bytes]:
+        """Siguiente datagrama; None si lo mandó otro usuario"""
+        if not _CON_CREDENCIALES:
+            return sock.recv(_MAX_DATAGRAMA)
+        datos, auxiliares, _, _ = sock.recvmsg(_MAX_DATAGRAMA, socket.CMSG_SPACE(_UCRED.size))
+        for nivel, tipo, valor in auxiliares:
+            if nivel == socket.SOL_SOCKET and tipo == socket.SCM_CREDENTIALS and len(valor) >= _UCRED.size:
+                _, uid, _ = _UCRED.unpack(valor[:_UCRED.size])
+                if uid == os.getuid():
+                    return datos
+        with self._lock:
+            self.rechazados += 1
+        return None
+
+    def _escuchar(self, sock: socket.socket) -> None:
+        while self._socket is sock:
+            try:
+                datos = self._recibir(sock)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if datos is None:
+                continue
+            try:
+                for evento in json.loads(datos)["eventos"]:
+                    id_entidad = evento["id"]
+                    with self._lock:
+                        self.recibidos += 1
+                    self._aplicar(evento["e"], tuple(id_entidad) if isinstance(id_entidad, list) else id_entidad,
+                                  int(evento["v"]))
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Evento de invalidación inválido", extra={"datos": datos[:200].decode("latin-1")})
+
+    def iniciar(self, directorio: Optional[str] = None) -> bool:
+        """Abre el socket de este worker y el hilo que recibe; False si la plataforma no lo soporta"""
+        if self.activo:
+            return True
+        if not hasattr(socket, "AF_UNIX"):
+            logger.warning("Bus de invalidación deshabilitado: la plataforma no tiene sockets Unix")
+            return False
+
+        self.directorio = directorio or directorio_por_defecto()
+        os.makedirs(self.directorio, mode=0o700, exist_ok=True)
+        problema = _verificar_directorio(self.directorio)
+        if problema is not None:
+            # Otro usuario podría mandar invalidaciones o reemplazar los sockets
+            logger.error(
+                "Bus de invalidación deshabilitado: directorio inseguro",
+                extra={"directorio": self.directorio, "motivo": problema}
+            )
+            self.directorio = None
+            return False
+        self._ruta = os.path.join(self.directorio, f"{os.getpid()}{_SUFIJO}")
+        if os.path.exists(self._ruta):
+            os.unlink(self._ruta)  # De un proceso anterior con el mismo pid
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        if _CON_CREDENCIALES:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_PASSCRED, 1)
+        sock.bind(self._ruta)
+        os.chmod(self._ruta, 0o600)
+        sock.settimeout(1.0)  # Para notar detener() sin depender de cerrar el socket
+        envio = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        envio.settimeout(self.espera_envio)
+
+        self._socket = sock
+        self._envio = envio
+        self._hilo = threading.Thread(target=self._escuchar, args=(sock,), name="bus-invalidacion", daemon=True)
+        self._hilo.start()
+        self._hilo_envio = threading.Thread(
+            target=self._enviar_pendientes, args=(envio,), name="bus-invalidacion-envio", daemon=True
+        )
+        self._hilo_envio.start()
+        logger.info("Bus de invalidación iniciado", extra={"socket": self._ruta})
+        return True
+
+    def detener(self) -> None:
+        sock, envio, hilo, hilo_envio = self._socket, self._envio, self._hilo, self._hilo_envio
+        if sock is None:
+            return
+        # Se manda lo que quedaba encolado antes de cerrar
+        self._pendientes.put(None)
+        hilo_envio.join(timeout=2.0)
+        self._socket = self._envio = self._hilo = self._hilo_envio = None
+        hilo.join(timeout=2.0)
+        sock.close()
+        envio.close()
+        try:
+            os.unlink(self._ruta)
+        except OSError:
+            pass
+
+    def pares(self) -> int:
+        """Sockets de otros workers en el directorio"""
+        if self.directorio is None:
+            return 0
+        try:
+            return sum(1 for n in os.listdir(self.directorio)
+                       if n.endswith(_SUFIJO) and os.path.join(self.directorio, n) != self._ruta)
+        except OSError:
+            return 0
+
+def directorio_por_defecto() -> str:
+    """
+    Un directorio por base de datos: los workers de un mismo despliegue lo comparten
+
+    Va en XDG_RUNTIME_DIR (privado del usuario) si está definido; si no, en
+    el directorio temporal, donde iniciar verifica que sea propio y 0700.
+    """
+    if settings.INVALIDATION_BUS_DIR:
+        return settings.INVALIDATION_BUS_DIR
+    huella = hashlib.sha1(settings.DATABASE_URL.encode()).hexdigest()[:12]
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(base, f"ecommerce-bus-{huella}")
+
+def _verificar_directorio(directorio: str) -> Optional[str]:
+    """None si el directorio es del usuario del proceso y nadie más puede usarlo; si no, el motivo"""
+    try:
+        info = os.lstat(directorio)
+    except OSError as e:
+        return str(e)
+    if not stat.S_ISDIR(info.st_mode):
+        return "no es un directorio"
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        return f"pertenece al uid {info.st_uid}"
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        return f"modo {stat.S_IMODE(info.st_mode):o} (se espera 700)"
+    return None
+
+bus_invalidacion = BusInvalidacion()
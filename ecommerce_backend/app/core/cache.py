@@ -0,0 +1,97 @@
+# app/core/cache.py
+# Caché en memoria con TTL y tamaño acotado (por proceso)
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from .config import settings
+from .bus_invalidacion import bus_invalidacion
+
+class TTLCache:
+    """
+    Caché LRU con vencimiento por entrada, segura entre hilos
+
+    `generacion` se incrementa en cada invalidación: quien lee de la base antes
+    de una invalidación no puede guardar después un valor ya desactualizado
+    (ver set_si_vigente).
+    """
+
+    def __init__(self, max_entradas: int, ttl: float):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.generacion = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def habilitada(self) -> bool:
+        return self.max_entradas > 0 and self.ttl > 0
+
+    def get(self, clave: Hashable) -> Optional[Any]:
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            valor, vence = entrada
+            if vence <= time.monotonic():
+                del self._datos[clave]
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def set(self, clave: Hashable, valor: Any, ttl: Optional[float] = None) -> None:
+        if not self.habilitada:
+            return
+        with self._lock:
+            self._guardar(clave, valor, ttl)
+
+    def set_si_vigente(self, clave: Hashable, valor: Any, generacion: int, ttl: Optional[float] = None) -> None:
+        """Guarda el valor solo si no hubo invalidaciones desde que se leyó `generacion`"""
+        if not self.habilitada:
+            return
+        with self._lock:
+            if generacion == self.generacion:
+                self._guardar(clave, valor, ttl)
+
+    def _guardar(self, clave: Hashable, valor: Any, ttl: Optional[float]) -> None:
+        duracion = self.ttl if ttl is None else min(ttl, self.ttl)
+        if duracion <= 0:
+            return
+        self._datos[clave] = (valor, time.monotonic() + duracion)
+        self._datos.move_to_end(clave)
+        while len(self._datos) > self.max_entradas:
+            self._datos.popitem(last=False)
+
+    def invalidar(self, clave: Hashable) -> None:
+        with self._lock:
+            self.generacion += 1
+            self._datos.pop(clave, None)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self.generacion += 1
+            self._datos.clear()
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+# Tokens ya decodificados (sha256 del token -> sub y fam) y snapshots de usuarios
+# (username -> dict de columnas). Ver api/deps.get_current_user.
+tokens_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+usuarios_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+def invalidar_usuario(username: str) -> None:
+    """
+    Descarta el snapshot de un usuario (al modificarlo o desactivarlo)
+
+    Se publica en el bus: el resto de los workers descarta su snapshot y el
+    perfil público cacheado (ver cache_respuestas).
+    """
+    bus_invalidacion.publicar("usuario", username)
+
+bus_invalidacion.suscribir("usuario", usuarios_cache.invalidar)
@@ -0,0 +1,186 @@
+# app/core/cache_respuestas.py
+# Caché de respuestas públicas (GET anónimos) con stale-while-revalidate (por proceso)
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .bus_invalidacion import bus_invalidacion
+from .config import settings
+
+FRESCA = "HIT"
+VENCIDA = "STALE"
+
+class EntradaRespuesta:
+    """Respuesta ya serializada (y opcionalmente comprimida con gzip)"""
+    __slots__ = ("cuerpo", "gzip", "headers", "ruta", "etiquetas", "creada", "fresca_hasta", "vence")
+
+    def __init__(self, cuerpo: bytes, headers: List[Tuple[bytes, bytes]], ruta, etiquetas: Tuple[str, ...],
+                 ttl: float, stale: float, gzip: Optional[bytes] = None):
+        ahora = time.monotonic()
+        self.cuerpo = cuerpo
+        self.gzip = gzip
+        self.headers = headers
+        self.ruta = ruta  # scope["route"] del request original, para las métricas de los aciertos
+        self.etiquetas = etiquetas
+        self.creada = ahora
+        self.fresca_hasta = ahora + ttl
+        self.vence = ahora + ttl + stale
+
+    @property
+    def tamano(self) -> int:
+        return len(self.cuerpo) + len(self.gzip or b"")
+
+class CacheRespuestas:
+    """
+    Caché LRU de respuestas, acotada en entradas y en bytes, segura entre hilos
+
+    Cada entrada tiene etiquetas ("producto:12", "productos", ...) que las
+    escrituras usan para invalidarla (ver invalidar_*). Cada etiqueta lleva una
+    generación: una respuesta calculada antes de una invalidación no se guarda
+    si llega después (ver generaciones/guardar).
+
+    Pasado el TTL la entrada sigue sirviéndose como vencida durante
+    RESPONSE_CACHE_STALE_SECONDS mientras se refresca en segundo plano; una
+    invalidación, en cambio, la descarta del todo.
+    """
+
+    def __init__(self, max_entradas: int, max_bytes: int, ttl: float, stale: float):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale = stale
+        self.aciertos = 0
+        self.vencidas = 0
+        self.fallos = 0
+        self.refrescos = 0
+        self.invalidaciones = 0
+        self.bytes = 0
+        self._datos: "OrderedDict[str, EntradaRespuesta]" = OrderedDict()
+        self._por_etiqueta: Dict[str, Set[str]] = {}
+        self._generaciones: Dict[str, int] = {}
+        self._refrescando: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def habilitada(self) -> bool:
+        return self.max_entradas > 0 and self.ttl > 0
+
+    def obtener(self, clave: str) -> Tuple[Optional[EntradaRespuesta], Optional[str]]:
+        """Retorna (entrada, FRESCA | VENCIDA) o (None, None) si no hay o ya venció del todo"""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            ahora = time.monotonic()
+            if entrada is None or entrada.vence <= ahora:
+                if entrada is not None:
+                    self._quitar(clave)
+                self.fallos += 1
+                return None, None
+            self._datos.move_to_end(clave)
+            if entrada.fresca_hasta > ahora:
+                self.aciertos += 1
+                return entrada, FRESCA
+            self.vencidas += 1
+            return entrada, VENCIDA
+
+    def generaciones(self, etiquetas: Iterable[str]) -> Tuple[int, ...]:
+        """Generación actual de cada etiqueta (leerla antes de calcular la respuesta)"""
+        with self._lock:
+            return tuple(self._generaciones.get(e, 0) for e in etiquetas)
+
+    def guardar(self, clave: str, entrada: EntradaRespuesta, generaciones: Tuple[int, ...]) -> bool:
+        """Guarda la entrada si ninguna de sus etiquetas se invalidó desde `generaciones`"""
+        if not self.habilitada or entrada.tamano > self.max_bytes:
+            return False
+        with self._lock:
+            actuales = tuple(self._generaciones.get(e, 0) for e in entrada.etiquetas)
+            if actuales != generaciones:
+                return False
+            if clave in self._datos:
+                self._quitar(clave)
+            self._datos[clave] = entrada
+            self.bytes += entrada.tamano
+            for etiqueta in entrada.etiquetas:
+                self._por_etiqueta.setdefault(etiqueta, set()).add(clave)
+            while self._datos and (len(self._datos) > self.max_entradas or self.bytes > self.max_bytes):
+                self._quitar(next(iter(self._datos)))
+            return True
+
+    def marcar_refresco(self, clave: str) -> bool:
+        """True si el llamador debe refrescar la clave (nadie más lo está haciendo)"""
+        with self._lock:
+            if clave in self._refrescando:
+                return False
+            self._refrescando.add(clave)
+            self.refrescos += 1
+            return True
+
+    def fin_refresco(self, clave: str) -> None:
+        with self._lock:
+            self._refrescando.discard(clave)
+
+    def descartar(self, clave: str) -> None:
+        """Quita una entrada puntual (p. ej. si el refresco ya no devuelve 200)"""
+        with self._lock:
+            if clave in self._datos:
+                self._quitar(clave)
+
+    def invalidar(self, *etiquetas: str) -> None:
+        with self._lock:
+            for etiqueta in etiquetas:
+                self._generaciones[etiqueta] = self._generaciones.get(etiqueta, 0) + 1
+                for clave in list(self._por_etiqueta.get(etiqueta, ())):
+                    self._quitar(clave)
+                    self.invalidaciones += 1
+
+    def limpiar(self) -> None:
+        with self._lock:
+            for etiqueta in list(self._por_etiqueta):
+                self._generaciones[etiqueta] = self._generaciones.get(etiqueta, 0) + 1
+            self._datos.clear()
+            self._por_etiqueta.clear()
+            self.bytes = 0
+
+    def _quitar(self, clave: str) -> None:
+        entrada = self._datos.pop(clave)
+        self.bytes -= entrada.tamano
+        for etiqueta in entrada.etiquetas:
+            claves = self._por_etiqueta.get(etiqueta)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._por_etiqueta[etiqueta]
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+cache_respuestas = CacheRespuestas(
+    settings.RESPONSE_CACHE_MAX_ENTRIES if settings.RESPONSE_CACHE_ENABLED else 0,
+    settings.RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+    settings.RESPONSE_CACHE_TTL_SECONDS,
+    settings.RESPONSE_CACHE_STALE_SECONDS,
+)
+
+# --- Invalidación (llamar después del commit) ---
+# Se publica en el bus para que los demás workers también descarten sus copias.
+# Los resúmenes de "relacionados" y los nombres de quienes calificaron no se
+# rastrean: se actualizan al vencer el TTL.
+
+def invalidar_producto(producto_id: int) -> None:
+    """Detalle del producto y páginas del listado"""
+    bus_invalidacion.publicar("producto", producto_id)
+
+def invalidar_calificaciones(producto_id: int) -> None:
+    """Calificaciones del producto, su detalle y el listado (orden top_rated)"""
+    bus_invalidacion.publicar("calificaciones", producto_id)
+
+bus_invalidacion.suscribir(
+    "producto", lambda producto_id: cache_respuestas.invalidar(f"producto:{producto_id}", "productos")
+)
+bus_invalidacion.suscribir(
+    "calificaciones",
+    lambda producto_id: cache_respuestas.invalidar(
+        f"calificaciones:{producto_id}", f"producto:{producto_id}", "productos"
+    )
+)
+# Perfil público (ver cache.invalidar_usuario)
+bus_invalidacion.suscribir("usuario", lambda username: cache_respuestas.invalidar(f"usuario:{username}"))
@@ -1,5 +1,5 @@
-from pydantic_settings import BaseSettings
-from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "E-commerce API"
@@ -9,10 +9,133 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./ecommerce.db"  # Por defecto SQLite para desarrollo
     
+    # Lecturas (GET): engine y pool propios, separados de las escrituras
+    READ_ENGINE_ENABLED: bool = True
+    DATABASE_READ_URL: Optional[str] = None  # Réplica de lectura; sin ella, el mismo archivo SQLite en solo lectura
+    READ_POOL_SIZE: int = 10
+    READ_POOL_MAX_OVERFLOW: int = 20
+    
+    # Perfil de rendimiento de SQLite (PRAGMAs aplicados a cada conexión nueva)
+    SQLITE_PERFORMANCE_PROFILE: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL: los lectores no bloquean al escritor
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Con WAL, NORMAL no arriesga corrupción (solo el último commit ante un corte de luz)
+    # La caché de páginas es de cada conexión: el peor caso por worker es
+    # SQLITE_CACHE_SIZE_KB × conexiones abiertas (pool de escritura + READ_POOL_SIZE
+    # + READ_POOL_MAX_OVERFLOW, ~46 por defecto → ~184 MB con 4 MB). El mmap, en
+    # cambio, son las páginas del archivo en la caché del sistema operativo,
+    # compartidas por todas las conexiones y workers: las lecturas van por ahí.
+    SQLITE_CACHE_SIZE_KB: int = 4096
+    SQLITE_MMAP_SIZE_MB: int = 256
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_FOREIGN_KEYS: bool = True
+    SQLITE_OPTIMIZE_INTERVAL_SECONDS: float = 3600.0  # PRAGMA optimize periódico (0 lo deshabilita)
+    
     # Security
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    
+    # Revocación de sesiones: filtro de Bloom en memoria + tabla sesiones_revocadas
+    REVOCACION_SYNC_SECONDS: float = 15.0  # Cada cuánto cada proceso trae revocaciones nuevas
+    REVOCACION_BLOOM_CAPACIDAD: int = 100000  # Mínimo; se dimensiona con 4× las revocaciones al cargar
+    REVOCACION_PURGA_SECONDS: float = 3600.0  # Borrado de tokens y revocaciones vencidas (en segundo plano)
+    
+    # Hashing de contraseñas (bcrypt en un pool dedicado, fuera del threadpool de la API)
+    BCRYPT_ROUNDS: int = 12  # Los hashes con menos rondas se actualizan al hacer login
+    PASSWORD_POOL_SIZE: int = 4  # Máximo de hashes/verificaciones en paralelo
+    PASSWORD_POOL_KIND: str = "thread"  # "thread" o "process"
+    
+    # Límite de intentos de login (por proceso, antes de consultar la base o hashear)
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_IP_CAPACIDAD: int = 20  # Ráfaga máxima por IP
+    LOGIN_RATE_IP_POR_MINUTO: float = 10.0
+    LOGIN_RATE_CUENTA_CAPACIDAD: int = 10  # Ráfaga máxima por email
+    LOGIN_RATE_CUENTA_POR_MINUTO: float = 5.0
+    LOGIN_BLOQUEO_FALLOS: int = 10  # Fallos dentro de la ventana que bloquean la cuenta
+    LOGIN_BLOQUEO_VENTANA_SEGUNDOS: float = 900.0
+    
+    # Disponibilidad de username/email para el registro (en memoria, por proceso)
+    DISPONIBILIDAD_SYNC_SECONDS: float = 10.0  # Cada cuánto se traen usuarios de otros procesos
+    DISPONIBILIDAD_BLOOM_CAPACIDAD: int = 1000000
+    
+    # Caché del usuario autenticado (token decodificado + snapshot del usuario)
+    AUTH_CACHE_TTL_SECONDS: float = 30.0  # 0 deshabilita la caché
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Caché de respuestas de GET públicos para visitantes anónimos (catálogo y perfiles)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+    RESPONSE_CACHE_STALE_SECONDS: float = 300.0  # Vencida, se sirve mientras se refresca en segundo plano
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5000
+    RESPONSE_CACHE_MAX_MB: int = 64
+    RESPONSE_CACHE_GZIP_MIN_BYTES: int = 1024  # Cuerpos desde este tamaño se guardan también con gzip (0 deshabilita)
+    
+    # Bus de invalidación entre workers (sockets Unix en un directorio compartido)
+    INVALIDATION_BUS_ENABLED: bool = True
+    INVALIDATION_BUS_DIR: Optional[str] = None  # Por defecto en XDG_RUNTIME_DIR o /tmp (derivado de DATABASE_URL); propio y 0700
+    
+    # Single-flight: lecturas concurrentes idénticas del catálogo comparten una sola consulta
+    SINGLE_FLIGHT_ENABLED: bool = True
+    
+    # Control de admisión por clase de ruta: requests en curso, cola y espera máxima (por worker)
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_AUTH_LIMIT: int = 8  # login/register: bcrypt en el pool de passwords
+    ADMISSION_AUTH_QUEUE: int = 64
+    ADMISSION_AUTH_MAX_WAIT_SECONDS: float = 2.0
+    ADMISSION_CATALOG_LIMIT: int = 32  # GET de productos, reseñas y perfiles públicos
+    ADMISSION_CATALOG_QUEUE: int = 256
+    ADMISSION_CATALOG_MAX_WAIT_SECONDS: float = 1.0
+    ADMISSION_MESSAGING_LIMIT: int = 16  # Conversaciones y mensajes
+    ADMISSION_MESSAGING_QUEUE: int = 128
+    ADMISSION_MESSAGING_MAX_WAIT_SECONDS: float = 2.0
+    ADMISSION_CHECKOUT_LIMIT: int = 8  # POST /orders
+    ADMISSION_CHECKOUT_QUEUE: int = 64
+    ADMISSION_CHECKOUT_MAX_WAIT_SECONDS: float = 5.0
+    
+    # Pools de hilos con nombre para los endpoints sync (asignados en api/api_v1/api.py)
+    THREAD_POOLS_ENABLED: bool = True
+    THREAD_POOLS: Dict[str, int] = {  # Hilos por pool (JSON en el .env)
+        "auth": 4,
+        "usuarios": 6,
+        "catalogo": 16,
+        "mensajeria": 8,
+        "pedidos": 6,
+        "exportes": 2,
+        "reportes": 4,
+    }
+    THREAD_POOL_DEFAULT_SIZE: int = 4  # Pools asignados que no están en THREAD_POOLS
+    
+    # Logging (JSON por stdout, escrito desde un hilo aparte)
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    
+    # Métricas por ruta (GET /metrics, formato Prometheus) y header Server-Timing
+    METRICS_ENABLED: bool = True
+    SERVER_TIMING_ENABLED: bool = True
+    
+    # Group commit: agrupa las escrituras de varios requests en un solo commit
+    GROUP_COMMIT_ENABLED: bool = False
+    GROUP_COMMIT_MAX_BATCH: int = 64  # Máximo de escrituras por commit
+    GROUP_COMMIT_MAX_DELAY_MS: float = 2.0  # Espera máxima para completar un lote
+    GROUP_COMMIT_TIMEOUT_SECONDS: float = 30.0  # Máximo que un request espera su commit
+    
+    # Rankings del catálogo (trending / best_selling / top_rated)
+    RANKING_HALF_LIFE_HOURS: float = 72.0  # Cada 72 h una venta pesa la mitad
+    RANKING_PRIOR_CALIFICACION: float = 3.0  # Promedio asumido sin calificaciones
+    RANKING_PESO_PRIOR: int = 5  # Calificaciones "virtuales" del promedio bayesiano
+    
+    # "Comprados juntos frecuentemente"
+    RECOMENDACIONES_TOP_K: int = 8
+    RECOMENDACIONES_MAX_PRODUCTOS: int = 20  # Productos de un pedido que cuentan para los pares (≤ 380 filas)
+    RECOMENDACIONES_REFRESCO_SECONDS: float = 5.0  # Cada cuánto se regeneran los top-K con pedidos nuevos
+    
+    # Pedidos
+    PEDIDO_MAX_ITEMS: int = 100
+    
+    # Emails de los administradores (exportaciones de pedidos de todos los vendedores)
+    ADMIN_EMAILS: list = []
     
     # CORS
     BACKEND_CORS_ORIGINS: list = [
@@ -22,8 +145,6 @@ class Settings(BaseSettings):
     "http://localhost:5173"   # Por si cambias puertos
 ]
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
 settings = Settings()
\ No newline at end of file
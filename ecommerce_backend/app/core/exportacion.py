@@ -0,0 +1,56 @@
+# app/core/exportacion.py
+# Serialización incremental (NDJSON / CSV) para respuestas en streaming
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def _valor_json(valor: Any) -> Any:
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+def filas_ndjson(filas: Iterable[Mapping[str, Any]], filas_por_bloque: int = 500) -> Iterator[bytes]:
+    """Un objeto JSON por línea, entregado en bloques de `filas_por_bloque` filas"""
+    bloque = []
+    for fila in filas:
+        bloque.append(json.dumps(dict(fila), default=_valor_json, ensure_ascii=False))
+        if len(bloque) >= filas_por_bloque:
+            yield ("\n".join(bloque) + "\n").encode("utf-8")
+            bloque = []
+    if bloque:
+        yield ("\n".join(bloque) + "\n").encode("utf-8")
+
+def filas_csv(
+    filas: Iterable[Mapping[str, Any]],
+    columnas: Sequence[str],
+    filas_por_bloque: int = 500
+) -> Iterator[bytes]:
+    """CSV con encabezado, entregado en bloques de `filas_por_bloque` filas"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columnas)
+    pendientes = 0
+    for fila in filas:
+        writer.writerow([
+            valor.isoformat() if isinstance(valor, (datetime, date)) else valor
+            for valor in (fila[c] for c in columnas)
+        ])
+        pendientes += 1
+        if pendientes >= filas_por_bloque:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pendientes = 0
+    # El encabezado sale aunque no haya filas
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
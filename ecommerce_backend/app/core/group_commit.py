@@ -0,0 +1,181 @@
+# app/core/group_commit.py
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Una unidad de escritura recibe la sesión del escritor y devuelve su resultado.
+# No debe hacer commit: el executor confirma el lote completo.
+UnidadEscritura = Callable[[Session], Any]
+
+_DETENER = object()
+
+
+class GroupCommitExecutor:
+    """
+    Escritor único que agrupa las escrituras de varios requests en un solo commit
+
+    En SQLite cada commit implica un fsync, así que confirmar de a una escritura
+    limita el throughput a unos cientos por segundo. Este executor:
+    1. Recibe unidades de escritura desde los handlers (submit)
+    2. Las acumula en lotes acotados por tamaño y por tiempo
+    3. Ejecuta cada unidad dentro de un SAVEPOINT, para que el error de un
+       request no afecte a los demás del lote
+    4. Hace un único commit por lote y resuelve el Future de cada llamador
+       con su propio resultado
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_batch: int = 64,
+        max_delay_ms: float = 2.0,
+        timeout: Optional[float] = 30.0
+    ):
+        self._session_factory = session_factory
+        self._timeout = timeout
+        self._max_batch = max(1, max_batch)
+        self._max_delay = max(0.0, max_delay_ms) / 1000
+        self._cola: "queue.Queue[Any]" = queue.Queue()
+        self._hilo: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Estadísticas simples para diagnóstico
+        self.lotes = 0
+        self.unidades = 0
+
+    def submit(self, unidad: UnidadEscritura) -> Future:
+        """Encola una unidad de escritura y retorna un Future con su resultado"""
+        self._iniciar()
+        futuro: Future = Future()
+        self._cola.put((unidad, futuro))
+        return futuro
+
+    def run(self, unidad: UnidadEscritura) -> Any:
+        """
+        Encola una unidad y espera su resultado (para handlers sincrónicos)
+
+        Si el escritor no responde en `timeout` segundos se lanza TimeoutError;
+        la unidad se cancela si todavía no había empezado.
+        """
+        futuro = self.submit(unidad)
+        try:
+            return futuro.result(timeout=self._timeout)
+        except FuturesTimeoutError:
+            futuro.cancel()
+            raise TimeoutError("El escritor no confirmó la escritura a tiempo") from None
+
+    def detener(self, timeout: Optional[float] = 5.0) -> None:
+        """Procesa lo que quede en la cola y detiene el hilo escritor"""
+        with self._lock:
+            hilo = self._hilo
+            if hilo is None:
+                return
+            self._cola.put(_DETENER)
+        hilo.join(timeout)
+        with self._lock:
+            self._hilo = None
+
+    def _iniciar(self) -> None:
+        if self._hilo is not None:
+            return
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(
+                    target=self._loop, name="group-commit-writer", daemon=True
+                )
+                self._hilo.start()
+
+    def _loop(self) -> None:
+        detener = False
+        while not detener:
+            item = self._cola.get()
+            if item is _DETENER:
+                break
+
+            lote = [item]
+            limite = time.monotonic() + self._max_delay
+            while len(lote) < self._max_batch:
+                # Primero tomar todo lo que ya está encolado, sin esperar
+                try:
+                    item = self._cola.get_nowait()
+                except queue.Empty:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    try:
+                        item = self._cola.get(timeout=restante)
+                    except queue.Empty:
+                        break
+                if item is _DETENER:
+                    detener = True
+                    break
+                lote.append(item)
+
+            try:
+                self._procesar_lote(lote)
+            except Exception as e:
+                # El hilo escritor no debe morir: las escrituras siguientes se colgarían
+                logger.exception("Error inesperado procesando un lote de escrituras")
+                _fallar_pendientes(lote, e)
+
+    def _procesar_lote(self, lote: List[Tuple[UnidadEscritura, Future]]) -> None:
+        session = None
+        completados = []
+        try:
+            # Abrir la sesión o el SAVEPOINT (BEGIN IMMEDIATE en SQLite) puede
+            # fallar, p. ej. con SQLITE_BUSY si otro proceso tiene el lock
+            session = self._session_factory()
+            for unidad, futuro in lote:
+                if not futuro.set_running_or_notify_cancel():
+                    continue
+
+                savepoint = session.begin_nested()
+                try:
+                    resultado = unidad(session)
+                    session.flush()
+                    savepoint.commit()
+                except BaseException as e:
+                    # Aislar el error: solo se descarta esta unidad
+                    futuro.set_exception(e)
+                    savepoint.rollback()
+                else:
+                    completados.append((futuro, resultado))
+
+            session.commit()
+        except Exception as e:
+            logger.exception("Error confirmando un lote de %d escrituras", len(lote))
+            if session is not None:
+                try:
+                    session.rollback()
+                except Exception:
+                    logger.exception("Error descartando un lote de escrituras")
+            # Lo confirmado en el lote se perdió, y la unidad en curso y las
+            # siguientes no llegaron a resolverse: todas reciben el error
+            _fallar_pendientes(lote, e)
+        else:
+            # Los objetos quedan desasociados pero con sus atributos cargados
+            session.expunge_all()
+            for futuro, resultado in completados:
+                futuro.set_result(resultado)
+            self.lotes += 1
+            self.unidades += len(completados)
+        finally:
+            if session is not None:
+                try:
+                    session.close()
+                except Exception:
+                    logger.exception("Error cerrando la sesión del escritor")
+
+
+def _fallar_pendientes(lote: List[Tuple[UnidadEscritura, Future]], error: BaseException) -> None:
+    """Resuelve con `error` los Futures del lote que todavía no tienen resultado"""
+    for _, futuro in lote:
+        if not futuro.done():
+            futuro.set_exception(error)
@@ -0,0 +1,106 @@
+# app/core/logs.py
+# Logging estructurado (JSON) sin bloquear: los handlers escriben desde un hilo aparte
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import traceback
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional, TextIO
+from .config import settings
+
+# Id del request en curso (lo asigna RequestContextMiddleware)
+request_id_actual: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Atributos propios de LogRecord: todo lo demás vino por `extra=` y va al JSON
+_ATRIBUTOS_RECORD = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "request_id"}
+
+class _ContextoFilter(logging.Filter):
+    """Copia el request id al record en el hilo que loguea (antes de encolarlo)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_actual.get()
+        return True
+
+class JSONFormatter(logging.Formatter):
+    """Una línea JSON por evento, con los campos pasados en `extra=`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        evento = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            evento["request_id"] = request_id
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_RECORD:
+                evento[clave] = valor
+        if record.exc_info:
+            evento["exc"] = "".join(traceback.format_exception(*record.exc_info))
+        elif record.exc_text:
+            evento["exc"] = record.exc_text
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que no formatea en el hilo del request
+
+    El QueueHandler estándar arma el mensaje y descarta args/exc_info al
+    encolar; acá solo se resuelve el mensaje y el traceback (que no se pueden
+    serializar más tarde) y el formato JSON lo hace el hilo del listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info))
+            record.exc_info = None
+        return record
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def configurar_logging(stream: Optional[TextIO] = None) -> None:
+    """
+    Envía todo el logging de la aplicación a una cola
+
+    Loguear desde un request solo encola el record; un único hilo lo formatea
+    y lo escribe en `stream` (stdout por defecto). Se puede llamar más de una vez.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    cola: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    salida = logging.StreamHandler(stream or sys.stdout)
+    if settings.LOG_JSON:
+        salida.setFormatter(JSONFormatter())
+    else:
+        salida.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+
+    handler = _QueueHandler(cola)
+    handler.addFilter(_ContextoFilter())
+
+    raiz = logging.getLogger()
+    raiz.handlers = [handler]
+    raiz.setLevel(settings.LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(cola, salida, respect_handler_level=True)
+    _listener.start()
+
+def detener_logging() -> None:
+    """
+    Vacía la cola y detiene el hilo del listener (al apagar la aplicación)
+
+    Lo que se loguee después se escribe directo, sin cola.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        logging.getLogger().handlers = list(_listener.handlers)
+        _listener = None
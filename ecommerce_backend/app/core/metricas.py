@@ -0,0 +1,318 @@
+# app/core/metricas.py
+# Métricas en memoria (por proceso) expuestas en formato de texto de Prometheus
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+import anyio.to_thread
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Límites de los buckets de los histogramas (segundos)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class TiemposRequest:
+    """
+    Tiempos de un request (lo crea MetricsMiddleware y vive en un contextvar)
+
+    Es mutable a propósito: los endpoints sync corren en el threadpool con una
+    copia del contexto, que apunta al mismo objeto, así que lo que se acumula
+    ahí (tiempo de base de datos, del endpoint) lo ve el middleware.
+    """
+    __slots__ = ("db", "consultas", "inicio_handler", "inicio_endpoint", "fin_endpoint", "fin_handler")
+
+    def __init__(self):
+        self.db = 0.0
+        self.consultas = 0
+        self.inicio_handler: Optional[float] = None
+        self.inicio_endpoint: Optional[float] = None
+        self.fin_endpoint: Optional[float] = None
+        self.fin_handler: Optional[float] = None
+
+    def desglose(self) -> Dict[str, float]:
+        """Segundos de dependencias, endpoint y serialización (si se pudieron medir)"""
+        partes = {}
+        if self.inicio_handler is not None and self.inicio_endpoint is not None:
+            partes["deps"] = self.inicio_endpoint - self.inicio_handler
+        if self.inicio_endpoint is not None and self.fin_endpoint is not None:
+            partes["endpoint"] = self.fin_endpoint - self.inicio_endpoint
+        if self.fin_endpoint is not None and self.fin_handler is not None:
+            partes["serializacion"] = self.fin_handler - self.fin_endpoint
+        return partes
+
+tiempos_request: ContextVar[Optional[TiemposRequest]] = ContextVar("tiempos_request", default=None)
+
+class Histograma:
+    """Histograma de buckets fijos (acumulativos al exportar, como Prometheus)"""
+    __slots__ = ("conteos", "suma", "total")
+
+    def __init__(self):
+        self.conteos = [0] * (len(BUCKETS) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        self.conteos[bisect.bisect_left(BUCKETS, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+class RegistroMetricas:
+    """Contadores e histogramas por método y ruta (plantilla, no la URL concreta)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.histogramas: Dict[str, Dict[Tuple[str, str], Histograma]] = {
+            "http_request_duration_seconds": {},
+            "http_request_db_seconds": {},
+            "http_request_serialization_seconds": {},
+        }
+        self.consultas: Dict[Tuple[str, str], int] = {}
+
+    def registrar(self, metodo: str, ruta: str, estado: int, duracion: float, tiempos: TiemposRequest) -> None:
+        clave = (metodo, ruta)
+        serializacion = tiempos.desglose().get("serializacion")
+        with self._lock:
+            self.requests[(metodo, ruta, estado)] = self.requests.get((metodo, ruta, estado), 0) + 1
+            self._observar("http_request_duration_seconds", clave, duracion)
+            self._observar("http_request_db_seconds", clave, tiempos.db)
+            if serializacion is not None:
+                self._observar("http_request_serialization_seconds", clave, serializacion)
+            self.consultas[clave] = self.consultas.get(clave, 0) + tiempos.consultas
+
+    def _observar(self, nombre: str, clave: Tuple[str, str], valor: float) -> None:
+        histograma = self.histogramas[nombre].get(clave)
+        if histograma is None:
+            histograma = self.histogramas[nombre][clave] = Histograma()
+        histograma.observar(valor)
+
+    def exportar(self) -> str:
+        """Texto en formato de exposición de Prometheus (version 0.0.4)"""
+        lineas: List[str] = []
+        with self._lock:
+            lineas.append("# HELP http_requests_total Requests HTTP atendidos")
+            lineas.append("# TYPE http_requests_total counter")
+            for (metodo, ruta, estado), valor in sorted(self.requests.items()):
+                lineas.append(f'http_requests_total{{method="{metodo}",route="{_escapar(ruta)}",status="{estado}"}} {valor}')
+
+            for nombre, descripcion in (
+                ("http_request_duration_seconds", "Duración total del request"),
+                ("http_request_db_seconds", "Tiempo en consultas a la base de datos por request"),
+                ("http_request_serialization_seconds", "Tiempo serializando la respuesta por request"),
+            ):
+                lineas.append(f"# HELP {nombre} {descripcion}")
+                lineas.append(f"# TYPE {nombre} histogram")
+                for (metodo, ruta), histograma in sorted(self.histogramas[nombre].items()):
+                    etiquetas = f'method="{metodo}",route="{_escapar(ruta)}"'
+                    acumulado = 0
+                    for limite, conteo in zip(BUCKETS, histograma.conteos):
+                        acumulado += conteo
+                        lineas.append(f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+                    lineas.append(f'{nombre}_bucket{{{etiquetas},le="+Inf"}} {histograma.total}')
+                    lineas.append(f"{nombre}_sum{{{etiquetas}}} {histograma.suma:.6f}")
+                    lineas.append(f"{nombre}_count{{{etiquetas}}} {histograma.total}")
+
+            lineas.append("# HELP http_request_db_queries_total Consultas a la base de datos")
+            lineas.append("# TYPE http_request_db_queries_total counter")
+            for (metodo, ruta), valor in sorted(self.consultas.items()):
+                lineas.append(f'http_request_db_queries_total{{method="{metodo}",route="{_escapar(ruta)}"}} {valor}')
+
+        lineas.extend(_metricas_pool_passwords())
+        lineas.extend(_metricas_cache_respuestas())
+        lineas.extend(_metricas_single_flight())
+        lineas.extend(_metricas_bus_invalidacion())
+        lineas.extend(_metricas_admision())
+        lineas.extend(_metricas_pools())
+        return "\n".join(lineas) + "\n"
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"')
+
+def _metricas_pool_passwords() -> List[str]:
+    from .security import estadisticas_passwords
+
+    resumen = estadisticas_passwords.resumen()
+    return [
+        "# HELP password_pool_operations_total Hashes y verificaciones de bcrypt",
+        "# TYPE password_pool_operations_total counter",
+        f"password_pool_operations_total {resumen['operaciones']}",
+        "# HELP password_pool_in_flight Operaciones de bcrypt en cola o en curso",
+        "# TYPE password_pool_in_flight gauge",
+        f"password_pool_in_flight {resumen['en_curso']}",
+        "# HELP password_pool_wait_seconds_total Tiempo acumulado en la cola del pool",
+        "# TYPE password_pool_wait_seconds_total counter",
+        f"password_pool_wait_seconds_total {estadisticas_passwords.espera_total:.6f}",
+    ]
+
+def _metricas_cache_respuestas() -> List[str]:
+    from .cache_respuestas import cache_respuestas as cache
+
+    lineas = [
+        "# HELP response_cache_lookups_total Consultas a la caché de respuestas por resultado",
+        "# TYPE response_cache_lookups_total counter",
+    ]
+    for resultado, valor in (("hit", cache.aciertos), ("stale", cache.vencidas), ("miss", cache.fallos)):
+        lineas.append(f'response_cache_lookups_total{{result="{resultado}"}} {valor}')
+    lineas += [
+        "# HELP response_cache_refreshes_total Refrescos en segundo plano de entradas vencidas",
+        "# TYPE response_cache_refreshes_total counter",
+        f"response_cache_refreshes_total {cache.refrescos}",
+        "# HELP response_cache_invalidations_total Entradas descartadas por escrituras",
+        "# TYPE response_cache_invalidations_total counter",
+        f"response_cache_invalidations_total {cache.invalidaciones}",
+        "# HELP response_cache_entries Entradas en la caché de respuestas",
+        "# TYPE response_cache_entries gauge",
+        f"response_cache_entries {len(cache)}",
+        "# HELP response_cache_bytes Bytes ocupados por los cuerpos cacheados",
+        "# TYPE response_cache_bytes gauge",
+        f"response_cache_bytes {cache.bytes}",
+    ]
+    return lineas
+
+def _metricas_single_flight() -> List[str]:
+    from .single_flight import single_flight
+
+    lineas = [
+        "# HELP single_flight_calls_total Lecturas por grupo: ejecutadas o coalescidas con otra en curso",
+        "# TYPE single_flight_calls_total counter",
+    ]
+    for grupo, (ejecutadas, coalescidas) in sorted(single_flight.contadores.items()):
+        lineas.append(f'single_flight_calls_total{{group="{grupo}",result="executed"}} {ejecutadas}')
+        lineas.append(f'single_flight_calls_total{{group="{grupo}",result="coalesced"}} {coalescidas}')
+    lineas += [
+        "# HELP single_flight_in_flight Ejecuciones en curso con posibles llamadas esperando",
+        "# TYPE single_flight_in_flight gauge",
+        f"single_flight_in_flight {single_flight.en_curso()}",
+    ]
+    return lineas
+
+def _metricas_bus_invalidacion() -> List[str]:
+    from .bus_invalidacion import bus_invalidacion as bus
+
+    lineas = [
+        "# HELP invalidation_bus_events_total Eventos de invalidación por origen/resultado",
+        "# TYPE invalidation_bus_events_total counter",
+    ]
+    for resultado, valor in (("published", bus.publicados), ("received", bus.recibidos),
+                             ("skipped", bus.descartados), ("undelivered", bus.perdidos),
+                             ("rejected", bus.rechazados)):
+        lineas.append(f'invalidation_bus_events_total{{result="{resultado}"}} {valor}')
+    lineas += [
+        "# HELP invalidation_bus_peers Otros workers escuchando en el directorio del bus",
+        "# TYPE invalidation_bus_peers gauge",
+        f"invalidation_bus_peers {bus.pares()}",
+    ]
+    return lineas
+
+def _metricas_admision() -> List[str]:
+    from .admision import clases_admision
+
+    lineas = [
+        "# HELP admission_in_flight Requests admitidos en curso por clase de ruta",
+        "# TYPE admission_in_flight gauge",
+    ]
+    lineas += [f'admission_in_flight{{class="{n}"}} {c.en_curso}' for n, c in clases_admision.items()]
+    lineas += [
+        "# HELP admission_queue_length Requests esperando lugar por clase de ruta",
+        "# TYPE admission_queue_length gauge",
+    ]
+    lineas += [f'admission_queue_length{{class="{n}"}} {c.en_cola}' for n, c in clases_admision.items()]
+    lineas += [
+        "# HELP admission_admitted_total Requests admitidos por clase de ruta",
+        "# TYPE admission_admitted_total counter",
+    ]
+    lineas += [f'admission_admitted_total{{class="{n}"}} {c.admitidos}' for n, c in clases_admision.items()]
+    lineas += [
+        "# HELP admission_queue_wait_seconds_total Tiempo total esperado en la cola por los admitidos",
+        "# TYPE admission_queue_wait_seconds_total counter",
+    ]
+    lineas += [f'admission_queue_wait_seconds_total{{class="{n}"}} {c.espera_total:.6f}'
+               for n, c in clases_admision.items()]
+    lineas += [
+        "# HELP admission_shed_total Requests rechazados con 503 por clase de ruta y motivo",
+        "# TYPE admission_shed_total counter",
+    ]
+    for nombre, clase in clases_admision.items():
+        for motivo, valor in clase.rechazos.items():
+            lineas.append(f'admission_shed_total{{class="{nombre}",reason="{motivo}"}} {valor}')
+    return lineas
+
+def _metricas_pools() -> List[str]:
+    from .pools import pools
+
+    actuales = sorted(pools().items())
+    lineas = [
+        "# HELP thread_pool_size Hilos de cada pool con nombre",
+        "# TYPE thread_pool_size gauge",
+    ]
+    lineas += [f'thread_pool_size{{pool="{n}"}} {p.tamano}' for n, p in actuales]
+    lineas += [
+        "# HELP thread_pool_busy Hilos ejecutando una tarea",
+        "# TYPE thread_pool_busy gauge",
+    ]
+    lineas += [f'thread_pool_busy{{pool="{n}"}} {p.ocupados}' for n, p in actuales]
+    lineas += [
+        "# HELP thread_pool_queue_length Tareas esperando un hilo libre",
+        "# TYPE thread_pool_queue_length gauge",
+    ]
+    lineas += [f'thread_pool_queue_length{{pool="{n}"}} {p.en_cola}' for n, p in actuales]
+    lineas += [
+        "# HELP thread_pool_tasks_total Tareas terminadas",
+        "# TYPE thread_pool_tasks_total counter",
+    ]
+    lineas += [f'thread_pool_tasks_total{{pool="{n}"}} {p.operaciones}' for n, p in actuales]
+    lineas += [
+        "# HELP thread_pool_wait_seconds_total Tiempo acumulado esperando un hilo",
+        "# TYPE thread_pool_wait_seconds_total counter",
+    ]
+    lineas += [f'thread_pool_wait_seconds_total{{pool="{n}"}} {p.espera_total:.6f}' for n, p in actuales]
+    lineas += [
+        "# HELP thread_pool_busy_seconds_total Tiempo acumulado ejecutando (utilización = rate / size)",
+        "# TYPE thread_pool_busy_seconds_total counter",
+    ]
+    lineas += [f'thread_pool_busy_seconds_total{{pool="{n}"}} {p.ejecucion_total:.6f}' for n, p in actuales]
+    try:
+        # Threadpool de Starlette: dependencias sync, run_in_threadpool y endpoints sin pool
+        limitador = anyio.to_thread.current_default_thread_limiter()
+    except RuntimeError:
+        return lineas  # Fuera del event loop
+    lineas += [
+        "# HELP default_threadpool_tokens Lugares del threadpool por defecto de Starlette",
+        "# TYPE default_threadpool_tokens gauge",
+        f'default_threadpool_tokens{{state="total"}} {limitador.total_tokens}',
+        f'default_threadpool_tokens{{state="borrowed"}} {limitador.borrowed_tokens}',
+    ]
+    return lineas
+
+registro_metricas = RegistroMetricas()
+
+# --- Tiempo de base de datos ---
+# Se escucha a nivel de la clase Engine para cubrir todos los engines de la app.
+
+# El inicio se guarda en el contexto de ejecución (uno por sentencia): si la
+# sentencia falla no queda nada colgado en la conexión, y handle_error suma
+# igual el tiempo que se esperó (p. ej. un SQLITE_BUSY después del busy_timeout).
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._inicio_consulta = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _despues_de_consulta(conn, cursor, statement, parameters, context, executemany):
+    _sumar_consulta(context)
+
+@event.listens_for(Engine, "handle_error")
+def _consulta_fallida(contexto_error):
+    _sumar_consulta(contexto_error.execution_context)
+
+def _sumar_consulta(context) -> None:
+    inicio = getattr(context, "_inicio_consulta", None)
+    if inicio is None:
+        return
+    context._inicio_consulta = None  # Una sola vez por sentencia
+    tiempos = tiempos_request.get()
+    if tiempos is not None:
+        tiempos.db += time.perf_counter() - inicio
+        tiempos.consultas += 1
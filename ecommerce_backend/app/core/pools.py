@@ -0,0 +1,164 @@
+# app/core/pools.py
+# Pools de hilos con nombre por tipo de carga (endpoints sync, exports)
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+from .config import settings
+
+_FIN = object()
+_MAX_PARTES = 16  # Partes ya generadas que puede adelantar cada iterar
+
+class PoolHilos:
+    """
+    ThreadPoolExecutor con nombre, tamaño propio y métricas de uso
+
+    Reemplaza, para los endpoints asignados (ver api/rutas.en_pool), al
+    limitador único de Starlette (~40 hilos compartidos por todos los
+    endpoints sync): un export lento o una ráfaga de un tipo de request
+    satura su pool sin dejar sin hilos a los demás.
+
+    El contexto (contextvars) se copia al hilo, igual que run_in_threadpool.
+    """
+
+    def __init__(self, nombre: str, tamano: int):
+        self.nombre = nombre
+        self.tamano = max(tamano, 1)
+        self.en_cola = 0
+        self.ocupados = 0
+        self.operaciones = 0
+        self.espera_total = 0.0
+        self.ejecucion_total = 0.0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Crea los hilos la primera vez que se usa (no al importar el módulo)"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.tamano, thread_name_prefix=f"pool-{self.nombre}"
+                    )
+        return self._executor
+
+    def _correr(self, encolado: float, contexto: contextvars.Context, funcion: Callable, args, kwargs):
+        inicio = time.perf_counter()
+        with self._lock:
+            self.en_cola -= 1
+            self.ocupados += 1
+            self.espera_total += inicio - encolado
+        try:
+            return contexto.run(funcion, *args, **kwargs)
+        finally:
+            with self._lock:
+                self.ocupados -= 1
+                self.operaciones += 1
+                self.ejecucion_total += time.perf_counter() - inicio
+
+    async def ejecutar(self, funcion: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Corre funcion en un hilo del pool sin bloquear el event loop"""
+        with self._lock:
+            self.en_cola += 1
+        futuro = self._get_executor().submit(
+            self._correr, time.perf_counter(), contextvars.copy_context(), funcion, args, kwargs
+        )
+        try:
+            return await asyncio.wrap_future(futuro)
+        except asyncio.CancelledError:
+            # Cliente desconectado: si la tarea no llegó a empezar, sale de la cola
+            if futuro.cancel():
+                with self._lock:
+                    self.en_cola -= 1
+            raise
+
+    async def iterar(self, iterador: Iterator) -> AsyncIterator:
+        """
+        Recorre un iterador sync en el pool (p. ej. el cuerpo de un StreamingResponse)
+
+        Cada iterador ocupa un hilo de principio a fin: a lo sumo `tamano`
+        recorridos en paralelo, y los demás esperan en la cola del pool sin
+        tener abierta todavía su sesión. Si cada parte fuera una tarea
+        distinta, los recorridos se intercalarían y podrían acaparar todas
+        las conexiones esperando hilos ocupados por otros. El hilo espera a
+        que el cliente consuma (cola de _MAX_PARTES) y termina si se desconecta.
+        """
+        loop = asyncio.get_running_loop()
+        partes: asyncio.Queue = asyncio.Queue(maxsize=_MAX_PARTES)
+        abandonado = threading.Event()
+
+        def entregar(elemento) -> bool:
+            futuro = asyncio.run_coroutine_threadsafe(partes.put(elemento), loop)
+            while not abandonado.is_set():
+                try:
+                    futuro.result(timeout=0.5)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    continue
+            futuro.cancel()
+            return False
+
+        def producir() -> None:
+            try:
+                for parte in iterador:
+                    if not entregar((parte, None)):
+                        return
+            except Exception as e:
+                entregar((_FIN, e))
+                return
+            finally:
+                cerrar = getattr(iterador, "close", None)
+                if cerrar is not None:
+                    cerrar()
+            entregar((_FIN, None))
+
+        tarea = asyncio.ensure_future(self.ejecutar(producir))
+        try:
+            while True:
+                parte, error = await partes.get()
+                if error is not None:
+                    raise error
+                if parte is _FIN:
+                    return
+                yield parte
+        finally:
+            abandonado.set()
+            if not tarea.done():
+                tarea.cancel()  # Si todavía no empezó, sale de la cola del pool
+
+    def detener(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+_pools: Dict[str, PoolHilos] = {}
+_pools_lock = threading.Lock()
+
+def obtener_pool(nombre: str) -> PoolHilos:
+    """Pool con ese nombre; el tamaño sale de THREAD_POOLS (o THREAD_POOL_DEFAULT_SIZE)"""
+    pool = _pools.get(nombre)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(nombre)
+            if pool is None:
+                tamano = settings.THREAD_POOLS.get(nombre, settings.THREAD_POOL_DEFAULT_SIZE)
+                pool = _pools[nombre] = PoolHilos(nombre, tamano)
+    return pool
+
+def pools() -> Dict[str, PoolHilos]:
+    return dict(_pools)
+
+def detener_pools() -> None:
+    """Espera a las tareas en curso y cierra los hilos (al apagar la aplicación)"""
+    for pool in pools().values():
+        pool.detener()
+
+def iterar_en_pool(nombre: str, iterador: Iterator):
+    """Cuerpo de un StreamingResponse recorrido en el pool `nombre` (o en el threadpool de Starlette)"""
+    if not settings.THREAD_POOLS_ENABLED:
+        return iterador
+    return obtener_pool(nombre).iterar(iterador)
@@ -0,0 +1,163 @@
+# app/core/rate_limit.py
+# Límites de intentos de login en memoria (por proceso)
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+from fastapi import HTTPException, status
+from .config import settings
+
+# Cada cuánto se recorren las tablas para descartar claves inactivas
+_INTERVALO_PURGA = 60.0
+
+class TokenBucket:
+    """
+    Token bucket por clave: permite ráfagas de hasta `capacidad` intentos y
+    después `por_minuto` intentos por minuto
+
+    Un bucket que ya se recargó por completo es igual a uno nuevo, así que se
+    puede descartar sin perder información: así se purgan las claves inactivas.
+    """
+
+    def __init__(self, capacidad: int, por_minuto: float):
+        self.capacidad = capacidad
+        self.recarga = por_minuto / 60.0
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._ultima_purga = time.monotonic()
+
+    def consumir(self, clave: str) -> float:
+        """
+        Consume un intento
+
+        Returns:
+            0 si se permite; si no, los segundos a esperar hasta el próximo intento
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            self._purgar(ahora)
+            tokens, ultimo = self._buckets.get(clave, (self.capacidad, ahora))
+            tokens = min(self.capacidad, tokens + (ahora - ultimo) * self.recarga)
+            if tokens < 1:
+                self._buckets[clave] = (tokens, ahora)
+                return (1 - tokens) / self.recarga
+            self._buckets[clave] = (tokens - 1, ahora)
+            return 0.0
+
+    def _purgar(self, ahora: float) -> None:
+        if ahora - self._ultima_purga < _INTERVALO_PURGA:
+            return
+        self._ultima_purga = ahora
+        inactivas = [
+            clave for clave, (tokens, ultimo) in self._buckets.items()
+            if tokens + (ahora - ultimo) * self.recarga >= self.capacidad
+        ]
+        for clave in inactivas:
+            del self._buckets[clave]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+class BloqueoPorFallos:
+    """
+    Bloqueo con ventana deslizante: con `max_fallos` fallos dentro de la
+    ventana, la clave queda bloqueada hasta que el fallo más viejo salga de ella
+    """
+
+    def __init__(self, max_fallos: int, ventana_segundos: float):
+        self.max_fallos = max_fallos
+        self.ventana = ventana_segundos
+        self._fallos: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._ultima_purga = time.monotonic()
+
+    def _vigentes(self, clave: str, ahora: float) -> Optional[Deque[float]]:
+        fallos = self._fallos.get(clave)
+        if fallos is None:
+            return None
+        while fallos and fallos[0] <= ahora - self.ventana:
+            fallos.popleft()
+        if not fallos:
+            del self._fallos[clave]
+            return None
+        return fallos
+
+    def bloqueado(self, clave: str) -> float:
+        """Segundos que faltan para desbloquear la clave (0 si no está bloqueada)"""
+        ahora = time.monotonic()
+        with self._lock:
+            self._purgar(ahora)
+            fallos = self._vigentes(clave, ahora)
+            if fallos is None or len(fallos) < self.max_fallos:
+                return 0.0
+            return fallos[-self.max_fallos] + self.ventana - ahora
+
+    def registrar_fallo(self, clave: str) -> None:
+        ahora = time.monotonic()
+        with self._lock:
+            fallos = self._fallos.setdefault(clave, deque())
+            fallos.append(ahora)
+            # No hace falta recordar más fallos que los que definen el bloqueo
+            while len(fallos) > self.max_fallos:
+                fallos.popleft()
+
+    def reiniciar(self, clave: str) -> None:
+        with self._lock:
+            self._fallos.pop(clave, None)
+
+    def _purgar(self, ahora: float) -> None:
+        if ahora - self._ultima_purga < _INTERVALO_PURGA:
+            return
+        self._ultima_purga = ahora
+        for clave in list(self._fallos):
+            self._vigentes(clave, ahora)
+
+    def __len__(self) -> int:
+        return len(self._fallos)
+
+# Límites de /auth/login y /auth/login-simple
+limite_login_ip = TokenBucket(settings.LOGIN_RATE_IP_CAPACIDAD, settings.LOGIN_RATE_IP_POR_MINUTO)
+limite_login_cuenta = TokenBucket(settings.LOGIN_RATE_CUENTA_CAPACIDAD, settings.LOGIN_RATE_CUENTA_POR_MINUTO)
+bloqueo_login = BloqueoPorFallos(settings.LOGIN_BLOQUEO_FALLOS, settings.LOGIN_BLOQUEO_VENTANA_SEGUNDOS)
+
+def _demasiados_intentos(espera: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Demasiados intentos de inicio de sesión. Intente más tarde",
+        headers={"Retry-After": str(max(int(espera + 0.999), 1))}
+    )
+
+def verificar_intento_login(ip: Optional[str], email: str) -> None:
+    """
+    Rechaza el intento (429 con Retry-After) antes de consultar la base o hashear
+
+    Se controla la cuenta (bloqueo por fallos y token bucket, contra ataques
+    distribuidos a un mismo usuario) y la IP (token bucket, contra credential
+    stuffing desde un mismo origen).
+    """
+    if not settings.LOGIN_RATE_LIMIT_ENABLED:
+        return
+    cuenta = email.strip().lower()
+
+    espera = bloqueo_login.bloqueado(cuenta)
+    if espera > 0:
+        raise _demasiados_intentos(espera)
+
+    if ip:
+        espera = limite_login_ip.consumir(ip)
+        if espera > 0:
+            raise _demasiados_intentos(espera)
+
+    espera = limite_login_cuenta.consumir(cuenta)
+    if espera > 0:
+        raise _demasiados_intentos(espera)
+
+def registrar_resultado_login(email: str, exitoso: bool) -> None:
+    """Un login correcto limpia los fallos de la cuenta; uno fallido suma a la ventana"""
+    if not settings.LOGIN_RATE_LIMIT_ENABLED:
+        return
+    cuenta = email.strip().lower()
+    if exitoso:
+        bloqueo_login.reiniciar(cuenta)
+    else:
+        bloqueo_login.registrar_fallo(cuenta)
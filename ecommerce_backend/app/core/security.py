@@ -1,12 +1,24 @@
+import asyncio
+import multiprocessing
+import secrets
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from .config import settings
 
-# Configuración para hashing de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Configuración para hashing de contraseñas. min_rounds hace que needs_update
+# marque los hashes con un costo menor al configurado para rehashearlos en el login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica si la contraseña en texto plano coincide con el hash"""
@@ -16,6 +28,117 @@ def get_password_hash(password: str) -> str:
     """Genera el hash de una contraseña"""
     return pwd_context.hash(password)
 
+def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica la contraseña y, si el hash quedó desactualizado, genera uno nuevo
+
+    Returns:
+        (válida, nuevo_hash o None si no hace falta actualizar)
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+# --- Pool dedicado para bcrypt ---
+# bcrypt tarda decenas de ms por operación; correrlo en el threadpool de la API
+# hace que una ráfaga de logins deje sin hilos a las lecturas del catálogo.
+
+class EstadisticasPool:
+    """Contadores del pool de contraseñas (tiempo en cola y de ejecución)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.operaciones = 0
+        self.en_curso = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+        self.ejecucion_total = 0.0
+
+    def encolar(self) -> None:
+        with self._lock:
+            self.en_curso += 1
+
+    def registrar(self, espera: float, ejecucion: float) -> None:
+        with self._lock:
+            self.en_curso -= 1
+            self.operaciones += 1
+            self.espera_total += espera
+            self.espera_max = max(self.espera_max, espera)
+            self.ejecucion_total += ejecucion
+
+    def resumen(self) -> dict:
+        with self._lock:
+            operaciones = max(self.operaciones, 1)
+            return {
+                "operaciones": self.operaciones,
+                "en_curso": self.en_curso,
+                "espera_promedio_ms": round(self.espera_total / operaciones * 1000, 2),
+                "espera_max_ms": round(self.espera_max * 1000, 2),
+                "ejecucion_promedio_ms": round(self.ejecucion_total / operaciones * 1000, 2),
+            }
+
+estadisticas_passwords = EstadisticasPool()
+
+_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> Executor:
+    """Crea el pool la primera vez que se usa (no al importar el módulo)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if settings.PASSWORD_POOL_KIND == "process":
+                    _pool = ProcessPoolExecutor(
+                        max_workers=settings.PASSWORD_POOL_SIZE,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    _pool = ThreadPoolExecutor(
+                        max_workers=settings.PASSWORD_POOL_SIZE,
+                        thread_name_prefix="bcrypt"
+                    )
+    return _pool
+
+def _medir(funcion, encolado: float, *args):
+    """Corre en el worker: devuelve el resultado junto con los tiempos medidos"""
+    inicio = time.time()
+    resultado = funcion(*args)
+    return resultado, inicio - encolado, time.time() - inicio
+
+async def _en_pool(funcion, *args):
+    estadisticas_passwords.encolar()
+    loop = asyncio.get_running_loop()
+    try:
+        resultado, espera, ejecucion = await loop.run_in_executor(
+            _get_pool(), _medir, funcion, time.time(), *args
+        )
+    except BaseException:
+        estadisticas_passwords.registrar(0.0, 0.0)
+        raise
+    estadisticas_passwords.registrar(max(espera, 0.0), ejecucion)
+    return resultado
+
+async def get_password_hash_async(password: str) -> str:
+    """Genera el hash de una contraseña en el pool dedicado"""
+    return await _en_pool(get_password_hash, password)
+
+async def verify_and_update_password_async(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password en el pool dedicado"""
+    return await _en_pool(verify_and_update_password, plain_password, hashed_password)
+
+def detener_pool_passwords() -> None:
+    """Cierra el pool de contraseñas (al apagar la aplicación)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Crea un token JWT con los datos proporcionados
@@ -42,6 +165,21 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def nuevo_id_token() -> str:
+    """Identificador aleatorio para jti y familias de sesión"""
+    return secrets.token_hex(16)
+
+def create_refresh_token(username: str, familia: str, jti: str) -> Tuple[str, datetime]:
+    """
+    Crea un refresh token JWT (typ=refresh) para una familia de sesión
+    
+    Returns:
+        (token, fecha de expiración)
+    """
+    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode = {"sub": username, "fam": familia, "jti": jti, "typ": "refresh", "exp": expire}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM), expire
+
 def verify_token(token: str, credentials_exception: HTTPException) -> str:
     """
     Verifica y decodifica un token JWT
@@ -53,15 +191,22 @@ def verify_token(token: str, credentials_exception: HTTPException) -> str:
     Returns:
         Username del token si es válido
     """
+    payload = decode_token(token, credentials_exception)
+    return payload["sub"]
+
+def decode_token(token: str, credentials_exception: HTTPException, tipo: str = "access") -> dict:
+    """
+    Decodifica un token JWT y retorna su payload completo
+    
+    Lanza credentials_exception si el token es inválido, expiró, no tiene "sub"
+    o no es del tipo pedido (un refresh token no sirve como access token).
+    """
     try:
         # Decodificar el token
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        
-        if username is None:
-            raise credentials_exception
-            
-        return username
-        
     except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception
+    
+    if payload.get("sub") is None or payload.get("typ", "access") != tipo:
+        raise credentials_exception
+    return payload
\ No newline at end of file
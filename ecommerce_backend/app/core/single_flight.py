@@ -0,0 +1,176 @@
+# app/core/single_flight.py
+# Coalescencia de lecturas concurrentes idénticas (single-flight, por proceso)
+import functools
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from .bus_invalidacion import bus_invalidacion
+from .config import settings
+
+T = TypeVar("T")
+
+class _Llamada:
+    __slots__ = ("listo", "resultado", "compartido", "error", "esperando")
+
+    def __init__(self):
+        self.listo = threading.Event()
+        self.resultado: Any = None
+        self.compartido: Any = None  # Lo que reciben quienes esperan
+        self.error: Optional[BaseException] = None
+        self.esperando = 0
+
+class SingleFlight:
+    """
+    Agrupa las llamadas concurrentes con la misma clave en una sola ejecución
+
+    La primera llamada (líder) ejecuta la función; las que llegan mientras
+    tanto esperan y reciben el mismo resultado (o la misma excepción). No es
+    una caché: apenas termina la ejecución, la siguiente llamada vuelve a
+    ejecutar.
+
+    Cada grupo tiene una generación que sube con cada invalidación (ver
+    invalidar). La clave incluye la generación: quien llega después de una
+    escritura no se suma a una lectura que empezó antes y podría no verla.
+    """
+
+    def __init__(self):
+        self._en_curso: Dict[Hashable, _Llamada] = {}
+        self._generaciones: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # Por grupo: [ejecutadas, coalescidas]
+        self.contadores: Dict[str, list] = {}
+
+    def ejecutar(
+        self,
+        grupo: str,
+        clave: Hashable,
+        funcion: Callable[[], T],
+        compartir: Optional[Callable[[T], Any]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Retorna (resultado, compartido); compartido es True si lo calculó otra llamada
+
+        Args:
+            compartir: Si se indica, el líder la aplica a su resultado (en su
+                hilo, solo si alguien espera) y eso es lo que reciben los demás
+        """
+        with self._lock:
+            contadores = self.contadores.setdefault(grupo, [0, 0])
+            clave = (grupo, self._generaciones.get(grupo, 0), clave)
+            llamada = self._en_curso.get(clave)
+            if llamada is None:
+                llamada = self._en_curso[clave] = _Llamada()
+                contadores[0] += 1
+                lider = True
+            else:
+                llamada.esperando += 1
+                contadores[1] += 1
+                lider = False
+
+        if not lider:
+            llamada.listo.wait()
+            if llamada.error is not None:
+                raise llamada.error
+            return llamada.compartido, True
+
+        try:
+            llamada.resultado = funcion()
+        except BaseException as e:
+            llamada.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._en_curso[clave]
+            # Ya nadie más puede sumarse
+            if llamada.error is None and llamada.esperando:
+                try:
+                    llamada.compartido = (
+                        compartir(llamada.resultado) if compartir is not None else llamada.resultado
+                    )
+                except BaseException as e:
+                    llamada.error = e
+            llamada.listo.set()
+        return llamada.resultado, False
+
+    def invalidar(self, *grupos: str) -> None:
+        """Las llamadas nuevas de esos grupos ya no se suman a las que están en curso"""
+        with self._lock:
+            for grupo in grupos:
+                self._generaciones[grupo] = self._generaciones.get(grupo, 0) + 1
+
+    def en_curso(self) -> int:
+        with self._lock:
+            return len(self._en_curso)
+
+single_flight = SingleFlight()
+
+# Las escrituras publican en el bus después del commit (ver cache_respuestas.invalidar_*)
+bus_invalidacion.suscribir("producto", lambda producto_id: single_flight.invalidar("productos"))
+bus_invalidacion.suscribir(
+    "calificaciones", lambda producto_id: single_flight.invalidar("productos", "calificaciones")
+)
+
+def coalescer(grupo: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Decorador para funciones CRUD de lectura con firma (db, *args, **kwargs)
+
+    Solo coalesce en sesiones de solo lectura (SessionLectura, ver
+    database.get_read_db): en una sesión de escritura el resultado puede
+    depender de cambios todavía no confirmados. La clave son los argumentos
+    sin la sesión; si no son hasheables, se ejecuta sin coalescer.
+
+    Las instancias ORM del líder no salen de su sesión: el líder copia los
+    valores de columna ya cargados y cada llamada que esperaba arma con
+    ellos sus propias instancias en su sesión (sin consultar la base).
+    """
+    def decorador(funcion: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(funcion)
+        def envoltura(db: Session, *args, **kwargs) -> T:
+            if not settings.SINGLE_FLIGHT_ENABLED or not db.info.get("solo_lectura"):
+                return funcion(db, *args, **kwargs)
+            try:
+                clave = (args, tuple(sorted(kwargs.items())))
+                hash(clave)
+            except TypeError:
+                return funcion(db, *args, **kwargs)
+
+            resultado, compartido = single_flight.ejecutar(
+                grupo, (funcion.__name__, clave), lambda: funcion(db, *args, **kwargs), _columnas
+            )
+            return _adoptar(db, resultado) if compartido else resultado
+
+        return envoltura
+    return decorador
+
+class _Fila:
+    """Valores de columna de una instancia ORM, sin referencia a la instancia ni a su sesión"""
+    __slots__ = ("clase", "valores")
+
+    def __init__(self, clase: type, valores: Dict[str, Any]):
+        self.clase = clase
+        self.valores = valores
+
+def _columnas(resultado: Any) -> Any:
+    """Copia los valores de columna cargados de las instancias ORM de un resultado"""
+    if isinstance(resultado, list):
+        return [_columnas(r) for r in resultado]
+    estado = inspect(resultado, raiseerr=False)
+    if estado is not None:
+        cargados = estado.dict
+        return _Fila(type(resultado), {
+            columna.key: cargados[columna.key]
+            for columna in estado.mapper.column_attrs if columna.key in cargados
+        })
+    return resultado
+
+def _adoptar(db: Session, resultado: Any) -> Any:
+    """Arma en `db` instancias ORM propias a partir de los valores copiados por el líder"""
+    if isinstance(resultado, list):
+        return [_adoptar(db, r) for r in resultado]
+    if isinstance(resultado, _Fila):
+        instancia = resultado.clase(**resultado.valores)
+        # Como recién leída de la base: lo que no se cargó se lee al usarlo (en `db`)
+        make_transient_to_detached(instancia)
+        return db.merge(instancia, load=False)
+    return resultado
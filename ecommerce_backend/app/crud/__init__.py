@@ -4,6 +4,8 @@ from .usuario import (
     get_user_by_id,
     create_user,
     authenticate_user,
+    authenticate_user_async,
+    update_password_hash,
     update_user,
     deactivate_user,
     get_user_public_info
@@ -43,12 +45,55 @@ from .mensaje import (
     get_mensajes_no_leidos_count
 )
 
+from .pedido import (
+    get_pedidos_usuario,
+    create_pedido
+)
+
+from .venta import (
+    registrar_ventas_pedido,
+    get_ventas_diarias,
+    get_ventas_por_producto,
+    reconstruir_ventas_diarias
+)
+
+from .ranking import (
+    registrar_ventas_ranking,
+    registrar_calificacion_ranking,
+    reconstruir_puntajes
+)
+
+from .recomendacion import (
+    registrar_coocurrencias_pedido,
+    refrescar_top_k_pendientes,
+    get_productos_relacionados,
+    reconstruir_coocurrencias
+)
+
+from .disponibilidad import (
+    cargar_disponibilidad,
+    username_disponible,
+    email_disponible,
+    registrar_usuario_tomado
+)
+
+from .sesion import (
+    crear_sesion,
+    rotar_refresh_token,
+    revocar_sesion,
+    sesion_revocada,
+    cargar_revocaciones,
+    purgar_sesiones_vencidas
+)
+
 __all__ = [
     "get_user_by_email",
     "get_user_by_username",
     "get_user_by_id", 
     "create_user",
     "authenticate_user",
+    "authenticate_user_async",
+    "update_password_hash",
     "update_user",
     "deactivate_user",
     "get_user_public_info",
@@ -68,5 +113,28 @@ __all__ = [
     "get_estadisticas_calificaciones",
     "create_calificacion",
     "update_calificacion",
-    "delete_calificacion"
+    "delete_calificacion",
+    "get_pedidos_usuario",
+    "create_pedido",
+    "registrar_ventas_pedido",
+    "get_ventas_diarias",
+    "get_ventas_por_producto",
+    "reconstruir_ventas_diarias",
+    "registrar_ventas_ranking",
+    "registrar_calificacion_ranking",
+    "reconstruir_puntajes",
+    "registrar_coocurrencias_pedido",
+    "refrescar_top_k_pendientes",
+    "get_productos_relacionados",
+    "reconstruir_coocurrencias",
+    "crear_sesion",
+    "rotar_refresh_token",
+    "revocar_sesion",
+    "sesion_revocada",
+    "cargar_revocaciones",
+    "purgar_sesiones_vencidas",
+    "cargar_disponibilidad",
+    "username_disponible",
+    "email_disponible",
+    "registrar_usuario_tomado"
 ]
\ No newline at end of file
@@ -5,6 +5,10 @@ from datetime import datetime
 from app.models.calificacion import CalificacionProducto
 from app.models.usuario import Usuario
 from app.schemas.calificacion import CalificacionCreate, CalificacionUpdate
+from app.crud.utils import ejecutar_escritura
+from app.core.cache_respuestas import invalidar_calificaciones
+from app.core.single_flight import coalescer
+from app.crud.ranking import registrar_calificacion_ranking
 
 def get_calificacion_by_id(db: Session, calificacion_id: int) -> Optional[CalificacionProducto]:
     """Obtiene una calificación por su ID"""
@@ -23,6 +27,7 @@ def get_calificacion_usuario_producto(
         )
     ).first()
 
+@coalescer("calificaciones")
 def get_calificaciones_producto(
     db: Session,
     producto_id: int,
@@ -34,6 +39,7 @@ def get_calificaciones_producto(
         CalificacionProducto.producto_id == producto_id
     ).order_by(CalificacionProducto.created_at.desc()).offset(skip).limit(limit).all()
 
+@coalescer("calificaciones")
 def get_promedio_calificacion(db: Session, producto_id: int) -> float:
     """Calcula el promedio de calificaciones de un producto"""
     resultado = db.query(
@@ -44,6 +50,7 @@ def get_promedio_calificacion(db: Session, producto_id: int) -> float:
     
     return round(float(resultado), 2) if resultado else 0.0
 
+@coalescer("calificaciones")
 def get_estadisticas_calificaciones(db: Session, producto_id: int) -> Dict:
     """Obtiene estadísticas detalladas de calificaciones de un producto"""
     total = db.query(CalificacionProducto).filter(
@@ -86,22 +93,26 @@ def create_calificacion(
     calificacion: CalificacionCreate
 ) -> CalificacionProducto:
     """Crea una nueva calificación para un producto"""
-    calificacion_existente = get_calificacion_usuario_producto(db, usuario_id, producto_id)
-    if calificacion_existente:
-        raise ValueError("Ya has calificado este producto. Usa el endpoint de actualización.")
-    
-    db_calificacion = CalificacionProducto(
-        producto_id=producto_id,
-        usuario_id=usuario_id,
-        puntuacion=calificacion.puntuacion,
-        comentario=calificacion.comentario,
-        created_at=datetime.utcnow()
-    )
-    
-    db.add(db_calificacion)
-    db.commit()
-    db.refresh(db_calificacion)
+    def _crear(session: Session) -> CalificacionProducto:
+        calificacion_existente = get_calificacion_usuario_producto(session, usuario_id, producto_id)
+        if calificacion_existente:
+            raise ValueError("Ya has calificado este producto. Usa el endpoint de actualización.")
+        
+        db_calificacion = CalificacionProducto(
+            producto_id=producto_id,
+            usuario_id=usuario_id,
+            puntuacion=calificacion.puntuacion,
+            comentario=calificacion.comentario,
+            created_at=datetime.utcnow()
+        )
+        
+        session.add(db_calificacion)
+        session.flush()
+        registrar_calificacion_ranking(session, producto_id, calificacion.puntuacion, 1)
+        return db_calificacion
     
+    db_calificacion = ejecutar_escritura(db, _crear)
+    invalidar_calificaciones(producto_id)
     return db_calificacion
 
 def update_calificacion(
@@ -114,11 +125,17 @@ def update_calificacion(
     if not db_calificacion:
         return None
     
-    update_data = calificacion_update.dict(exclude_unset=True)
+    puntuacion_anterior = db_calificacion.puntuacion
+    update_data = calificacion_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_calificacion, field, value)
     
+    if db_calificacion.puntuacion != puntuacion_anterior:
+        registrar_calificacion_ranking(
+            db, db_calificacion.producto_id, db_calificacion.puntuacion - puntuacion_anterior, 0
+        )
     db.commit()
+    invalidar_calificaciones(db_calificacion.producto_id)
     db.refresh(db_calificacion)
     return db_calificacion
 
@@ -128,6 +145,9 @@ def delete_calificacion(db: Session, calificacion_id: int) -> bool:
     if not db_calificacion:
         return False
     
+    producto_id = db_calificacion.producto_id
+    registrar_calificacion_ranking(db, producto_id, -db_calificacion.puntuacion, -1)
     db.delete(db_calificacion)
     db.commit()
+    invalidar_calificaciones(producto_id)
     return True
\ No newline at end of file
@@ -0,0 +1,107 @@
+# app/crud/disponibilidad.py
+# Disponibilidad de username/email en memoria para el formulario de registro
+import threading
+import time
+from typing import Optional, Set
+from sqlalchemy.orm import Session
+from app.models.usuario import Usuario
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+
+# El filtro de Bloom responde "disponible" sin mirar nada más en casi todos los
+# casos; ante un posible positivo, el set confirma si el valor está tomado.
+# Los usuarios creados por otros procesos se traen cada DISPONIBILIDAD_SYNC_SECONDS.
+# El registro igual valida contra los índices únicos: esto es solo una ayuda.
+
+class _EstadoDisponibilidad:
+    def __init__(self):
+        self.filtro: Optional[BloomFilter] = None
+        self.tomados: Set[str] = set()
+        self.max_id = 0
+        self.ultima_sincronizacion = 0.0
+        self.lock = threading.Lock()
+
+_estado = _EstadoDisponibilidad()
+
+def _clave_username(username: str) -> str:
+    return f"u:{username}"
+
+def _clave_email(email: str) -> str:
+    return f"e:{email}"
+
+def _agregar(username: str, email: str) -> None:
+    for clave in (_clave_username(username), _clave_email(email)):
+        _estado.filtro.add(clave)
+        _estado.tomados.add(clave)
+
+def cargar_disponibilidad(db: Session) -> int:
+    """
+    Carga todos los usernames y emails existentes (al iniciar la aplicación)
+
+    Returns:
+        Cantidad de usuarios cargados
+    """
+    total = db.query(Usuario).count()
+    filtro = BloomFilter(max(settings.DISPONIBILIDAD_BLOOM_CAPACIDAD, total * 4))
+    tomados: Set[str] = set()
+    max_id = 0
+    for usuario_id, username, email in db.query(
+        Usuario.id, Usuario.username, Usuario.email
+    ).yield_per(5000):
+        for clave in (_clave_username(username), _clave_email(email)):
+            filtro.add(clave)
+            tomados.add(clave)
+        max_id = max(max_id, usuario_id)
+
+    with _estado.lock:
+        _estado.filtro = filtro
+        _estado.tomados = tomados
+        _estado.max_id = max_id
+        _estado.ultima_sincronizacion = time.monotonic()
+    return len(tomados) // 2
+
+def _sincronizar(db: Session) -> None:
+    """Trae los usuarios creados desde la última vez (si toca)"""
+    if _estado.filtro is None or _estado.filtro.saturado:
+        cargar_disponibilidad(db)
+        return
+    if time.monotonic() - _estado.ultima_sincronizacion < settings.DISPONIBILIDAD_SYNC_SECONDS:
+        return
+
+    with _estado.lock:
+        if time.monotonic() - _estado.ultima_sincronizacion < settings.DISPONIBILIDAD_SYNC_SECONDS:
+            return
+        nuevos = db.query(Usuario.id, Usuario.username, Usuario.email).filter(
+            Usuario.id > _estado.max_id
+        )
+        for usuario_id, username, email in nuevos:
+            _agregar(username, email)
+            _estado.max_id = max(_estado.max_id, usuario_id)
+        _estado.ultima_sincronizacion = time.monotonic()
+
+def _disponible(clave: str) -> bool:
+    if clave not in _estado.filtro:
+        return True
+    return clave not in _estado.tomados
+
+def username_disponible(db: Session, username: str) -> bool:
+    """True si nadie usa el username (según lo conocido por este proceso)"""
+    _sincronizar(db)
+    return _disponible(_clave_username(username))
+
+def email_disponible(db: Session, email: str) -> bool:
+    """
+    True si nadie usa el email (según lo conocido por este proceso)
+
+    El email tiene que venir normalizado como EmailStr (así se guarda al
+    registrar): 'Ana@EXAMPLE.com' y 'Ana@example.com' son el mismo.
+    """
+    _sincronizar(db)
+    return _disponible(_clave_email(email))
+
+def registrar_usuario_tomado(username: str, email: str) -> None:
+    """Marca como tomados el username y email de un usuario recién creado"""
+    if _estado.filtro is None:
+        return
+    with _estado.lock:
+        _agregar(username, email)
@@ -4,6 +4,7 @@ from typing import Optional, List
 from datetime import datetime
 from app.models.mensaje import Conversacion, Mensaje
 from app.models.usuario import Usuario
+from app.crud.utils import ejecutar_escritura
 
 def get_conversacion_by_id(db: Session, conversacion_id: int) -> Optional[Conversacion]:
     """Obtiene una conversación por su ID"""
@@ -55,20 +56,22 @@ def get_mensajes_conversacion(db: Session, conversacion_id: int, skip: int = 0,
 
 def create_mensaje(db: Session, conversacion_id: int, remitente_id: int, contenido: str) -> Mensaje:
     """Crea un nuevo mensaje en una conversación"""
-    db_mensaje = Mensaje(
-        conversacion_id=conversacion_id,
-        remitente_id=remitente_id,
-        contenido=contenido,
-        created_at=datetime.utcnow(),
-        is_read=False
-    )
-    db.add(db_mensaje)
-    conversacion = get_conversacion_by_id(db, conversacion_id)
-    if conversacion:
-        conversacion.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(db_mensaje)
-    return db_mensaje
+    def _crear(session: Session) -> Mensaje:
+        db_mensaje = Mensaje(
+            conversacion_id=conversacion_id,
+            remitente_id=remitente_id,
+            contenido=contenido,
+            created_at=datetime.utcnow(),
+            is_read=False
+        )
+        session.add(db_mensaje)
+        conversacion = get_conversacion_by_id(session, conversacion_id)
+        if conversacion:
+            conversacion.updated_at = datetime.utcnow()
+        session.flush()
+        return db_mensaje
+
+    return ejecutar_escritura(db, _crear)
 
 def marcar_mensajes_como_leidos(db: Session, conversacion_id: int, usuario_id: int) -> int:
     """Marca todos los mensajes como leídos"""
@@ -0,0 +1,195 @@
+# app/crud/pedido.py
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Dict, Iterator, List, Optional, Sequence, Any
+from datetime import date, datetime, time, timedelta
+from app.models.pedido import Pedido, ItemPedido
+from app.models.producto import Producto
+from app.crud.utils import ejecutar_escritura
+from app.core.cache_respuestas import invalidar_producto
+from app.crud.venta import registrar_ventas_pedido
+from app.crud.ranking import registrar_ventas_ranking
+from app.crud.recomendacion import registrar_coocurrencias_pedido
+
+def get_pedidos_usuario(db: Session, usuario_id: int) -> List[Pedido]:
+    """Obtiene los pedidos de un usuario"""
+    return db.query(Pedido).filter(Pedido.usuario_id == usuario_id).all()
+
+# Columnas de la exportación: una fila por item, con los datos de su pedido
+COLUMNAS_EXPORTACION = (
+    "pedido_id", "fecha_pedido", "estado", "comprador_id", "total_pedido", "direccion_envio",
+    "item_id", "producto_id", "producto_nombre", "vendedor_id", "cantidad", "precio_unitario", "subtotal"
+)
+# Sin el total del pedido: incluye lo que el comprador gastó con otros vendedores
+COLUMNAS_EXPORTACION_VENDEDOR = tuple(c for c in COLUMNAS_EXPORTACION if c != "total_pedido")
+
+def iterar_items_exportacion(
+    db: Session,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    vendedor_id: Optional[int] = None,
+    incluir_total: bool = True,
+    lote: int = 1000
+) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre pedidos e items_pedido sin cargarlos todos en memoria
+
+    Las filas se traen del cursor de a `lote` (yield_per). El rango usa
+    ix_pedidos_fecha_pedido y el vendedor ix_productos_vendedor_id /
+    ix_items_pedido_producto_id. Con filtros salen ordenadas por fecha del
+    pedido (con vendedor, SQLite ordena solo los items de ese vendedor); sin
+    filtros, por id de pedido, recorriendo ix_items_pedido_pedido_id en orden
+    para no ordenar la tabla entera.
+
+    Args:
+        desde, hasta: Días inclusive de fecha_pedido (None: sin límite)
+        vendedor_id: Solo los items de productos de ese vendedor
+        incluir_total: False para el export de un vendedor (ver COLUMNAS_EXPORTACION_VENDEDOR)
+    """
+    columnas = {
+        "pedido_id": Pedido.id.label("pedido_id"),
+        "fecha_pedido": Pedido.fecha_pedido,
+        "estado": Pedido.estado,
+        "comprador_id": Pedido.usuario_id.label("comprador_id"),
+        "total_pedido": Pedido.total.label("total_pedido"),
+        "direccion_envio": Pedido.direccion_envio,
+        "item_id": ItemPedido.id.label("item_id"),
+        "producto_id": ItemPedido.producto_id,
+        "producto_nombre": Producto.nombre.label("producto_nombre"),
+        "vendedor_id": Producto.vendedor_id,
+        "cantidad": ItemPedido.cantidad,
+        "precio_unitario": ItemPedido.precio_unitario,
+        "subtotal": ItemPedido.subtotal,
+    }
+    nombres = COLUMNAS_EXPORTACION if incluir_total else COLUMNAS_EXPORTACION_VENDEDOR
+    stmt = (
+        select(*(columnas[nombre] for nombre in nombres))
+        .join(ItemPedido, ItemPedido.pedido_id == Pedido.id)
+        .join(Producto, Producto.id == ItemPedido.producto_id)
+    )
+    if desde is not None:
+        stmt = stmt.where(Pedido.fecha_pedido >= datetime.combine(desde, time.min))
+    if hasta is not None:
+        stmt = stmt.where(Pedido.fecha_pedido < datetime.combine(hasta + timedelta(days=1), time.min))
+    if vendedor_id is not None:
+        stmt = stmt.where(Producto.vendedor_id == vendedor_id)
+
+    if desde is None and hasta is None and vendedor_id is None:
+        stmt = stmt.order_by(ItemPedido.pedido_id, ItemPedido.id)
+    else:
+        stmt = stmt.order_by(Pedido.fecha_pedido, Pedido.id, ItemPedido.id)
+
+    for fila in db.execute(stmt.execution_options(yield_per=lote)).mappings():
+        yield fila
+
+def create_pedido(db: Session, usuario_id: int, items: Sequence[Any]) -> Dict:
+    """
+    Crea un pedido con sus items y descuenta el stock
+
+    Args:
+        db: Sesión de la base de datos
+        usuario_id: ID del comprador
+        items: Items con producto_id, cantidad y precio_unitario
+
+    Returns:
+        Resumen del pedido creado
+
+    Raises:
+        LookupError: Si algún producto no existe
+        ValueError: Si no hay stock suficiente
+    """
+    def _crear(session: Session) -> Dict:
+        # Calcular total y validar productos
+        total_pedido = 0
+        items_validados = []
+
+        for item in items:
+            # Verificar que el producto existe
+            producto = session.query(Producto).filter(Producto.id == item.producto_id).first()
+            if not producto:
+                raise LookupError(f"Producto {item.producto_id} no encontrado")
+
+            # Verificar stock
+            if producto.stock < item.cantidad:
+                raise ValueError(f"Stock insuficiente para {producto.nombre}")
+
+            total_pedido += item.precio_unitario * item.cantidad
+            items_validados.append({
+                "producto": producto,
+                "cantidad": item.cantidad,
+                "precio_unitario": item.precio_unitario,
+                "subtotal": item.precio_unitario * item.cantidad
+            })
+
+        # Crear pedido principal
+        nuevo_pedido = Pedido(
+            usuario_id=usuario_id,
+            total=total_pedido,
+            estado="pendiente",
+            direccion_envio="Dirección por defecto",
+            fecha_pedido=datetime.now()
+        )
+        session.add(nuevo_pedido)
+        session.flush()  # Para obtener ID
+
+        # Crear items y actualizar stock
+        items_creados = []
+        for item_data in items_validados:
+            item_pedido = ItemPedido(
+                pedido_id=nuevo_pedido.id,
+                producto_id=item_data["producto"].id,
+                cantidad=item_data["cantidad"],
+                precio_unitario=item_data["precio_unitario"],
+                subtotal=item_data["subtotal"]
+            )
+            session.add(item_pedido)
+
+            # Reducir stock
+            item_data["producto"].stock -= item_data["cantidad"]
+
+            items_creados.append({
+                "producto_id": item_data["producto"].id,
+                "nombre": item_data["producto"].nombre,
+                "cantidad": item_data["cantidad"],
+                "precio_unitario": item_data["precio_unitario"],
+                "subtotal": item_data["subtotal"]
+            })
+
+        # Rollup de ventas diarias en la misma transacción
+        registrar_ventas_pedido(
+            session,
+            nuevo_pedido.fecha_pedido,
+            [
+                (item_data["producto"], item_data["cantidad"], item_data["subtotal"])
+                for item_data in items_validados
+            ]
+        )
+
+        # Puntajes de best_selling / trending
+        registrar_ventas_ranking(
+            session,
+            nuevo_pedido.fecha_pedido,
+            [
+                (item_data["producto"].id, item_data["cantidad"])
+                for item_data in items_validados
+            ]
+        )
+
+        # Pares "comprados juntos" y top-K de recomendaciones
+        registrar_coocurrencias_pedido(
+            session, [item_data["producto"].id for item_data in items_validados]
+        )
+
+        session.flush()
+        return {
+            "pedido_id": nuevo_pedido.id,
+            "total": float(total_pedido),
+            "items": items_creados,
+            "estado": "pendiente"
+        }
+
+    resumen = ejecutar_escritura(db, _crear)
+    # El stock de cada producto cambió
+    for item in resumen["items"]:
+        invalidar_producto(item["producto_id"])
+    return resumen
@@ -1,30 +1,58 @@
 # app/crud/producto.py
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, desc
-from typing import Optional, List
+from typing import Optional, List, Sequence
 from app.models.producto import Producto
 from app.models.usuario import Usuario
 from app.schemas.producto import ProductoCreate, ProductoUpdate
-from sqlalchemy.orm import Session, joinedload 
+from app.crud.utils import ejecutar_escritura
+from app.core.cache_respuestas import invalidar_producto
+from app.core.single_flight import coalescer
+from app.crud.ranking import orden_ranking
+from app.models.ranking import PuntajeProducto
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import and_, or_, desc
 
-def get_producto_by_id(db: Session, producto_id: int) -> Optional[Producto]:
+def _opciones_carga(columnas: Optional[Sequence[str]]) -> list:
+    """
+    Opciones de carga según la proyección pedida
+
+    Sin proyección se carga la fila completa (el vendedor no forma parte de
+    las respuestas: no se trae). Con proyección solo se leen las columnas
+    pedidas (la PK siempre se incluye).
+    """
+    if columnas is None:
+        return []
+    return [load_only(*(getattr(Producto, c) for c in columnas if c in Producto.__table__.c))]
+
+@coalescer("productos")
+def get_producto_by_id(
+    db: Session,
+    producto_id: int,
+    columnas: Optional[Sequence[str]] = None
+) -> Optional[Producto]:
     """Obtiene un producto por su ID"""
-    return db.query(Producto).options(joinedload(Producto.vendedor)).filter(Producto.id == producto_id).first()
+    return db.query(Producto).options(*_opciones_carga(columnas)).filter(Producto.id == producto_id).first()
 
 
+@coalescer("productos")
 def get_productos(
     db: Session, 
     skip: int = 0, 
     limit: int = 100,
     categoria: Optional[str] = None,
     vendedor_id: Optional[int] = None,
-    activos_solo: bool = True
+    activos_solo: bool = True,
+    orden: Optional[str] = None,
+    columnas: Optional[Sequence[str]] = None
 ) -> List[Producto]:
     """
     Obtiene una lista de productos con filtros opcionales
+    
+    orden: None (más recientes), "trending", "best_selling" o "top_rated"
+    columnas: si se indica, solo se leen esas columnas (sin el vendedor)
     """
-    query = db.query(Producto).options(joinedload(Producto.vendedor))
+    query = db.query(Producto).options(*_opciones_carga(columnas))
     
     # Aplicar filtros
     if activos_solo:
@@ -36,11 +64,23 @@ def get_productos(
     if vendedor_id:
         query = query.filter(Producto.vendedor_id == vendedor_id)
     
-    # Ordenar por más recientes primero
-    query = query.order_by(desc(Producto.created_at))
+    query = _aplicar_orden(query, orden)
     
     return query.offset(skip).limit(limit).all()
 
+def _aplicar_orden(query, orden: Optional[str]):
+    """Ordena por un ranking precalculado o, por defecto, por más recientes primero"""
+    if not orden:
+        return query.order_by(desc(Producto.created_at))
+    
+    # Los puntajes viven en puntajes_producto (una fila por producto, columnas
+    # indexadas): con INNER JOIN SQLite recorre el índice del puntaje en orden
+    # y busca cada producto por PK, sin ordenar el catálogo entero
+    return query.join(
+        PuntajeProducto, PuntajeProducto.producto_id == Producto.id
+    ).order_by(*orden_ranking(orden))
+
+@coalescer("productos")
 def get_productos_count(
     db: Session,
     categoria: Optional[str] = None,
@@ -61,12 +101,20 @@ def get_productos_count(
     
     return query.count()
 
-def search_productos(db: Session, search_term: str, skip: int = 0, limit: int = 100) -> List[Producto]:
+@coalescer("productos")
+def search_productos(
+    db: Session,
+    search_term: str,
+    skip: int = 0,
+    limit: int = 100,
+    orden: Optional[str] = None,
+    columnas: Optional[Sequence[str]] = None
+) -> List[Producto]:
     """
     Busca productos por nombre o descripción
     """
     search_pattern = f"%{search_term}%"
-    return db.query(Producto).options(joinedload(Producto.vendedor)).filter(
+    query = db.query(Producto).options(*_opciones_carga(columnas)).filter(
         and_(
             Producto.is_active == True,
             or_(
@@ -74,26 +122,35 @@ def search_productos(db: Session, search_term: str, skip: int = 0, limit: int =
                 Producto.descripcion.ilike(search_pattern)
             )
         )
-    ).offset(skip).limit(limit).all()
+    )
+    if orden:
+        query = _aplicar_orden(query, orden)
+    return query.offset(skip).limit(limit).all()
 
 def create_producto(db: Session, producto: ProductoCreate, vendedor_id: int) -> Producto:
     """
     Crea un nuevo producto asociado a un vendedor
     """
-    db_producto = Producto(
-        nombre=producto.nombre,
-        descripcion=producto.descripcion,
-        precio=producto.precio,
-        stock=producto.stock,
-        categoria=producto.categoria,
-        imagen_url=producto.imagen_url,
-        vendedor_id=vendedor_id
-    )
-    
-    db.add(db_producto)
-    db.commit()
-    db.refresh(db_producto)
+    def _crear(session: Session) -> Producto:
+        db_producto = Producto(
+            nombre=producto.nombre,
+            descripcion=producto.descripcion,
+            precio=producto.precio,
+            stock=producto.stock,
+            categoria=producto.categoria,
+            imagen_url=producto.imagen_url,
+            vendedor_id=vendedor_id
+        )
+        
+        session.add(db_producto)
+        session.flush()
+        # Su fila de puntajes (sin ventas ni calificaciones) para los listados ordenados
+        session.add(PuntajeProducto(producto_id=db_producto.id))
+        session.flush()
+        return db_producto
     
+    db_producto = ejecutar_escritura(db, _crear)
+    invalidar_producto(db_producto.id)
     return db_producto
 
 def update_producto(
@@ -109,11 +166,12 @@ def update_producto(
         return None
     
     # Actualizar solo los campos proporcionados
-    update_data = producto_update.dict(exclude_unset=True)
+    update_data = producto_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_producto, field, value)
     
     db.commit()
+    invalidar_producto(producto_id)
     db.refresh(db_producto)
     return db_producto
 
@@ -127,6 +185,7 @@ def delete_producto(db: Session, producto_id: int) -> bool:
     
     db_producto.is_active = False
     db.commit()
+    invalidar_producto(producto_id)
     return True
 
 def is_producto_owner(db: Session, producto_id: int, usuario_id: int) -> bool:
@@ -0,0 +1,169 @@
+# app/crud/ranking.py
+import math
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Dict, Iterable, Optional, Tuple
+from datetime import datetime
+from app.models.ranking import PuntajeProducto, TENDENCIA_SIN_VENTAS, VALORACION_SIN_CALIFICACIONES
+from app.models.pedido import Pedido, ItemPedido
+from app.models.producto import Producto
+from app.models.calificacion import CalificacionProducto
+from app.core.config import settings
+from app.crud.utils import upsert_incrementos
+
+# Referencia fija para el decaimiento: el puntaje de tendencia es
+# log2(sum(cantidad * 2 ** (horas_desde_epoca / vida_media))). Como todas las
+# ventas se escalan igual, el orden es el mismo que con el decaimiento "real"
+# y no hace falta recalcular nada a medida que pasa el tiempo.
+EPOCA_TENDENCIA = datetime(2025, 1, 1)
+
+# Órdenes disponibles para el listado de productos
+ORDENES_RANKING = ("trending", "best_selling", "top_rated")
+
+def _exponente_tendencia(fecha: datetime) -> float:
+    horas = (fecha - EPOCA_TENDENCIA).total_seconds() / 3600
+    return horas / settings.RANKING_HALF_LIFE_HOURS
+
+def sumar_tendencia(actual: Optional[float], cantidad: int, fecha: datetime) -> float:
+    """Suma una venta al puntaje de tendencia (log2 de una suma, sin overflow)"""
+    nuevo = math.log2(cantidad) + _exponente_tendencia(fecha)
+    if actual is None or actual <= TENDENCIA_SIN_VENTAS:
+        return nuevo
+    mayor = max(actual, nuevo)
+    return mayor + math.log2(2 ** (actual - mayor) + 2 ** (nuevo - mayor))
+
+def calcular_valoracion(suma: int, cantidad: int) -> float:
+    """Promedio bayesiano: pocas calificaciones se acercan al promedio por defecto"""
+    if cantidad <= 0:
+        return VALORACION_SIN_CALIFICACIONES
+    peso = settings.RANKING_PESO_PRIOR
+    return (suma + peso * settings.RANKING_PRIOR_CALIFICACION) / (cantidad + peso)
+
+def _incrementar_puntaje(db: Session, producto_id: int, **incrementos: int) -> PuntajeProducto:
+    """
+    Suma los contadores de un producto y retorna su fila bloqueada para terminar de actualizarla
+
+    El INSERT ... ON CONFLICT DO UPDATE crea la fila si falta sin carreras entre
+    pedidos concurrentes, y deja la fila bloqueada hasta el commit (PostgreSQL);
+    en SQLite la transacción ya tiene el lock de escritura.
+    """
+    upsert_incrementos(db, PuntajeProducto.__table__, {"producto_id": producto_id}, incrementos)
+    return db.query(PuntajeProducto).filter(
+        PuntajeProducto.producto_id == producto_id
+    ).with_for_update().populate_existing().one()
+
+def registrar_ventas_ranking(
+    db: Session,
+    fecha_pedido: datetime,
+    items: Iterable[Tuple[int, int]]
+) -> None:
+    """
+    Actualiza los puntajes de venta con los items de un pedido
+
+    Args:
+        db: Sesión de la base de datos (misma transacción que el pedido)
+        fecha_pedido: Fecha del pedido
+        items: Tuplas (producto_id, cantidad)
+    """
+    cantidades: Dict[int, int] = {}
+    for producto_id, cantidad in items:
+        cantidades[producto_id] = cantidades.get(producto_id, 0) + cantidad
+
+    # Orden fijo de ids para que dos pedidos no se bloqueen mutuamente
+    for producto_id in sorted(cantidades):
+        puntaje = _incrementar_puntaje(db, producto_id, unidades_vendidas=cantidades[producto_id])
+        puntaje.tendencia = sumar_tendencia(puntaje.tendencia, cantidades[producto_id], fecha_pedido)
+        puntaje.updated_at = datetime.utcnow()
+
+def registrar_calificacion_ranking(
+    db: Session,
+    producto_id: int,
+    delta_suma: int,
+    delta_cantidad: int
+) -> None:
+    """
+    Ajusta la valoración de un producto
+
+    Para una calificación nueva: (puntuacion, 1); al modificarla:
+    (nueva - anterior, 0); al eliminarla: (-puntuacion, -1).
+    """
+    puntaje = _incrementar_puntaje(
+        db, producto_id, suma_puntuaciones=delta_suma, cantidad_calificaciones=delta_cantidad
+    )
+    puntaje.valoracion = calcular_valoracion(
+        puntaje.suma_puntuaciones, puntaje.cantidad_calificaciones
+    )
+    puntaje.updated_at = datetime.utcnow()
+
+def orden_ranking(orden: str):
+    """
+    Criterio ORDER BY (sobre puntajes_producto) para un orden del catálogo
+
+    El desempate por producto_id (rowid en SQLite) es el orden en que ya
+    están las entradas del índice: no hace falta ordenar nada más.
+    """
+    columnas = {
+        "trending": PuntajeProducto.tendencia,
+        "best_selling": PuntajeProducto.unidades_vendidas,
+        "top_rated": PuntajeProducto.valoracion
+    }
+    return columnas[orden].desc(), PuntajeProducto.producto_id.desc()
+
+def reconstruir_puntajes(db: Session) -> int:
+    """
+    Recalcula todos los puntajes desde items_pedido y calificaciones_producto
+
+    Returns:
+        Cantidad de productos con puntaje
+    """
+    puntajes: Dict[int, Dict] = {}
+
+    def _fila(producto_id: int) -> Dict:
+        return puntajes.setdefault(producto_id, {
+            "producto_id": producto_id,
+            "unidades_vendidas": 0,
+            "tendencia": TENDENCIA_SIN_VENTAS,
+            "suma_puntuaciones": 0,
+            "cantidad_calificaciones": 0,
+            "valoracion": VALORACION_SIN_CALIFICACIONES,
+            "updated_at": datetime.utcnow()
+        })
+
+    # Ventas: una fila por producto y pedido, recorrida en bloques
+    ventas = db.query(
+        ItemPedido.producto_id,
+        Pedido.fecha_pedido,
+        func.sum(ItemPedido.cantidad)
+    ).join(
+        Pedido, Pedido.id == ItemPedido.pedido_id
+    ).group_by(
+        ItemPedido.producto_id, Pedido.id, Pedido.fecha_pedido
+    ).yield_per(5000)
+
+    for producto_id, fecha_pedido, cantidad in ventas:
+        fila = _fila(producto_id)
+        fila["unidades_vendidas"] += int(cantidad)
+        fila["tendencia"] = sumar_tendencia(fila["tendencia"], int(cantidad), fecha_pedido)
+
+    calificaciones = db.query(
+        CalificacionProducto.producto_id,
+        func.sum(CalificacionProducto.puntuacion),
+        func.count(CalificacionProducto.id)
+    ).group_by(CalificacionProducto.producto_id)
+
+    for producto_id, suma, cantidad in calificaciones:
+        fila = _fila(producto_id)
+        fila["suma_puntuaciones"] = int(suma)
+        fila["cantidad_calificaciones"] = int(cantidad)
+        fila["valoracion"] = calcular_valoracion(int(suma), int(cantidad))
+
+    # Una fila por producto existente (también sin ventas ni calificaciones),
+    # ignorando items de productos borrados
+    existentes = {pid for (pid,) in db.query(Producto.id)}
+    filas = [_fila(pid) for pid in sorted(existentes)]
+
+    db.query(PuntajeProducto).delete()
+    if filas:
+        db.execute(PuntajeProducto.__table__.insert(), filas)
+    db.commit()
+    return len(filas)
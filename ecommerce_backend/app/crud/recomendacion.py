@@ -0,0 +1,148 @@
+# app/crud/recomendacion.py
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, select, delete
+import threading
+from typing import Iterable, List, Optional, Sequence, Set
+from app.models.recomendacion import ProductoCompradoJunto, ProductoRelacionado
+from app.models.pedido import ItemPedido
+from app.models.producto import Producto
+from app.core.config import settings
+from app.crud.utils import ejecutar_escritura, upsert_incrementos_lote
+
+# Productos cuyo top-K quedó desactualizado por pedidos nuevos (por proceso).
+# Se regeneran en lote fuera de la transacción del pedido (ver refrescar_top_k_pendientes).
+_pendientes: Set[int] = set()
+_pendientes_lock = threading.Lock()
+
+def _regenerar_top_k(db: Session, producto_ids: Optional[Sequence[int]] = None) -> None:
+    """
+    Regenera el top-K de los productos indicados (o de todos) con dos sentencias
+
+    Una función de ventana numera los vecinos de cada producto sobre el
+    índice de pares; no hay una consulta por producto.
+    """
+    borrar = delete(ProductoRelacionado)
+    pares = select(ProductoCompradoJunto)
+    if producto_ids is not None:
+        borrar = borrar.where(ProductoRelacionado.producto_id.in_(producto_ids))
+        pares = pares.where(ProductoCompradoJunto.producto_id.in_(producto_ids))
+    pares = pares.subquery()
+
+    posicion = func.row_number().over(
+        partition_by=pares.c.producto_id,
+        order_by=(pares.c.veces.desc(), pares.c.relacionado_id)
+    ).label("posicion")
+    ranking = select(
+        pares.c.producto_id,
+        pares.c.relacionado_id,
+        pares.c.veces,
+        posicion
+    ).subquery()
+
+    db.execute(borrar)
+    db.execute(
+        ProductoRelacionado.__table__.insert().from_select(
+            ["producto_id", "relacionado_id", "veces", "posicion"],
+            select(
+                ranking.c.producto_id,
+                ranking.c.relacionado_id,
+                ranking.c.veces,
+                ranking.c.posicion - 1
+            ).where(ranking.c.posicion <= settings.RECOMENDACIONES_TOP_K)
+        )
+    )
+
+def registrar_coocurrencias_pedido(db: Session, producto_ids: Iterable[int]) -> None:
+    """
+    Suma un pedido a los contadores de "comprados juntos"
+
+    Se llama dentro de la misma transacción que crea el pedido: todos los
+    pares van en un solo executemany, y solo se cuentan los primeros
+    RECOMENDACIONES_MAX_PRODUCTOS productos distintos (a lo sumo n·(n−1)
+    filas). Los top-K se regeneran después, en lote (refrescar_top_k_pendientes).
+    """
+    productos = list(dict.fromkeys(producto_ids))[:settings.RECOMENDACIONES_MAX_PRODUCTOS]
+    if len(productos) < 2:
+        return
+    productos.sort()
+
+    upsert_incrementos_lote(
+        db,
+        ProductoCompradoJunto.__table__,
+        ("producto_id", "relacionado_id"),
+        [
+            {"producto_id": producto_id, "relacionado_id": relacionado_id, "veces": 1}
+            for producto_id in productos
+            for relacionado_id in productos
+            if producto_id != relacionado_id
+        ]
+    )
+
+    with _pendientes_lock:
+        _pendientes.update(productos)
+
+def refrescar_top_k_pendientes(db: Session) -> int:
+    """
+    Regenera en una transacción los top-K de los productos con pedidos nuevos
+
+    Returns:
+        Cantidad de productos actualizados
+    """
+    with _pendientes_lock:
+        producto_ids = sorted(_pendientes)
+        _pendientes.clear()
+    if not producto_ids:
+        return 0
+
+    try:
+        for inicio in range(0, len(producto_ids), 500):
+            lote = producto_ids[inicio:inicio + 500]
+            ejecutar_escritura(db, lambda session, lote=lote: _regenerar_top_k(session, lote))
+    except Exception:
+        # Se reintentan en el próximo refresco
+        with _pendientes_lock:
+            _pendientes.update(producto_ids)
+        raise
+    return len(producto_ids)
+
+def get_productos_relacionados(db: Session, producto_id: int) -> List[Producto]:
+    """
+    Productos comprados frecuentemente junto a un producto
+
+    Una sola consulta por clave primaria sobre el top-K precalculado (sin self-join).
+    """
+    return db.query(Producto).join(
+        ProductoRelacionado, ProductoRelacionado.relacionado_id == Producto.id
+    ).filter(
+        ProductoRelacionado.producto_id == producto_id,
+        Producto.is_active == True
+    ).order_by(ProductoRelacionado.posicion).all()
+
+def reconstruir_coocurrencias(db: Session) -> int:
+    """
+    Recalcula los pares y todos los top-K en batch desde items_pedido
+
+    Returns:
+        Cantidad de pares (en ambas direcciones)
+    """
+    a = aliased(ItemPedido)
+    b = aliased(ItemPedido)
+    pares = select(
+        a.producto_id,
+        b.producto_id,
+        func.count(func.distinct(a.pedido_id))
+    ).join(
+        b, (b.pedido_id == a.pedido_id) & (b.producto_id != a.producto_id)
+    ).group_by(a.producto_id, b.producto_id)
+
+    db.execute(delete(ProductoCompradoJunto))
+    resultado = db.execute(
+        ProductoCompradoJunto.__table__.insert().from_select(
+            ["producto_id", "relacionado_id", "veces"], pares
+        )
+    )
+
+    # Top-K de todos los productos de una vez
+    _regenerar_top_k(db)
+    db.commit()
+    return resultado.rowcount
@@ -0,0 +1,212 @@
+# app/crud/sesion.py
+# Refresh tokens con rotación y revocación de sesiones
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+from app.models.sesion import RefreshToken, SesionRevocada
+from app.core.bloom import BloomFilter
+from app.core.bus_invalidacion import bus_invalidacion
+from app.core.config import settings
+from app.core.security import create_refresh_token, nuevo_id_token
+from app.crud.utils import ejecutar_escritura
+
+# --- Revocaciones en memoria ---
+# El filtro de Bloom responde "no revocada" sin consultar la base. Solo ante un
+# posible positivo se confirma contra sesiones_revocadas. Cada proceso trae las
+# revocaciones de los demás cada REVOCACION_SYNC_SECONDS (las de id mayor al
+# último visto). La carga completa se hace al iniciar la aplicación.
+
+class _EstadoRevocaciones:
+    def __init__(self):
+        self.filtro: Optional[BloomFilter] = None
+        self.max_id = 0
+        self.ultima_sincronizacion = 0.0
+        self.lock = threading.Lock()
+
+_revocaciones = _EstadoRevocaciones()
+
+def cargar_revocaciones(db: Session) -> int:
+    """
+    Reconstruye el filtro desde la base (al iniciar la aplicación o si se saturó)
+
+    Returns:
+        Cantidad de sesiones revocadas cargadas
+    """
+    with _revocaciones.lock:
+        return _cargar_revocaciones(db)
+
+def _cargar_revocaciones(db: Session) -> int:
+    # Se llama con _revocaciones.lock tomado: una sola recarga a la vez
+    total = db.query(SesionRevocada).count()
+    filtro = BloomFilter(max(settings.REVOCACION_BLOOM_CAPACIDAD, total * 4))
+    max_id = 0
+    for revocacion_id, familia in db.query(SesionRevocada.id, SesionRevocada.familia).yield_per(5000):
+        filtro.add(familia)
+        max_id = max(max_id, revocacion_id)
+
+    _revocaciones.filtro = filtro
+    _revocaciones.max_id = max_id
+    _revocaciones.ultima_sincronizacion = time.monotonic()
+    return filtro.elementos
+
+def purgar_sesiones_vencidas(db: Session) -> None:
+    """
+    Borra refresh tokens y revocaciones que ya no pueden usarse
+
+    Corre en segundo plano (ver main). Las familias borradas siguen en el
+    filtro hasta la próxima recarga: solo cuestan una consulta por clave.
+    """
+    ahora = datetime.utcnow()
+
+    def _purgar(session: Session) -> None:
+        session.execute(delete(SesionRevocada).where(SesionRevocada.expira_en < ahora))
+        session.execute(delete(RefreshToken).where(RefreshToken.expira_en < ahora))
+
+    ejecutar_escritura(db, _purgar)
+
+def _sincronizar_revocaciones(db: Session) -> None:
+    """Agrega al filtro las revocaciones hechas por otros procesos (si toca)"""
+    estado = _revocaciones
+    filtro = estado.filtro
+    if (
+        filtro is not None and not filtro.saturado
+        and time.monotonic() - estado.ultima_sincronizacion < settings.REVOCACION_SYNC_SECONDS
+    ):
+        return
+
+    with estado.lock:
+        # Otro hilo pudo haber recargado o sincronizado mientras se esperaba el lock
+        if estado.filtro is None or estado.filtro.saturado:
+            _cargar_revocaciones(db)
+            return
+        if time.monotonic() - estado.ultima_sincronizacion < settings.REVOCACION_SYNC_SECONDS:
+            return
+        nuevas = db.query(SesionRevocada.id, SesionRevocada.familia).filter(
+            SesionRevocada.id > estado.max_id
+        )
+        for revocacion_id, familia in nuevas:
+            estado.filtro.add(familia)
+            estado.max_id = max(estado.max_id, revocacion_id)
+        estado.ultima_sincronizacion = time.monotonic()
+
+def _buscar_revocada(db: Session, familia: str) -> Optional[SesionRevocada]:
+    return db.query(SesionRevocada).filter(SesionRevocada.familia == familia).first()
+
+def sesion_revocada(db: Session, familia: str) -> bool:
+    """
+    Indica si una familia de tokens fue revocada
+
+    Casi siempre se resuelve en memoria; solo un posible positivo del filtro
+    consulta la base (y de paso descarta los falsos positivos).
+    """
+    _sincronizar_revocaciones(db)
+    if familia not in _revocaciones.filtro:
+        return False
+    return _buscar_revocada(db, familia) is not None
+
+# --- Refresh tokens ---
+
+def _guardar_refresh_token(session: Session, usuario_id: int, username: str, familia: str) -> str:
+    jti = nuevo_id_token()
+    token, expira_en = create_refresh_token(username, familia, jti)
+    session.add(RefreshToken(jti=jti, familia=familia, usuario_id=usuario_id, expira_en=expira_en))
+    session.flush()
+    return token
+
+def crear_sesion(db: Session, usuario_id: int, username: str) -> Tuple[str, str]:
+    """
+    Inicia una familia de tokens nueva (login o registro)
+
+    Returns:
+        (refresh_token, familia)
+    """
+    familia = nuevo_id_token()
+
+    def _crear(session: Session) -> str:
+        return _guardar_refresh_token(session, usuario_id, username, familia)
+
+    return ejecutar_escritura(db, _crear), familia
+
+def _revocar(session: Session, familia: str, usuario_id: int, motivo: str) -> None:
+    if _buscar_revocada(session, familia) is None:
+        session.add(SesionRevocada(
+            familia=familia,
+            usuario_id=usuario_id,
+            motivo=motivo,
+            expira_en=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        ))
+        session.flush()
+
+def _marcar_revocada(familia: str) -> None:
+    """Las revocaciones entran al filtro de inmediato, en este y en los demás workers (bus)"""
+    bus_invalidacion.publicar("sesion", familia)
+
+def _agregar_revocada(familia: str) -> None:
+    if _revocaciones.filtro is not None:
+        _revocaciones.filtro.add(familia)
+
+bus_invalidacion.suscribir("sesion", _agregar_revocada)
+
+def rotar_refresh_token(db: Session, payload: dict) -> Tuple[int, str, str]:
+    """
+    Canjea un refresh token por uno nuevo de la misma familia
+
+    Cada refresh token se puede usar una sola vez. Presentar uno ya usado
+    indica que fue robado: se revoca toda la familia.
+
+    Args:
+        payload: Payload ya verificado del refresh token
+
+    Returns:
+        (usuario_id, nuevo refresh_token, familia)
+
+    Raises:
+        ValueError: Si el token no existe, ya se usó o la sesión fue revocada
+    """
+    familia = payload["fam"]
+    jti = payload["jti"]
+
+    if sesion_revocada(db, familia):
+        raise ValueError("Sesión revocada")
+
+    def _rotar(session: Session):
+        # Marcar como usado en una sola sentencia: de dos canjes simultáneos
+        # del mismo token solo uno puede ganar
+        usados = session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.jti == jti, RefreshToken.usado == False)
+            .values(usado=True)
+        ).rowcount
+        actual = session.get(RefreshToken, jti)
+        if actual is None:
+            return None
+        if usados == 0:
+            _revocar(session, familia, actual.usuario_id, "reutilizacion")
+            return actual.usuario_id, None
+        return actual.usuario_id, _guardar_refresh_token(session, actual.usuario_id, payload["sub"], familia)
+
+    resultado = ejecutar_escritura(db, _rotar)
+    if resultado is None:
+        raise ValueError("Refresh token desconocido")
+    usuario_id, nuevo_token = resultado
+    if nuevo_token is None:
+        _marcar_revocada(familia)
+        raise ValueError("Refresh token reutilizado: se cerró la sesión")
+    return usuario_id, nuevo_token, familia
+
+def revocar_sesion(db: Session, payload: dict) -> None:
+    """Revoca la familia de un refresh token (logout)"""
+    familia = payload["fam"]
+
+    def _revocar_familia(session: Session) -> bool:
+        actual = session.get(RefreshToken, payload["jti"])
+        if actual is None or actual.familia != familia:
+            return False
+        _revocar(session, familia, actual.usuario_id, "logout")
+        return True
+
+    if ejecutar_escritura(db, _revocar_familia):
+        _marcar_revocada(familia)
@@ -1,9 +1,18 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, update
+from sqlalchemy.exc import IntegrityError
 from typing import Optional
+from starlette.concurrency import run_in_threadpool
 from app.models.usuario import Usuario
 from app.schemas.usuario import UsuarioCreate, UsuarioUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import (
+    get_password_hash,
+    verify_and_update_password,
+    verify_and_update_password_async
+)
+from app.core.cache import invalidar_usuario
+from app.crud.utils import ejecutar_escritura
+from app.crud.disponibilidad import registrar_usuario_tomado
 
 def get_user_by_email(db: Session, email: str) -> Optional[Usuario]:
     """Obtiene un usuario por su email"""
@@ -21,13 +30,15 @@ def get_users(db: Session, skip: int = 0, limit: int = 100):
     """Obtiene una lista de usuarios con paginación"""
     return db.query(Usuario).filter(Usuario.is_active == True).offset(skip).limit(limit).all()
 
-def create_user(db: Session, user: UsuarioCreate) -> Usuario:
+def create_user(db: Session, user: UsuarioCreate, password_hash: Optional[str] = None) -> Usuario:
     """
     Crea un nuevo usuario
     
     Args:
         db: Sesión de la base de datos
         user: Datos del usuario a crear
+        password_hash: Hash ya calculado (p. ej. en el pool de contraseñas);
+            si no se pasa, se calcula acá
     
     Returns:
         Usuario creado
@@ -35,38 +46,45 @@ def create_user(db: Session, user: UsuarioCreate) -> Usuario:
     Raises:
         ValueError: Si el email o username ya existen
     """
-    # Verificar que no exista el email
-    if get_user_by_email(db, email=user.email):
-        raise ValueError("El email ya está registrado")
-    
-    # Verificar que no exista el username
-    if get_user_by_username(db, username=user.username):
-        raise ValueError("El username ya está en uso")
-    
     # Crear el hash de la contraseña
-    hashed_password = get_password_hash(user.password)
-    
-    # Crear el objeto usuario
-    db_user = Usuario(
-        email=user.email,
-        username=user.username,
-        password_hash=hashed_password,
-        nombre=user.nombre,
-        apellido=user.apellido,
-        telefono=user.telefono,
-        direccion=user.direccion,
-        ciudad=user.ciudad,
-        provincia=user.provincia,
-        codigo_postal=user.codigo_postal
-    )
-    
-    # Guardar en la base de datos
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    
+    hashed_password = password_hash or get_password_hash(user.password)
+    
+    def _crear(session: Session) -> Usuario:
+        db_user = Usuario(
+            email=user.email,
+            username=user.username,
+            password_hash=hashed_password,
+            nombre=user.nombre,
+            apellido=user.apellido,
+            telefono=user.telefono,
+            direccion=user.direccion,
+            ciudad=user.ciudad,
+            provincia=user.provincia,
+            codigo_postal=user.codigo_postal
+        )
+        session.add(db_user)
+        session.flush()
+        return db_user
+    
+    # Los índices únicos de email y username validan en el mismo INSERT
+    # (sin consultas previas ni carrera entre dos registros simultáneos)
+    try:
+        db_user = ejecutar_escritura(db, _crear)
+    except IntegrityError as e:
+        raise error_usuario_duplicado(e) from e
+    
+    registrar_usuario_tomado(db_user.username, db_user.email)
     return db_user
 
+def error_usuario_duplicado(error: IntegrityError) -> ValueError:
+    """Traduce la violación de un índice único de usuarios al mensaje de siempre"""
+    detalle = str(error.orig).lower()
+    if "email" in detalle:
+        return ValueError("El email ya está registrado")
+    if "username" in detalle:
+        return ValueError("El username ya está en uso")
+    return ValueError("El usuario ya existe")
+
 def authenticate_user(db: Session, email: str, password: str) -> Optional[Usuario]:
     """
     Autentica un usuario verificando email y contraseña
@@ -82,10 +100,44 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[Usuari
     user = get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    valida, nuevo_hash = verify_and_update_password(password, user.password_hash)
+    if not valida:
         return None
+    if nuevo_hash:
+        update_password_hash(db, user, nuevo_hash)
     return user
 
+async def authenticate_user_async(db: Session, email: str, password: str) -> Optional[Usuario]:
+    """
+    Igual que authenticate_user, para handlers async
+    
+    Las consultas van al threadpool y bcrypt al pool dedicado de contraseñas,
+    así un pico de logins no ocupa los hilos que usan las demás rutas.
+    """
+    user = await run_in_threadpool(get_user_by_email, db, email)
+    if not user:
+        return None
+    valida, nuevo_hash = await verify_and_update_password_async(password, user.password_hash)
+    if not valida:
+        return None
+    if nuevo_hash:
+        await run_in_threadpool(update_password_hash, db, user, nuevo_hash)
+    return user
+
+def update_password_hash(db: Session, user: Usuario, password_hash: str) -> None:
+    """
+    Reemplaza el hash de un usuario (rehash transparente al cambiar BCRYPT_ROUNDS)
+    
+    Se escribe con un UPDATE directo para no depender del objeto cargado en la sesión.
+    """
+    def _actualizar(session: Session) -> None:
+        session.execute(
+            update(Usuario).where(Usuario.id == user.id).values(password_hash=password_hash)
+        )
+    
+    ejecutar_escritura(db, _actualizar)
+    invalidar_usuario(user.username)
+
 def update_user(db: Session, user_id: int, user_update: UsuarioUpdate) -> Optional[Usuario]:
     """
     Actualiza los datos de un usuario
@@ -103,11 +155,12 @@ def update_user(db: Session, user_id: int, user_update: UsuarioUpdate) -> Option
         return None
     
     # Actualizar solo los campos que se proporcionaron
-    update_data = user_update.dict(exclude_unset=True)
+    update_data = user_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_user, field, value)
     
     db.commit()
+    invalidar_usuario(db_user.username)
     db.refresh(db_user)
     return db_user
 
@@ -128,6 +181,8 @@ def deactivate_user(db: Session, user_id: int) -> Optional[Usuario]:
     
     db_user.is_active = False
     db.commit()
+    # Sin esto el usuario desactivado seguiría autenticándose hasta que venza la caché
+    invalidar_usuario(db_user.username)
     db.refresh(db_user)
     return db_user
 
@@ -0,0 +1,106 @@
+# app/crud/utils.py
+from typing import Any, Callable, Dict, List, Sequence, TypeVar
+from sqlalchemy import Table, inspect, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app import database
+
+T = TypeVar("T")
+
+def ejecutar_escritura(db: Session, unidad: Callable[[Session], T]) -> T:
+    """
+    Ejecuta una unidad de escritura y la confirma
+
+    Si el group commit está habilitado, la unidad se encola en el escritor único
+    y se confirma junto con las de otros requests. Si no, se ejecuta en la
+    sesión del request con su propio commit.
+
+    La unidad recibe la sesión en la que debe trabajar y no debe hacer commit.
+    """
+    if database.escritor is not None:
+        return database.escritor.run(unidad)
+
+    try:
+        resultado = unidad(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    # Igual que antes: recargar el objeto creado/modificado después del commit
+    if inspect(resultado, raiseerr=False) is not None:
+        db.refresh(resultado)
+    return resultado
+
+def insert_dialecto(session: Session, tabla: Table):
+    """Retorna el INSERT del dialecto actual (soporta ON CONFLICT en SQLite y PostgreSQL)"""
+    dialecto = session.get_bind().dialect.name
+    if dialecto == "sqlite":
+        return sqlite.insert(tabla)
+    if dialecto == "postgresql":
+        return postgresql.insert(tabla)
+    return None
+
+def upsert_incrementos(
+    session: Session,
+    tabla: Table,
+    claves: Dict[str, Any],
+    incrementos: Dict[str, Any]
+) -> None:
+    """
+    Inserta una fila o, si ya existe la clave, suma los incrementos a sus columnas
+
+    Se resuelve en una sola sentencia (INSERT ... ON CONFLICT DO UPDATE) para que
+    las escrituras concurrentes no pierdan incrementos.
+    """
+    stmt = insert_dialecto(session, tabla)
+    if stmt is not None:
+        stmt = stmt.values(**claves, **incrementos)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(claves),
+            set_={col: tabla.c[col] + stmt.excluded[col] for col in incrementos}
+        )
+        session.execute(stmt)
+        return
+
+    # Otros motores: UPDATE y, si no había fila, INSERT
+    condicion = [tabla.c[col] == valor for col, valor in claves.items()]
+    resultado = session.execute(
+        update(tabla).where(*condicion).values(
+            {col: tabla.c[col] + valor for col, valor in incrementos.items()}
+        )
+    )
+    if resultado.rowcount == 0:
+        session.execute(tabla.insert().values(**claves, **incrementos))
+
+def upsert_incrementos_lote(
+    session: Session,
+    tabla: Table,
+    claves: Sequence[str],
+    filas: List[Dict[str, Any]]
+) -> None:
+    """
+    upsert_incrementos para muchas filas en una sola sentencia (executemany)
+
+    Cada fila trae los valores de las columnas `claves` y los incrementos del
+    resto de sus columnas; todas las filas deben tener las mismas columnas.
+    """
+    if not filas:
+        return
+    incrementos = [col for col in filas[0] if col not in claves]
+    stmt = insert_dialecto(session, tabla)
+    if stmt is not None:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(claves),
+            set_={col: tabla.c[col] + stmt.excluded[col] for col in incrementos}
+        )
+        session.execute(stmt, filas)
+        return
+
+    for fila in filas:
+        upsert_incrementos(
+            session,
+            tabla,
+            {col: fila[col] for col in claves},
+            {col: fila[col] for col in incrementos}
+        )
@@ -0,0 +1,177 @@
+# app/crud/venta.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, cast, delete, select, Date
+from typing import Optional, List, Dict, Iterable, Tuple
+from datetime import date, datetime, timedelta
+from app.models.venta import VentaDiariaProducto
+from app.models.pedido import Pedido, ItemPedido
+from app.models.producto import Producto
+from app.crud.utils import upsert_incrementos
+
+def registrar_ventas_pedido(
+    db: Session,
+    fecha_pedido: datetime,
+    items: Iterable[Tuple[Producto, int, float]]
+) -> None:
+    """
+    Suma las ventas de un pedido al rollup diario
+
+    Se llama dentro de la misma transacción que crea el pedido, así el rollup
+    nunca queda desfasado de items_pedido.
+
+    Args:
+        db: Sesión de la base de datos
+        fecha_pedido: Fecha del pedido (define el día del rollup)
+        items: Tuplas (producto, cantidad, subtotal)
+    """
+    # Agrupar por producto: un mismo producto puede venir en varios items
+    por_producto: Dict[int, Dict] = {}
+    for producto, cantidad, subtotal in items:
+        acumulado = por_producto.setdefault(producto.id, {
+            "vendedor_id": producto.vendedor_id,
+            "ingresos": 0,
+            "unidades": 0
+        })
+        acumulado["ingresos"] += subtotal
+        acumulado["unidades"] += cantidad
+
+    tabla = VentaDiariaProducto.__table__
+    for producto_id, datos in por_producto.items():
+        upsert_incrementos(
+            db,
+            tabla,
+            claves={
+                "vendedor_id": datos["vendedor_id"],
+                "producto_id": producto_id,
+                "dia": fecha_pedido.date()
+            },
+            incrementos={
+                "ingresos": datos["ingresos"],
+                "unidades": datos["unidades"],
+                "pedidos": 1
+            }
+        )
+
+def get_ventas_diarias(
+    db: Session,
+    vendedor_id: int,
+    desde: date,
+    hasta: date,
+    producto_id: Optional[int] = None
+) -> List[Dict]:
+    """
+    Serie diaria de ventas de un vendedor (opcionalmente de un solo producto)
+
+    Los días sin ventas se completan con ceros para devolver una serie continua.
+    """
+    query = db.query(
+        VentaDiariaProducto.dia,
+        func.sum(VentaDiariaProducto.ingresos),
+        func.sum(VentaDiariaProducto.unidades),
+        func.sum(VentaDiariaProducto.pedidos)
+    ).filter(
+        VentaDiariaProducto.vendedor_id == vendedor_id,
+        VentaDiariaProducto.dia >= desde,
+        VentaDiariaProducto.dia <= hasta
+    )
+
+    if producto_id:
+        query = query.filter(VentaDiariaProducto.producto_id == producto_id)
+
+    filas = {
+        dia: (ingresos, unidades, pedidos)
+        for dia, ingresos, unidades, pedidos in query.group_by(VentaDiariaProducto.dia)
+    }
+
+    serie = []
+    dia = desde
+    while dia <= hasta:
+        ingresos, unidades, pedidos = filas.get(dia, (0, 0, 0))
+        serie.append({
+            "dia": dia,
+            "ingresos": round(float(ingresos or 0), 2),
+            "unidades": int(unidades or 0),
+            "pedidos": int(pedidos or 0)
+        })
+        dia += timedelta(days=1)
+    return serie
+
+def get_ventas_por_producto(
+    db: Session,
+    vendedor_id: int,
+    desde: date,
+    hasta: date
+) -> List[Dict]:
+    """Totales por producto de un vendedor en un rango de días, ordenados por ingresos"""
+    ingresos = func.sum(VentaDiariaProducto.ingresos).label("ingresos")
+    filas = db.query(
+        VentaDiariaProducto.producto_id,
+        Producto.nombre,
+        ingresos,
+        func.sum(VentaDiariaProducto.unidades),
+        func.sum(VentaDiariaProducto.pedidos)
+    ).join(
+        Producto, Producto.id == VentaDiariaProducto.producto_id
+    ).filter(
+        VentaDiariaProducto.vendedor_id == vendedor_id,
+        VentaDiariaProducto.dia >= desde,
+        VentaDiariaProducto.dia <= hasta
+    ).group_by(
+        VentaDiariaProducto.producto_id, Producto.nombre
+    ).order_by(ingresos.desc()).all()
+
+    return [
+        {
+            "producto_id": producto_id,
+            "nombre": nombre,
+            "ingresos": round(float(total_ingresos or 0), 2),
+            "unidades": int(unidades or 0),
+            "pedidos": int(pedidos or 0)
+        }
+        for producto_id, nombre, total_ingresos, unidades, pedidos in filas
+    ]
+
+def reconstruir_ventas_diarias(db: Session, desde: Optional[date] = None) -> int:
+    """
+    Recalcula el rollup a partir de pedidos e items_pedido (backfill)
+
+    Args:
+        db: Sesión de la base de datos
+        desde: Si se indica, solo recalcula desde ese día en adelante
+
+    Returns:
+        Cantidad de filas generadas
+    """
+    # En SQLite CAST(... AS DATE) no devuelve una fecha: usar date()
+    if db.get_bind().dialect.name == "sqlite":
+        dia = func.date(Pedido.fecha_pedido)
+    else:
+        dia = cast(Pedido.fecha_pedido, Date)
+
+    origen = select(
+        Producto.vendedor_id,
+        ItemPedido.producto_id,
+        dia.label("dia"),
+        func.sum(ItemPedido.subtotal),
+        func.sum(ItemPedido.cantidad),
+        func.count(func.distinct(ItemPedido.pedido_id))
+    ).join(
+        Pedido, Pedido.id == ItemPedido.pedido_id
+    ).join(
+        Producto, Producto.id == ItemPedido.producto_id
+    ).group_by(Producto.vendedor_id, ItemPedido.producto_id, dia)
+
+    borrar = delete(VentaDiariaProducto)
+    if desde:
+        borrar = borrar.where(VentaDiariaProducto.dia >= desde)
+        origen = origen.where(Pedido.fecha_pedido >= datetime.combine(desde, datetime.min.time()))
+
+    db.execute(borrar)
+    resultado = db.execute(
+        VentaDiariaProducto.__table__.insert().from_select(
+            ["vendedor_id", "producto_id", "dia", "ingresos", "unidades", "pedidos"],
+            origen
+        )
+    )
+    db.commit()
+    return resultado.rowcount
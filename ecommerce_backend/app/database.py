@@ -1,14 +1,62 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from .core.config import settings
+from .core.group_commit import GroupCommitExecutor
 from .models.base import Base
 
+_es_sqlite = settings.DATABASE_URL.startswith("sqlite")
+_es_memoria = _es_sqlite and (settings.DATABASE_URL in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in settings.DATABASE_URL)
+
+_MODOS_JOURNAL = {"WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"}
+_MODOS_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_MODOS_TEMP_STORE = {"DEFAULT", "FILE", "MEMORY"}
+
+def _pragmas_sqlite() -> list:
+    """PRAGMAs del perfil de rendimiento, según settings.SQLITE_*"""
+    def _validar(nombre: str, valor: str, permitidos: set) -> str:
+        valor = valor.upper()
+        if valor not in permitidos:
+            raise ValueError(f"{nombre} inválido: {valor} (opciones: {', '.join(sorted(permitidos))})")
+        return valor
+
+    pragmas = [
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA foreign_keys={'ON' if settings.SQLITE_FOREIGN_KEYS else 'OFF'}",
+    ]
+    if not settings.SQLITE_PERFORMANCE_PROFILE:
+        return pragmas
+    if not _es_memoria:
+        # journal_mode=WAL queda grabado en el archivo; mmap no aplica a bases en memoria
+        pragmas.append(f"PRAGMA journal_mode={_validar('SQLITE_JOURNAL_MODE', settings.SQLITE_JOURNAL_MODE, _MODOS_JOURNAL)}")
+        pragmas.append(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE_MB) * 1024 * 1024}")
+    pragmas += [
+        f"PRAGMA synchronous={_validar('SQLITE_SYNCHRONOUS', settings.SQLITE_SYNCHRONOUS, _MODOS_SYNCHRONOUS)}",
+        f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}",
+        f"PRAGMA temp_store={_validar('SQLITE_TEMP_STORE', settings.SQLITE_TEMP_STORE, _MODOS_TEMP_STORE)}",
+        # Acota el costo de ANALYZE cuando PRAGMA optimize decide correrlo
+        "PRAGMA analysis_limit=400",
+    ]
+    return pragmas
+
+def _aplicar_perfil_sqlite(engine_sqlite) -> None:
+    """Configura cada conexión nueva del engine con los PRAGMAs del perfil"""
+    pragmas = _pragmas_sqlite()
+
+    @event.listens_for(engine_sqlite, "connect")
+    def _configurar_conexion(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
 # Crear el engine
 engine = create_engine(
     settings.DATABASE_URL,
     # Para SQLite
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
+    connect_args={"check_same_thread": False} if _es_sqlite else {}
 )
+if _es_sqlite:
+    _aplicar_perfil_sqlite(engine)
 
 # Crear el SessionLocal
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -21,8 +69,110 @@ def get_db():
     finally:
         db.close()
 
+def _crear_engine_lectura():
+    """
+    Engine de solo lectura para los handlers GET, con su propio pool
+
+    Con DATABASE_READ_URL se lee de la réplica. Si no, con SQLite en archivo se
+    abren conexiones al mismo archivo con PRAGMA query_only: en WAL cada lectura
+    ve un snapshot y no espera al escritor (mode=ro no sirve: no puede abrir una
+    base WAL si no existe el -shm). En el resto de los casos (base en memoria,
+    otro motor sin réplica) se usa el engine principal.
+    """
+    url = settings.DATABASE_READ_URL
+    if not settings.READ_ENGINE_ENABLED or (url is None and (not _es_sqlite or _es_memoria)):
+        return engine
+
+    url = url or settings.DATABASE_URL
+    lectura_sqlite = url.startswith("sqlite")
+    engine_lectura = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if lectura_sqlite else {},
+        pool_size=settings.READ_POOL_SIZE,
+        max_overflow=settings.READ_POOL_MAX_OVERFLOW
+    )
+    if lectura_sqlite:
+        _aplicar_perfil_sqlite(engine_lectura)
+
+        @event.listens_for(engine_lectura, "connect")
+        def _solo_lectura(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA query_only=ON")
+            cursor.close()
+
+    return engine_lectura
+
+engine_lectura = _crear_engine_lectura()
+# info["solo_lectura"] habilita la coalescencia de lecturas (ver core/single_flight)
+SessionLectura = sessionmaker(autocommit=False, autoflush=False, bind=engine_lectura, info={"solo_lectura": True})
+
+# Dependencia para los handlers que solo leen (no usar para escribir)
+def get_read_db():
+    db = SessionLectura()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def optimizar_sqlite() -> None:
+    """
+    PRAGMA optimize: actualiza las estadísticas del planificador si hace falta
+
+    Es barato cuando no hay nada que hacer; se corre periódicamente y al apagar
+    la aplicación (ver SQLITE_OPTIMIZE_INTERVAL_SECONDS).
+    """
+    if not _es_sqlite:
+        return
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA optimize=0x10002")
+
 # Función para crear las tablas
 def create_tables():
     # Importar todos los modelos para que SQLAlchemy los registre
-    from .models import usuario, producto, pedido, mensaje, calificacion
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    from .models import usuario, producto, pedido, mensaje, calificacion, venta, ranking, recomendacion, sesion
+    Base.metadata.create_all(bind=engine)
+
+def _crear_engine_escritor():
+    """
+    Engine exclusivo del escritor de group commit
+
+    pysqlite no emite BEGIN antes de un SAVEPOINT, así que liberar el primer
+    savepoint confirmaría la transacción. Se toma el control del BEGIN para que
+    todo el lote sea una sola transacción (BEGIN IMMEDIATE: un único escritor).
+    """
+    if not _es_sqlite:
+        return engine
+
+    engine_escritor = create_engine(
+        settings.DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        pool_size=1,
+        max_overflow=0
+    )
+
+    @event.listens_for(engine_escritor, "connect")
+    def _desactivar_autobegin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine_escritor, "begin")
+    def _begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    _aplicar_perfil_sqlite(engine_escritor)
+
+    return engine_escritor
+
+# Escritor opcional de group commit (ver app/core/group_commit.py)
+escritor = None
+if settings.GROUP_COMMIT_ENABLED:
+    escritor = GroupCommitExecutor(
+        sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            expire_on_commit=False,
+            bind=_crear_engine_escritor()
+        ),
+        max_batch=settings.GROUP_COMMIT_MAX_BATCH,
+        max_delay_ms=settings.GROUP_COMMIT_MAX_DELAY_MS,
+        timeout=settings.GROUP_COMMIT_TIMEOUT_SECONDS
+    )
@@ -1,32 +1,160 @@
-from fastapi import FastAPI, Request
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import traceback
+from starlette.concurrency import run_in_threadpool
+from .core.bus_invalidacion import bus_invalidacion
 from .core.config import settings
+from .core.logs import configurar_logging, detener_logging
+from .core.metricas import registro_metricas
+from .core.pools import detener_pools
+from .core.security import detener_pool_passwords
 from .api.api_v1.api import api_router
+from . import database
+from .crud.disponibilidad import cargar_disponibilidad
+from .crud.recomendacion import refrescar_top_k_pendientes
+from .crud.sesion import cargar_revocaciones, purgar_sesiones_vencidas
+from .middleware import (
+    AdmissionControlMiddleware,
+    ErrorHandlingMiddleware,
+    MetricsMiddleware,
+    RequestContextMiddleware,
+    ResponseCacheMiddleware
+)
+
+# El logging se configura en el lifespan (no al importar: tests, scripts y benchmarks importan app.main)
+logger = logging.getLogger(__name__)
+
+
+async def _optimizar_periodicamente(intervalo: float):
+    """Corre PRAGMA optimize cada `intervalo` segundos (ver database.optimizar_sqlite)"""
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            await run_in_threadpool(database.optimizar_sqlite)
+        except Exception:
+            logger.exception("Falló PRAGMA optimize")
+
+
+async def _refrescar_recomendaciones_periodicamente(intervalo: float):
+    """Regenera los top-K de "comprados juntos" de los productos con pedidos nuevos"""
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            await run_in_threadpool(_refrescar_recomendaciones)
+        except Exception:
+            logger.exception("Falló el refresco de recomendaciones")
+
+
+def _refrescar_recomendaciones():
+    db = database.SessionLocal()
+    try:
+        refrescar_top_k_pendientes(db)
+    finally:
+        db.close()
+
+
+async def _purgar_sesiones_periodicamente(intervalo: float):
+    """Borra refresh tokens y revocaciones vencidas, fuera de los requests"""
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            await run_in_threadpool(_purgar_sesiones)
+        except Exception:
+            logger.exception("Falló la purga de sesiones vencidas")
+
+
+def _purgar_sesiones():
+    db = database.SessionLocal()
+    try:
+        purgar_sesiones_vencidas(db)
+    finally:
+        db.close()
+
+
+def _precargar_disponibilidad():
+    db = database.SessionLocal()
+    try:
+        cargar_disponibilidad(db)
+    finally:
+        db.close()
+
+
+def _precargar_revocaciones():
+    db = database.SessionLocal()
+    try:
+        cargar_revocaciones(db)
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configurar_logging()
+    # Invalidaciones de cachés en memoria entre los workers de esta máquina
+    if settings.INVALIDATION_BUS_ENABLED:
+        bus_invalidacion.iniciar()
+    # Usernames/emails tomados en memoria para /auth/disponibilidad
+    await run_in_threadpool(_precargar_disponibilidad)
+    # Sesiones revocadas en memoria: el primer request autenticado no recorre la tabla
+    await run_in_threadpool(_precargar_revocaciones)
+    tarea_optimize = None
+    if settings.DATABASE_URL.startswith("sqlite") and settings.SQLITE_OPTIMIZE_INTERVAL_SECONDS > 0:
+        tarea_optimize = asyncio.create_task(
+            _optimizar_periodicamente(settings.SQLITE_OPTIMIZE_INTERVAL_SECONDS)
+        )
+    tarea_recomendaciones = asyncio.create_task(
+        _refrescar_recomendaciones_periodicamente(settings.RECOMENDACIONES_REFRESCO_SECONDS)
+    )
+    tarea_purga = asyncio.create_task(
+        _purgar_sesiones_periodicamente(settings.REVOCACION_PURGA_SECONDS)
+    )
+    yield
+    tarea_purga.cancel()
+    if tarea_optimize is not None:
+        tarea_optimize.cancel()
+    tarea_recomendaciones.cancel()
+    # Top-K pendientes antes de detener el escritor
+    try:
+        await run_in_threadpool(_refrescar_recomendaciones)
+    except Exception:
+        logger.exception("Falló el refresco de recomendaciones")
+    # Confirmar las escrituras pendientes antes de apagar
+    if database.escritor is not None:
+        database.escritor.detener()
+    detener_pool_passwords()
+    detener_pools()
+    bus_invalidacion.detener()
+    # Estadísticas al día para el próximo arranque
+    if tarea_optimize is not None:
+        try:
+            await run_in_threadpool(database.optimizar_sqlite)
+        except Exception:
+            logger.exception("Falló PRAGMA optimize")
+    detener_logging()
 
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
-    description="API REST para E-commerce con sistema de autenticación JWT"
+    description="API REST para E-commerce con sistema de autenticación JWT",
+    lifespan=lifespan
 )
 
-# Middleware para capturar excepciones
-@app.middleware("http")
-async def catch_exceptions_middleware(request: Request, call_next):
-    try:
-        return await call_next(request)
-    except Exception as e:
-        print("=" * 80)
-        print("ERROR CAPTURADO:")
-        print(traceback.format_exc())
-        print("=" * 80)
-        return JSONResponse(
-            status_code=500,
-            content={"detail": str(e), "type": type(e).__name__}
-        )
+# Middleware ASGI puros (el último agregado es el más externo)
+if settings.ADMISSION_CONTROL_ENABLED:
+    # Dentro de la caché: los aciertos se sirven sin ocupar lugares de la clase
+    app.add_middleware(AdmissionControlMiddleware)
+if settings.RESPONSE_CACHE_ENABLED:
+    # Dentro de las métricas y el logging, para que los aciertos también se midan
+    app.add_middleware(ResponseCacheMiddleware)
+app.add_middleware(ErrorHandlingMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestContextMiddleware)
 
 # Configurar CORS
 app.add_middleware(
@@ -56,4 +184,14 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok", "version": settings.VERSION}
\ No newline at end of file
+    return {"status": "ok", "version": settings.VERSION}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Métricas de este proceso en formato de texto de Prometheus"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(
+        registro_metricas.exportar(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,13 @@
+from .admision import AdmissionControlMiddleware
+from .cache_respuestas import ResponseCacheMiddleware
+from .contexto import RequestContextMiddleware
+from .errores import ErrorHandlingMiddleware
+from .metricas import MetricsMiddleware
+
+__all__ = [
+    "RequestContextMiddleware",
+    "ErrorHandlingMiddleware",
+    "MetricsMiddleware",
+    "ResponseCacheMiddleware",
+    "AdmissionControlMiddleware"
+]
@@ -0,0 +1,83 @@
+# app/middleware/admision.py
+import json
+import logging
+import re
+import time
+from typing import Dict, Optional
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.admision import ClaseAdmision, clases_admision
+from app.core.config import settings
+
+logger = logging.getLogger("app.admision")
+
+# (método o None para cualquiera, ruta, clase). Lo que no coincide no se limita.
+_PREFIJO = re.escape(settings.API_V1_STR)
+_CLASES_RUTA = (
+    ("POST", re.compile(rf"{_PREFIJO}/auth/(login|login-simple|register)"), "auth"),
+    ("GET", re.compile(rf"{_PREFIJO}/products(/.*)?"), "catalogo"),
+    ("GET", re.compile(rf"{_PREFIJO}/usuarios/(?!me$)[^/]+"), "catalogo"),
+    (None, re.compile(rf"{_PREFIJO}/conversations(/.*)?"), "mensajeria"),
+    # Solo la creación: el export de pedidos no ocupa lugares del checkout
+    ("POST", re.compile(rf"{_PREFIJO}/orders"), "checkout"),
+)
+
+class AdmissionControlMiddleware:
+    """
+    Middleware ASGI puro: control de admisión por clase de ruta
+
+    Cada clase (auth, catálogo, mensajería, checkout) tiene su propio límite
+    de requests en curso y su cola acotada (ver core/admision), así una
+    avalancha de logins con bcrypt no deja sin lugar al catálogo ni a los
+    pedidos. Cuando la cola está llena o la espera no entraría en el plazo se
+    responde 503 con Retry-After enseguida, sin tocar la base.
+
+    Va dentro de la caché de respuestas: los aciertos no ocupan lugares.
+    """
+
+    def __init__(self, app: ASGIApp, clases: Optional[Dict[str, ClaseAdmision]] = None):
+        self.app = app
+        self.clases = clases or clases_admision
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        clase = self._clase(scope["method"], scope["path"].rstrip("/") or "/")
+        if clase is None:
+            await self.app(scope, receive, send)
+            return
+
+        motivo = await clase.entrar()
+        if motivo is not None:
+            logger.warning(
+                "Request rechazado por sobrecarga",
+                extra={"clase": clase.nombre, "motivo": motivo, "method": scope["method"], "path": scope["path"]}
+            )
+            await _rechazar(clase.reintentar_en(), send)
+            return
+
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            clase.salir(time.perf_counter() - inicio)
+
+    def _clase(self, metodo: str, ruta: str) -> Optional[ClaseAdmision]:
+        for metodo_clase, patron, nombre in _CLASES_RUTA:
+            if (metodo_clase is None or metodo_clase == metodo) and patron.fullmatch(ruta):
+                return self.clases.get(nombre)
+        return None
+
+async def _rechazar(reintentar_en: int, send: Send) -> None:
+    cuerpo = json.dumps({"detail": "Servicio sobrecargado. Intente más tarde"}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(cuerpo)).encode("latin-1")),
+            (b"retry-after", str(reintentar_en).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": cuerpo})
@@ -0,0 +1,201 @@
+# app/middleware/cache_respuestas.py
+import asyncio
+import gzip
+import logging
+import re
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.cache_respuestas import VENCIDA, CacheRespuestas, EntradaRespuesta, cache_respuestas
+from app.core.config import settings
+from app.core.metricas import tiempos_request
+
+logger = logging.getLogger("app.cache")
+
+# GET públicos que se cachean y las etiquetas con que se invalidan (ver core/cache_respuestas)
+_PREFIJO = re.escape(settings.API_V1_STR)
+_RUTAS_CACHEABLES = (
+    (re.compile(rf"{_PREFIJO}/products"), ("productos",)),
+    (re.compile(rf"{_PREFIJO}/products/0*(\d+)"), ("producto:{0}",)),
+    (re.compile(rf"{_PREFIJO}/products/0*(\d+)/reviews"), ("calificaciones:{0}", "producto:{0}")),
+    (re.compile(rf"{_PREFIJO}/usuarios/(?!me$)([^/]+)"), ("usuario:{0}",)),
+)
+
+# Headers de la respuesta original que no se guardan (se recalculan al servirla)
+_HEADERS_EXCLUIDOS = {b"content-length", b"date"}
+
+class ResponseCacheMiddleware:
+    """
+    Middleware ASGI puro: caché de respuestas de GET públicos para anónimos
+
+    Solo aplica a las rutas de _RUTAS_CACHEABLES y a requests sin header
+    Authorization. La clave es la ruta sin "/" final más la query ordenada,
+    así ?page=2&page_size=20 y ?page_size=20&page=2 comparten la entrada.
+    Se guardan solo respuestas 200 completas, ya serializadas, y desde
+    RESPONSE_CACHE_GZIP_MIN_BYTES también comprimidas, para no volver a
+    comprimir en cada acierto.
+
+    Una entrada vencida se sigue sirviendo (X-Cache: STALE) mientras una
+    tarea en segundo plano la recalcula; un solo refresco por clave.
+    """
+
+    def __init__(self, app: ASGIApp, cache: Optional[CacheRespuestas] = None):
+        self.app = app
+        self.cache = cache or cache_respuestas
+        self._refrescos = set()  # Referencias a las tareas en curso (si no, el GC puede cortarlas)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.cache.habilitada:
+            await self.app(scope, receive, send)
+            return
+
+        ruta = scope["path"].rstrip("/") or "/"
+        etiquetas = _etiquetas(ruta)
+        if etiquetas is None or _tiene_credenciales(scope):
+            await self.app(scope, receive, send)
+            return
+
+        clave = _clave(ruta, scope.get("query_string", b""))
+        entrada, estado = self.cache.obtener(clave)
+        if entrada is None:
+            await self._calcular(scope, receive, send, clave, etiquetas)
+            return
+
+        if estado == VENCIDA and self.cache.marcar_refresco(clave):
+            tarea = asyncio.create_task(self._refrescar(dict(scope), clave, etiquetas))
+            self._refrescos.add(tarea)
+            tarea.add_done_callback(self._refrescos.discard)
+        # Para que las métricas agrupen el acierto bajo la ruta que lo generó
+        if entrada.ruta is not None:
+            scope["route"] = entrada.ruta
+        await _enviar(entrada, estado, _acepta_gzip(scope), send)
+
+    async def _calcular(self, scope: Scope, receive: Receive, send: Send,
+                        clave: str, etiquetas: Tuple[str, ...]) -> None:
+        """Ejecuta la app, reenvía la respuesta y la guarda si es cacheable"""
+        generaciones = self.cache.generaciones(etiquetas)
+        inicio: Optional[Message] = None
+        partes: List[bytes] = []
+        tamano = 0
+        completa = False
+
+        async def send_capturando(message: Message) -> None:
+            nonlocal inicio, tamano, completa
+            if message["type"] == "http.response.start":
+                inicio = message
+                message["headers"] = list(message.get("headers", [])) + [(b"x-cache", b"MISS")]
+            elif message["type"] == "http.response.body":
+                cuerpo = message.get("body", b"")
+                tamano += len(cuerpo)
+                if tamano <= self.cache.max_bytes:
+                    partes.append(cuerpo)
+                completa = not message.get("more_body", False)
+            await send(message)
+
+        await self.app(scope, receive, send_capturando)
+
+        if inicio is None or inicio["status"] != 200 or not completa or tamano > self.cache.max_bytes:
+            return
+        headers = [(k, v) for k, v in inicio["headers"] if k.lower() not in _HEADERS_EXCLUIDOS and k != b"x-cache"]
+        if not _es_cacheable(headers):
+            return
+        cuerpo = b"".join(partes)
+        comprimido = None
+        if 0 < settings.RESPONSE_CACHE_GZIP_MIN_BYTES <= len(cuerpo):
+            comprimido = await run_in_threadpool(gzip.compress, cuerpo, 6)
+        self.cache.guardar(
+            clave,
+            EntradaRespuesta(cuerpo, headers, scope.get("route"), etiquetas,
+                             self.cache.ttl, self.cache.stale, comprimido),
+            generaciones,
+        )
+
+    async def _refrescar(self, scope: Scope, clave: str, etiquetas: Tuple[str, ...]) -> None:
+        """Recalcula una entrada vencida sin cliente (la respuesta se descarta salvo para la caché)"""
+        # El request que disparó el refresco ya terminó: no acumular tiempos en sus métricas
+        tiempos_request.set(None)
+        scope["headers"] = [(k, v) for k, v in scope["headers"] if k not in (b"accept-encoding", b"range")]
+        desconectado = asyncio.Event()
+        cuerpo_enviado = False
+        estado = None
+
+        async def receive() -> Message:
+            nonlocal cuerpo_enviado
+            if not cuerpo_enviado:
+                cuerpo_enviado = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Como un servidor real: no hay desconexión hasta que termine la respuesta
+            await desconectado.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Message) -> None:
+            nonlocal estado
+            if message["type"] == "http.response.start":
+                estado = message["status"]
+
+        inicio = time.perf_counter()
+        try:
+            await self._calcular(scope, receive, send, clave, etiquetas)
+            if estado != 200:
+                self.cache.descartar(clave)
+        except Exception:
+            self.cache.descartar(clave)
+            logger.exception("Falló el refresco de la caché de respuestas", extra={"path": scope["path"]})
+        finally:
+            desconectado.set()
+            self.cache.fin_refresco(clave)
+            logger.debug(
+                "refresco de caché",
+                extra={"path": scope["path"], "status": estado,
+                       "duracion_ms": round((time.perf_counter() - inicio) * 1000, 2)}
+            )
+
+def _etiquetas(ruta: str) -> Optional[Tuple[str, ...]]:
+    for patron, plantillas in _RUTAS_CACHEABLES:
+        coincidencia = patron.fullmatch(ruta)
+        if coincidencia:
+            return tuple(p.format(*coincidencia.groups()) for p in plantillas)
+    return None
+
+def _clave(ruta: str, query_string: bytes) -> str:
+    """Ruta normalizada + query con los parámetros ordenados"""
+    if not query_string:
+        return ruta
+    pares = sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True))
+    return f"{ruta}?{urlencode(pares)}" if pares else ruta
+
+def _tiene_credenciales(scope: Scope) -> bool:
+    return any(nombre == b"authorization" for nombre, _ in scope["headers"])
+
+def _acepta_gzip(scope: Scope) -> bool:
+    for nombre, valor in scope["headers"]:
+        if nombre == b"accept-encoding":
+            return b"gzip" in valor.lower()
+    return False
+
+def _es_cacheable(headers: List[Tuple[bytes, bytes]]) -> bool:
+    for nombre, valor in headers:
+        nombre = nombre.lower()
+        if nombre in (b"set-cookie", b"content-encoding"):
+            return False
+        if nombre == b"cache-control" and (b"no-store" in valor or b"private" in valor):
+            return False
+    return True
+
+async def _enviar(entrada: EntradaRespuesta, estado: str, gzip_aceptado: bool, send: Send) -> None:
+    cuerpo = entrada.cuerpo
+    headers = list(entrada.headers)
+    if entrada.gzip is not None:
+        headers.append((b"vary", b"Accept-Encoding"))
+        if gzip_aceptado:
+            cuerpo = entrada.gzip
+            headers.append((b"content-encoding", b"gzip"))
+    headers += [
+        (b"content-length", str(len(cuerpo)).encode("latin-1")),
+        (b"age", str(int(time.monotonic() - entrada.creada)).encode("latin-1")),
+        (b"x-cache", estado.encode("latin-1")),
+    ]
+    await send({"type": "http.response.start", "status": 200, "headers": headers})
+    await send({"type": "http.response.body", "body": cuerpo})
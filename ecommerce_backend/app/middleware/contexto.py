@@ -0,0 +1,60 @@
+# app/middleware/contexto.py
+import logging
+import time
+import uuid
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.logs import request_id_actual
+
+logger = logging.getLogger("app.request")
+
+class RequestContextMiddleware:
+    """
+    Middleware ASGI puro: asigna un id a cada request y registra el acceso
+
+    El id se toma del header X-Request-ID si viene (para seguir un request
+    entre servicios) y se devuelve en la respuesta. Mientras dura el request
+    queda en el contextvar que usa el logging.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for nombre, valor in scope["headers"]:
+            if nombre == b"x-request-id":
+                request_id = valor.decode("latin-1")[:64]
+                break
+        if not request_id:
+            request_id = uuid.uuid4().hex
+
+        token = request_id_actual.set(request_id)
+        inicio = time.perf_counter()
+        estado = 500
+
+        async def send_con_id(message: Message) -> None:
+            nonlocal estado
+            if message["type"] == "http.response.start":
+                estado = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-request-id", request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_id)
+        finally:
+            logger.info(
+                "request",
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": estado,
+                    "duracion_ms": round((time.perf_counter() - inicio) * 1000, 2),
+                }
+            )
+            request_id_actual.reset(token)
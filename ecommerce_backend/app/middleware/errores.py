@@ -0,0 +1,52 @@
+# app/middleware/errores.py
+import json
+import logging
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("app.errores")
+
+class ErrorHandlingMiddleware:
+    """
+    Middleware ASGI puro: convierte excepciones no manejadas en un 500 JSON
+
+    Reemplaza al antiguo @app.middleware("http"), que pasaba cada request por
+    BaseHTTPMiddleware (tareas y streams extra) e imprimía el traceback en
+    stdout de forma sincrónica. Ahora el traceback va al logging (encolado).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        respuesta_iniciada = False
+
+        async def send_registrando(message: Message) -> None:
+            nonlocal respuesta_iniciada
+            if message["type"] == "http.response.start":
+                respuesta_iniciada = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_registrando)
+        except Exception as e:
+            logger.exception(
+                "Error no manejado",
+                extra={"method": scope["method"], "path": scope["path"]}
+            )
+            if respuesta_iniciada:
+                # Ya se enviaron headers: no se puede responder otra cosa
+                raise
+            cuerpo = json.dumps({"detail": str(e), "type": type(e).__name__}).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 500,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(cuerpo)).encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": cuerpo})
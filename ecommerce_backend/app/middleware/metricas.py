@@ -0,0 +1,73 @@
+# app/middleware/metricas.py
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.metricas import TiemposRequest, registro_metricas, tiempos_request
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro: métricas por ruta y header Server-Timing
+
+    Las métricas se agrupan por la plantilla de la ruta (/productos/{producto_id}),
+    no por la URL, para no crear una serie por cada id. Los requests que no
+    coinciden con ninguna ruta van todos a "sin_ruta".
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tiempos = TiemposRequest()
+        token = tiempos_request.set(tiempos)
+        inicio = time.perf_counter()
+        estado = 500
+
+        async def send_con_tiempos(message: Message) -> None:
+            nonlocal estado
+            if message["type"] == "http.response.start":
+                estado = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    valor = _server_timing(tiempos, time.perf_counter() - inicio)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", valor.encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_tiempos)
+        finally:
+            tiempos_request.reset(token)
+            registro_metricas.registrar(
+                scope["method"],
+                _plantilla_ruta(scope),
+                estado,
+                time.perf_counter() - inicio,
+                tiempos,
+            )
+
+def _plantilla_ruta(scope: Scope) -> str:
+    """
+    Plantilla completa de la ruta (con los prefijos de include_router)
+
+    scope["route"] es la ruta del router de cada módulo, cuya plantilla no
+    incluye los prefijos; se toman de la URL real los segmentos previos a los
+    que cubre la plantilla (los prefijos de la app no tienen parámetros).
+    """
+    plantilla = getattr(scope.get("route"), "path_format", None)
+    if plantilla is None:
+        return "sin_ruta"
+    segmentos = scope["path"].rstrip("/").split("/")
+    cubiertos = plantilla.rstrip("/").count("/")
+    return "/".join(segmentos[:len(segmentos) - cubiertos]) + plantilla
+
+def _server_timing(tiempos: TiemposRequest, total: float) -> str:
+    """Valor del header Server-Timing (duraciones en milisegundos)"""
+    partes = [f'db;dur={tiempos.db * 1000:.2f};desc="{tiempos.consultas} consultas"']
+    for nombre, segundos in tiempos.desglose().items():
+        partes.append(f"{nombre};dur={segundos * 1000:.2f}")
+    partes.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(partes)
@@ -4,6 +4,10 @@ from .producto import Producto
 from .pedido import Pedido, ItemPedido
 from .mensaje import Conversacion, Mensaje
 from .calificacion import CalificacionProducto  # ← DESCOMENTAR
+from .venta import VentaDiariaProducto
+from .ranking import PuntajeProducto
+from .recomendacion import ProductoCompradoJunto, ProductoRelacionado
+from .sesion import RefreshToken, SesionRevocada
 
 __all__ = [
     "Base",
@@ -13,5 +17,11 @@ __all__ = [
     "ItemPedido",
     "Conversacion", 
     "Mensaje",
-    "CalificacionProducto"  # ← DESCOMENTAR
+    "CalificacionProducto",  # ← DESCOMENTAR
+    "VentaDiariaProducto",
+    "PuntajeProducto",
+    "ProductoCompradoJunto",
+    "ProductoRelacionado",
+    "RefreshToken",
+    "SesionRevocada"
 ]
\ No newline at end of file
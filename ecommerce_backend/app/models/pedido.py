@@ -10,7 +10,7 @@ class Pedido(Base):
     total = Column(Numeric(10, 2), nullable=False)
     estado = Column(String, nullable=False, default="pendiente")  # pendiente, confirmado, enviado, entregado, cancelado
     direccion_envio = Column(String, nullable=False)
-    fecha_pedido = Column(DateTime, nullable=False)
+    fecha_pedido = Column(DateTime, nullable=False, index=True)
     fecha_entrega = Column(DateTime)
     notas = Column(Text)
     
@@ -22,8 +22,8 @@ class ItemPedido(Base):
     __tablename__ = "items_pedido"
     
     id = Column(Integer, primary_key=True, index=True)
-    pedido_id = Column(Integer, ForeignKey("pedidos.id"), nullable=False)
-    producto_id = Column(Integer, ForeignKey("productos.id"), nullable=False)
+    pedido_id = Column(Integer, ForeignKey("pedidos.id"), nullable=False, index=True)
+    producto_id = Column(Integer, ForeignKey("productos.id"), nullable=False, index=True)
     cantidad = Column(Integer, nullable=False)
     precio_unitario = Column(Numeric(10, 2), nullable=False)
     subtotal = Column(Numeric(10, 2), nullable=False)
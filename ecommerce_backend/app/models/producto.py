@@ -12,7 +12,7 @@ class Producto(Base, TimestampMixin):
     stock = Column(Integer, nullable=False, default=0)
     categoria = Column(String, index=True)
     imagen_url = Column(String)
-    vendedor_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    vendedor_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False, index=True)
     is_active = Column(Boolean, default=True)
     
     # Relaciones
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+from .base import Base
+
+# Valores para productos sin ventas / sin calificaciones: no NULL, para que el
+# ORDER BY ... DESC use el índice de la columna (NULLS LAST obliga a ordenar)
+TENDENCIA_SIN_VENTAS = -1e9
+VALORACION_SIN_CALIFICACIONES = 0.0
+
+class PuntajeProducto(Base):
+    """
+    Puntajes precalculados para ordenar el catálogo por popularidad
+
+    - unidades_vendidas: total histórico (best_selling)
+    - tendencia: ventas con decaimiento exponencial en el tiempo, guardadas en
+      escala log2 para que el orden no cambie con el paso del tiempo (trending)
+    - valoracion: promedio bayesiano de las calificaciones (top_rated)
+
+    Cada producto tiene su fila desde que se crea: el catálogo ordenado se lee
+    recorriendo el índice del puntaje y uniendo con productos.
+    """
+    __tablename__ = "puntajes_producto"
+    
+    producto_id = Column(Integer, ForeignKey("productos.id"), primary_key=True)
+    unidades_vendidas = Column(Integer, nullable=False, default=0, index=True)
+    tendencia = Column(Float, nullable=False, default=TENDENCIA_SIN_VENTAS, index=True)
+    suma_puntuaciones = Column(Integer, nullable=False, default=0)
+    cantidad_calificaciones = Column(Integer, nullable=False, default=0)
+    valoracion = Column(Float, nullable=False, default=VALORACION_SIN_CALIFICACIONES, index=True)
+    updated_at = Column(DateTime)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from .base import Base
+
+class ProductoCompradoJunto(Base):
+    """
+    Cantidad de pedidos en los que dos productos se compraron juntos
+
+    Se guarda en ambas direcciones (a, b) y (b, a) para que los vecinos de un
+    producto se lean con un rango del índice.
+    """
+    __tablename__ = "productos_comprados_juntos"
+    
+    producto_id = Column(Integer, ForeignKey("productos.id"), primary_key=True)
+    relacionado_id = Column(Integer, ForeignKey("productos.id"), primary_key=True)
+    veces = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("ix_comprados_juntos_producto_veces", "producto_id", "veces"),
+    )
+
+class ProductoRelacionado(Base):
+    """Top-K de productos comprados junto a cada producto (lo que se sirve)"""
+    __tablename__ = "productos_relacionados"
+    
+    producto_id = Column(Integer, ForeignKey("productos.id"), primary_key=True)
+    posicion = Column(Integer, primary_key=True)
+    relacionado_id = Column(Integer, ForeignKey("productos.id"), nullable=False)
+    veces = Column(Integer, nullable=False)
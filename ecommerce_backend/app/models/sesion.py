@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from datetime import datetime
+from .base import Base
+
+class RefreshToken(Base):
+    """
+    Refresh token emitido (uno por rotación)
+
+    Todos los tokens de una misma sesión comparten `familia`. Cada token se
+    puede usar una sola vez: si llega uno ya usado, alguien lo copió y se
+    revoca la familia completa.
+    """
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    familia = Column(String(32), nullable=False, index=True)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False, index=True)
+    usado = Column(Boolean, default=False, nullable=False)
+    expira_en = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class SesionRevocada(Base):
+    """
+    Familia de tokens revocada (logout o reutilización de un refresh token)
+
+    Los access tokens llevan la familia en el claim "fam", así que revocar la
+    familia invalida también los access tokens de esa sesión que no vencieron.
+
+    Cada proceso trae las revocaciones nuevas por `id` (creciente en orden de
+    commit con un único escritor), no por `revocada_en`: la hora la pone la
+    aplicación antes del commit y una revocación que confirma tarde quedaría
+    detrás de la marca de la última sincronización.
+    """
+    __tablename__ = "sesiones_revocadas"
+
+    id = Column(Integer, primary_key=True)
+    familia = Column(String(32), nullable=False, unique=True, index=True)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    motivo = Column(String(20), nullable=False)  # logout, reutilizacion
+    expira_en = Column(DateTime, nullable=False)  # Después de esto ya no hace falta guardarla
+    revocada_en = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, Numeric, ForeignKey, Date, Index
+from .base import Base
+
+class VentaDiariaProducto(Base):
+    """
+    Rollup de ventas por vendedor, producto y día
+
+    Se mantiene de forma incremental al crear cada pedido (misma transacción),
+    para que los dashboards no tengan que recorrer todo items_pedido.
+    """
+    __tablename__ = "ventas_diarias_producto"
+    
+    vendedor_id = Column(Integer, ForeignKey("usuarios.id"), primary_key=True)
+    producto_id = Column(Integer, ForeignKey("productos.id"), primary_key=True)
+    dia = Column(Date, primary_key=True)
+    ingresos = Column(Numeric(12, 2), nullable=False, default=0)
+    unidades = Column(Integer, nullable=False, default=0)
+    pedidos = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        # Series por vendedor en un rango de días (todas sus publicaciones)
+        Index("ix_ventas_diarias_vendedor_dia", "vendedor_id", "dia"),
+    )
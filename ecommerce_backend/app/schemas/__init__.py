@@ -7,7 +7,7 @@ from .usuario import (
     Token,
     TokenData
 )
-from .auth import LoginRequest, RegisterRequest, AuthResponse
+from .auth import LoginRequest, RegisterRequest, AuthResponse, RefreshRequest, DisponibilidadResponse
 
 __all__ = [
     "UsuarioCreate",
@@ -19,7 +19,9 @@ __all__ = [
     "TokenData",
     "LoginRequest",
     "RegisterRequest", 
-    "AuthResponse"
+    "AuthResponse",
+    "RefreshRequest",
+    "DisponibilidadResponse"
 ]
 
 from .mensaje import (
@@ -36,6 +38,8 @@ from .producto import (
     ProductoCreate,
     ProductoUpdate,
     ProductoResponse,
+    ProductoRelacionadoResumen,
+    ProductoDetalle,
     ProductoConVendedor,
     ProductoEnLista,
     ProductosPaginados
@@ -49,11 +53,20 @@ from .calificacion import (
     CalificacionesStats
 )
 
+from .venta import (
+    VentaDiaria,
+    VentasDiariasResponse,
+    VentaPorProducto,
+    VentasPorProductoResponse
+)
+
 __all__ = [
     # ... los anteriores ...
     "ProductoCreate",
     "ProductoUpdate",
     "ProductoResponse",
+    "ProductoRelacionadoResumen",
+    "ProductoDetalle",
     "ProductoConVendedor",
     "ProductoEnLista",
     "ProductosPaginados",
@@ -68,7 +81,11 @@ __all__ = [
     "CalificacionUpdate",
     "CalificacionResponse",
     "CalificacionConUsuario",
-    "CalificacionesStats"
+    "CalificacionesStats",
+    "VentaDiaria",
+    "VentasDiariasResponse",
+    "VentaPorProducto",
+    "VentasPorProductoResponse"
 ]
 
 
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
+from app.schemas.usuario import UsuarioPublico
 
 class LoginRequest(BaseModel):
     email: str
@@ -17,5 +18,14 @@ class RegisterRequest(BaseModel):
 class AuthResponse(BaseModel):
     access_token: str
     token_type: str
-    user: dict
+    user: UsuarioPublico
+    refresh_token: Optional[str] = None
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+
+class DisponibilidadResponse(BaseModel):
+    username: Optional[bool] = None  # True si está libre (None si no se consultó)
+    email: Optional[bool] = None
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, field_validator, ConfigDict, TypeAdapter
 from typing import Optional, List
 from datetime import datetime
 
@@ -6,7 +6,8 @@ from datetime import datetime
 class ConversacionCreate(BaseModel):
     usuario2_id: int  # ID del otro usuario con quien quiero conversar
     
-    @validator('usuario2_id')
+    @field_validator('usuario2_id')
+    @classmethod
     def validate_usuario2_id(cls, v):
         if v <= 0:
             raise ValueError('El ID del usuario debe ser mayor a 0')
@@ -21,8 +22,7 @@ class ConversacionResponse(BaseModel):
     updated_at: datetime
     is_active: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Schema para conversación con información del otro usuario
 class ConversacionConUsuario(BaseModel):
@@ -35,14 +35,14 @@ class ConversacionConUsuario(BaseModel):
     mensajes_no_leidos: int = 0
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Schema para crear un mensaje
 class MensajeCreate(BaseModel):
     contenido: str
     
-    @validator('contenido')
+    @field_validator('contenido')
+    @classmethod
     def validate_contenido(cls, v):
         v = v.strip()
         if len(v) == 0:
@@ -60,8 +60,7 @@ class MensajeResponse(BaseModel):
     created_at: datetime
     is_read: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Schema para mensaje con información del remitente
 class MensajeConRemitente(BaseModel):
@@ -74,9 +73,12 @@ class MensajeConRemitente(BaseModel):
     created_at: datetime
     is_read: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Schema para marcar mensajes como leídos
 class MarcarMensajesLeidos(BaseModel):
-    mensaje_ids: List[int]
\ No newline at end of file
+    mensaje_ids: List[int]
+
+# Validadores/serializadores precompilados para las listas más pedidas
+LISTA_CONVERSACIONES = TypeAdapter(List[ConversacionConUsuario])
+LISTA_MENSAJES = TypeAdapter(List[MensajeConRemitente])
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, field_validator, ConfigDict, TypeAdapter
 from typing import Optional, List
 from datetime import datetime
 
@@ -10,19 +10,22 @@ class ProductoCreate(BaseModel):
     categoria: Optional[str] = None
     imagen_url: Optional[str] = None
     
-    @validator('nombre')
+    @field_validator('nombre')
+    @classmethod
     def validate_nombre(cls, v):
         if len(v.strip()) < 3:
             raise ValueError('El nombre debe tener al menos 3 caracteres')
         return v.strip()
     
-    @validator('precio')
+    @field_validator('precio')
+    @classmethod
     def validate_precio(cls, v):
         if v <= 0:
             raise ValueError('El precio debe ser mayor a 0')
         return v
     
-    @validator('stock')
+    @field_validator('stock')
+    @classmethod
     def validate_stock(cls, v):
         if v < 0:
             raise ValueError('El stock no puede ser negativo')
@@ -37,19 +40,22 @@ class ProductoUpdate(BaseModel):
     imagen_url: Optional[str] = None
     is_active: Optional[bool] = None
     
-    @validator('nombre')
+    @field_validator('nombre')
+    @classmethod
     def validate_nombre(cls, v):
         if v is not None and len(v.strip()) < 3:
             raise ValueError('El nombre debe tener al menos 3 caracteres')
         return v.strip() if v else v
     
-    @validator('precio')
+    @field_validator('precio')
+    @classmethod
     def validate_precio(cls, v):
         if v is not None and v <= 0:
             raise ValueError('El precio debe ser mayor a 0')
         return v
     
-    @validator('stock')
+    @field_validator('stock')
+    @classmethod
     def validate_stock(cls, v):
         if v is not None and v < 0:
             raise ValueError('El stock no puede ser negativo')
@@ -68,8 +74,19 @@ class ProductoResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class ProductoRelacionadoResumen(BaseModel):
+    id: int
+    nombre: str
+    precio: float
+    imagen_url: Optional[str]
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class ProductoDetalle(ProductoResponse):
+    # Productos comprados frecuentemente junto a este
+    relacionados: List[ProductoRelacionadoResumen] = []
 
 class ProductoConVendedor(BaseModel):
     id: int
@@ -86,8 +103,7 @@ class ProductoConVendedor(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ProductoEnLista(BaseModel):
     id: int
@@ -100,11 +116,14 @@ class ProductoEnLista(BaseModel):
     vendedor_username: str
     is_active: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ProductosPaginados(BaseModel):
     total: int
     page: int
     page_size: int
-    productos: List[ProductoResponse]
\ No newline at end of file
+    productos: List[ProductoResponse]
+
+# Validadores/serializadores precompilados para las listas más pedidas
+PAGINA_PRODUCTOS = TypeAdapter(ProductosPaginados)
+LISTA_PRODUCTOS = TypeAdapter(List[ProductoResponse])
@@ -0,0 +1,65 @@
+# app/schemas/proyeccion.py
+# Proyección de campos (sparse fieldsets): ?fields=id,nombre,precio
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple, Type, get_args
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel, ConfigDict, create_model
+from app.schemas.respuesta import respuesta_json
+
+def parse_fields(fields: Optional[str], modelo: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """
+    Convierte el parámetro fields en una tupla de campos válidos del modelo
+
+    Retorna None si no se pidió proyección. Lanza 400 si hay campos desconocidos.
+    """
+    if not fields:
+        return None
+
+    campos = tuple(dict.fromkeys(c.strip() for c in fields.split(",") if c.strip()))
+    if not campos:
+        return None
+
+    invalidos = [c for c in campos if c not in modelo.model_fields]
+    if invalidos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos no válidos: {', '.join(invalidos)}. "
+                   f"Disponibles: {', '.join(modelo.model_fields)}"
+        )
+    return campos
+
+@lru_cache(maxsize=256)
+def modelo_recortado(modelo: Type[BaseModel], campos: Tuple[str, ...]) -> Type[BaseModel]:
+    """Crea (y cachea) una versión del modelo con solo los campos pedidos"""
+    definiciones = {
+        campo: (modelo.model_fields[campo].annotation, modelo.model_fields[campo])
+        for campo in campos
+    }
+    return create_model(
+        f"{modelo.__name__}Parcial",
+        __config__=ConfigDict(from_attributes=True),
+        **definiciones
+    )
+
+@lru_cache(maxsize=256)
+def pagina_recortada(
+    modelo_pagina: Type[BaseModel],
+    campo_items: str,
+    campos: Tuple[str, ...]
+) -> Type[BaseModel]:
+    """Versión de un modelo paginado cuya lista de items usa el modelo recortado"""
+    modelo_item = get_args(modelo_pagina.model_fields[campo_items].annotation)[0]
+    return create_model(
+        f"{modelo_pagina.__name__}Parcial",
+        __base__=modelo_pagina,
+        **{campo_items: (List[modelo_recortado(modelo_item, campos)], ...)}
+    )
+
+def respuesta_parcial(modelo: Any, datos: Any) -> Response:
+    """
+    Valida los datos contra un modelo recortado y los serializa directo a JSON
+
+    Se retorna un Response ya armado para que FastAPI no vuelva a validar
+    contra el response_model completo del endpoint.
+    """
+    return respuesta_json(modelo, datos)
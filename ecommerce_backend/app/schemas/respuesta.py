@@ -0,0 +1,25 @@
+# app/schemas/respuesta.py
+# Camino rápido de serialización: objetos ORM → bytes JSON en una sola pasada
+from functools import lru_cache
+from typing import Any
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+@lru_cache(maxsize=256)
+def adaptador(modelo: Any) -> TypeAdapter:
+    """TypeAdapter cacheado por modelo (armarlo compila el validador y el serializador)"""
+    return TypeAdapter(modelo)
+
+def respuesta_json(modelo: Any, datos: Any, status_code: int = status.HTTP_200_OK) -> Response:
+    """
+    Valida los datos una vez contra el modelo y los serializa directo a JSON
+
+    `modelo` es un modelo/tipo o un TypeAdapter ya armado (ver los de
+    app/schemas para las listas más usadas). `datos` puede contener objetos
+    ORM (from_attributes): no hace falta armar dicts a mano. Se retorna un
+    Response ya armado para que FastAPI no vuelva a validar contra el
+    response_model del endpoint, que queda solo para la documentación.
+    """
+    tipo = modelo if isinstance(modelo, TypeAdapter) else adaptador(modelo)
+    contenido = tipo.dump_json(tipo.validate_python(datos, from_attributes=True))
+    return Response(content=contenido, status_code=status_code, media_type="application/json")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, EmailStr, field_validator, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 
@@ -16,7 +16,8 @@ class UsuarioCreate(BaseModel):
     provincia: Optional[str] = None
     codigo_postal: Optional[str] = None
     
-    @validator('username')
+    @field_validator('username')
+    @classmethod
     def validate_username(cls, v):
         if len(v) < 3:
             raise ValueError('El username debe tener al menos 3 caracteres')
@@ -25,7 +26,8 @@ class UsuarioCreate(BaseModel):
             raise ValueError('El username solo puede contener letras, números y guiones bajos')
         return v
     
-    @validator('password')
+    @field_validator('password')
+    @classmethod
     def validate_password(cls, v):
         if len(v) < 6:
             raise ValueError('La contraseña debe tener al menos 6 caracteres')
@@ -41,6 +43,7 @@ class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
     expires_in: int
+    refresh_token: Optional[str] = None
 
 class TokenData(BaseModel):
     username: Optional[str] = None
@@ -54,8 +57,7 @@ class UsuarioPublico(BaseModel):
     created_at: datetime
     is_active: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Schema para perfil completo - AGREGAR nuevos campos
 class UsuarioCompleto(BaseModel):
@@ -74,8 +76,7 @@ class UsuarioCompleto(BaseModel):
     updated_at: datetime
     is_active: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Schema para actualizar usuario - AGREGAR nuevos campos
 class UsuarioUpdate(BaseModel):
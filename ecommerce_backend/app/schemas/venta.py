@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import date
+
+class VentaDiaria(BaseModel):
+    dia: date
+    ingresos: float
+    unidades: int
+    pedidos: int
+
+class VentasDiariasResponse(BaseModel):
+    desde: date
+    hasta: date
+    producto_id: Optional[int] = None
+    total_ingresos: float
+    total_unidades: int
+    serie: List[VentaDiaria]
+
+class VentaPorProducto(BaseModel):
+    producto_id: int
+    nombre: str
+    ingresos: float
+    unidades: int
+    pedidos: int
+
+class VentasPorProductoResponse(BaseModel):
+    desde: date
+    hasta: date
+    productos: List[VentaPorProducto]
@@ -3,11 +3,7 @@ import logging
 from datetime import datetime
 from typing import Optional
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# El logging se configura en app/core/logs.py (al iniciar la aplicación)
 logger = logging.getLogger(__name__)
 
 def enviar_notificacion_mensaje(
@@ -0,0 +1 @@
+# Benchmarks de rendimiento del backend (se ejecutan con: python -m benchmarks.<nombre>)
@@ -0,0 +1,417 @@
+# benchmarks/bench_api.py - Latencia y throughput de cada endpoint de la API v1
+#
+# Uso (desde ecommerce_backend/):
+#   python -m benchmarks.bench_api --escala chica
+#   python -m benchmarks.bench_api --escala media --guardar benchmarks/baselines/media.json
+#   python -m benchmarks.bench_api --escala media --comparar benchmarks/baselines/media.json
+#   python -m benchmarks.bench_api --db /tmp/grande.db --escala grande --solo products
+#   python -m benchmarks.bench_api --solo "GET /products" --sin-cache
+#
+# La app corre en este mismo proceso (httpx.ASGITransport: sin red ni uvicorn)
+# contra una base SQLite poblada con scripts/generar_datos.py a la escala elegida. Cada
+# escenario lanza --concurrencia clientes, cada uno con su usuario y su parte
+# de las peticiones.
+#
+# Con --comparar, el proceso termina con código 1 si algún escenario empeoró más
+# que --tolerancia en p95 o en throughput respecto de la corrida guardada.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+ESCALAS = ("chica", "media", "grande")  # ver scripts/generar_datos.py
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)]
+
+
+# --- Escenarios ---
+
+@dataclass
+class Contexto:
+    """Estado compartido por los escenarios (tokens, ids propios de cada cliente)"""
+    rng: random.Random
+    usuarios: int
+    productos: int
+    # Convenciones del dataset de scripts/generar_datos.py
+    password: str
+    categorias: List[str]
+    username_de: Callable[[int], str]
+    email_de: Callable[[int], str]
+    headers: List[Dict[str, str]] = field(default_factory=list)
+    ids_usuario: List[int] = field(default_factory=list)
+    refresh: List[str] = field(default_factory=list)
+    productos_propios: List[List[int]] = field(default_factory=list)
+    conversaciones_propias: List[List[int]] = field(default_factory=list)
+    para_borrar: List[List[int]] = field(default_factory=list)
+    para_logout: List[List[str]] = field(default_factory=list)
+    contador: int = 0
+
+    def unico(self) -> int:
+        self.contador += 1
+        return self.contador
+
+    def producto(self) -> int:
+        return self.rng.randint(1, self.productos)
+
+    def otro_usuario(self, cliente: int) -> int:
+        otro = self.rng.randint(1, self.usuarios - 1)
+        return otro + 1 if otro >= self.ids_usuario[cliente] else otro
+
+
+@dataclass
+class Escenario:
+    nombre: str
+    # (contexto, cliente) -> argumentos de httpx.AsyncClient.request
+    peticion: Callable[[Contexto, int], Dict[str, Any]]
+    costoso: bool = False  # bcrypt: se usa --peticiones-costosas
+    # (contexto, cliente, respuesta) para encadenar estado (refresh tokens)
+    despues: Optional[Callable[[Contexto, int, Any], None]] = None
+
+
+def _get(url, **kwargs):
+    return {"method": "GET", "url": url, **kwargs}
+
+
+def _registro(n: int) -> Dict[str, str]:
+    return {"email": f"nuevo{n}@bench.com", "username": f"nuevo{n}", "password": "bench123",
+            "nombre": "Nuevo", "apellido": "Usuario"}
+
+
+def _guardar_refresh(ctx: Contexto, cliente: int, respuesta) -> None:
+    if respuesta.status_code == 200:
+        ctx.refresh[cliente] = respuesta.json()["refresh_token"]
+
+
+ESCENARIOS = [
+    # auth
+    Escenario("GET /auth/disponibilidad", lambda ctx, c: _get(
+        "/auth/disponibilidad", params={"username": ctx.username_de(ctx.rng.randint(1, ctx.usuarios * 2))})),
+    Escenario("POST /auth/register", lambda ctx, c: {
+        "method": "POST", "url": "/auth/register", "json": _registro(ctx.unico())}, costoso=True),
+    Escenario("POST /auth/login", lambda ctx, c: {
+        "method": "POST", "url": "/auth/login",
+        "data": {"username": ctx.email_de(ctx.ids_usuario[c]), "password": ctx.password}}, costoso=True),
+    Escenario("POST /auth/login-simple", lambda ctx, c: {
+        "method": "POST", "url": "/auth/login-simple",
+        "json": {"email": ctx.email_de(ctx.ids_usuario[c]), "password": ctx.password}}, costoso=True),
+    Escenario("POST /auth/refresh", lambda ctx, c: {
+        "method": "POST", "url": "/auth/refresh", "json": {"refresh_token": ctx.refresh[c]}},
+        despues=_guardar_refresh),
+    Escenario("POST /auth/logout", lambda ctx, c: {
+        "method": "POST", "url": "/auth/logout", "json": {"refresh_token": ctx.para_logout[c].pop()}}),
+    # usuarios
+    Escenario("GET /usuarios/me", lambda ctx, c: _get("/usuarios/me", headers=ctx.headers[c])),
+    Escenario("GET /usuarios/me/profile", lambda ctx, c: _get("/usuarios/me/profile", headers=ctx.headers[c])),
+    Escenario("PUT /usuarios/me", lambda ctx, c: {
+        "method": "PUT", "url": "/usuarios/me", "headers": ctx.headers[c],
+        "json": {"ciudad": ctx.rng.choice(["Córdoba", "Rosario", "Salta"])}}),
+    Escenario("GET /usuarios/{username}", lambda ctx, c: _get(
+        f"/usuarios/{ctx.username_de(ctx.rng.randint(1, ctx.usuarios))}")),
+    # productos
+    Escenario("GET /products/", lambda ctx, c: _get(
+        "/products/", params={"page": ctx.rng.randint(1, 50), "page_size": 20})),
+    Escenario("GET /products/?page_size=100", lambda ctx, c: _get(
+        "/products/", params={"page": ctx.rng.randint(1, 20), "page_size": 100})),
+    Escenario("GET /products/?categoria", lambda ctx, c: _get(
+        "/products/", params={"categoria": ctx.rng.choice(ctx.categorias), "page_size": 20})),
+    Escenario("GET /products/?search", lambda ctx, c: _get(
+        "/products/", params={"search": f"Producto {ctx.rng.randint(1, 999)}", "page_size": 20})),
+    Escenario("GET /products/?sort=trending", lambda ctx, c: _get(
+        "/products/", params={"sort": "trending", "page_size": 20})),
+    Escenario("GET /products/?fields", lambda ctx, c: _get(
+        "/products/", params={"fields": "id,nombre,precio", "page_size": 50})),
+    Escenario("GET /products/mis-productos", lambda ctx, c: _get("/products/mis-productos", headers=ctx.headers[c])),
+    Escenario("GET /products/{producto_id}", lambda ctx, c: _get(f"/products/{ctx.producto()}")),
+    Escenario("GET /products/{producto_id}/reviews", lambda ctx, c: _get(f"/products/{ctx.producto()}/reviews")),
+    Escenario("GET /products/{producto_id}/reviews/my-review", lambda ctx, c: _get(
+        f"/products/{ctx.producto()}/reviews/my-review", headers=ctx.headers[c])),
+    Escenario("POST /products/", lambda ctx, c: {
+        "method": "POST", "url": "/products/", "headers": ctx.headers[c],
+        "json": {"nombre": f"Nuevo {ctx.unico()}", "descripcion": "creado por el benchmark",
+                 "precio": 99.9, "stock": 10, "categoria": "hogar"}}),
+    Escenario("PUT /products/{producto_id}", lambda ctx, c: {
+        "method": "PUT", "url": f"/products/{ctx.rng.choice(ctx.productos_propios[c])}",
+        "headers": ctx.headers[c], "json": {"stock": ctx.rng.randint(1, 1000)}}),
+    Escenario("DELETE /products/{producto_id}", lambda ctx, c: {
+        "method": "DELETE", "url": f"/products/{ctx.para_borrar[c].pop()}", "headers": ctx.headers[c]}),
+    Escenario("POST /products/{producto_id}/reviews", lambda ctx, c: {
+        "method": "POST", "url": f"/products/{ctx.producto()}/reviews", "headers": ctx.headers[c],
+        "json": {"puntuacion": ctx.rng.randint(1, 5), "comentario": "bench"}}),
+    # conversaciones
+    Escenario("GET /conversations/", lambda ctx, c: _get("/conversations/", headers=ctx.headers[c])),
+    Escenario("GET /conversations/{conversacion_id}", lambda ctx, c: _get(
+        f"/conversations/{ctx.rng.choice(ctx.conversaciones_propias[c])}", headers=ctx.headers[c])),
+    Escenario("GET /conversations/{conversacion_id}/messages", lambda ctx, c: _get(
+        f"/conversations/{ctx.rng.choice(ctx.conversaciones_propias[c])}/messages", headers=ctx.headers[c])),
+    Escenario("POST /conversations/", lambda ctx, c: {
+        "method": "POST", "url": "/conversations/", "headers": ctx.headers[c],
+        "json": {"usuario2_id": ctx.otro_usuario(c)}}),
+    Escenario("POST /conversations/{conversacion_id}/messages", lambda ctx, c: {
+        "method": "POST", "url": f"/conversations/{ctx.rng.choice(ctx.conversaciones_propias[c])}/messages",
+        "headers": ctx.headers[c], "json": {"contenido": f"hola {ctx.unico()}"}}),
+    # pedidos
+    Escenario("GET /orders/", lambda ctx, c: _get("/orders/", headers=ctx.headers[c])),
+    # Export completo de los items vendidos por el cliente (cuerpo en streaming, leído entero)
+    Escenario("GET /orders/export", lambda ctx, c: _get(
+        "/orders/export", headers=ctx.headers[c], params={"formato": ctx.rng.choice(("ndjson", "csv"))})),
+    Escenario("POST /orders/", lambda ctx, c: {
+        "method": "POST", "url": "/orders/", "headers": ctx.headers[c],
+        "json": {"items": [{"producto_id": ctx.producto(), "cantidad": 1, "precio_unitario": 10}
+                           for _ in range(ctx.rng.randint(1, 3))]}}),
+    # ventas
+    Escenario("GET /ventas/diarias", lambda ctx, c: _get("/ventas/diarias", headers=ctx.headers[c])),
+    Escenario("GET /ventas/productos", lambda ctx, c: _get("/ventas/productos", headers=ctx.headers[c])),
+]
+
+
+def _cuotas(clientes: int, peticiones: int) -> List[int]:
+    """Peticiones de cada cliente (cada uno consume sus propios recursos)"""
+    return [peticiones // clientes + (1 if c < peticiones % clientes else 0) for c in range(clientes)]
+
+
+def _preparar_contexto(ctx: Contexto, clientes: int, peticiones: int) -> None:
+    """Ids propios de cada cliente y recursos que se consumen (productos a borrar, sesiones)"""
+    from app.database import SessionLocal, engine
+    from app.crud.sesion import crear_sesion
+    from app.models.producto import Producto
+    from app.models.mensaje import Conversacion
+
+    db = SessionLocal()
+    try:
+        por_cliente = max(_cuotas(clientes, peticiones))
+        with engine.begin() as conn:
+            for c in range(clientes):
+                conn.execute(Producto.__table__.insert(), [
+                    {"nombre": f"Para borrar {c}-{i}", "precio": 1, "stock": 1,
+                     "vendedor_id": ctx.ids_usuario[c], "is_active": True}
+                    for i in range(por_cliente)
+                ])
+        for c, usuario_id in enumerate(ctx.ids_usuario):
+            propios = [p for (p,) in db.query(Producto.id).filter(
+                Producto.vendedor_id == usuario_id).order_by(Producto.id)]
+            borrables = [p for (p,) in db.query(Producto.id).filter(
+                Producto.vendedor_id == usuario_id, Producto.nombre.like("Para borrar%"))]
+            ctx.para_borrar.append(borrables)
+            ctx.productos_propios.append([p for p in propios if p not in set(borrables)] or propios)
+
+            conversaciones = [cid for (cid,) in db.query(Conversacion.id).filter(
+                (Conversacion.usuario1_id == usuario_id) | (Conversacion.usuario2_id == usuario_id)
+            ).limit(50)]
+            if not conversaciones:
+                otro = ctx.ids_usuario[(c + 1) % len(ctx.ids_usuario)] if len(ctx.ids_usuario) > 1 else 2
+                conversacion = Conversacion(usuario1_id=usuario_id, usuario2_id=otro)
+                db.add(conversacion)
+                db.commit()
+                conversaciones = [conversacion.id]
+            ctx.conversaciones_propias.append(conversaciones)
+
+            username = ctx.username_de(usuario_id)
+            ctx.para_logout.append([crear_sesion(db, usuario_id, username)[0] for _ in range(por_cliente)])
+    finally:
+        db.close()
+
+
+async def _correr_escenario(cliente_http, escenario: Escenario, ctx: Contexto,
+                            clientes: int, peticiones: int) -> Dict[str, Any]:
+    latencias: List[float] = []
+    errores: Dict[str, int] = {}
+
+    async def trabajador(c: int, cuota: int):
+        for _ in range(cuota):
+            kwargs = escenario.peticion(ctx, c)
+            inicio = time.perf_counter()
+            respuesta = await cliente_http.request(**kwargs)
+            latencias.append(time.perf_counter() - inicio)
+            if respuesta.status_code >= 400:
+                errores[str(respuesta.status_code)] = errores.get(str(respuesta.status_code), 0) + 1
+            if escenario.despues is not None:
+                escenario.despues(ctx, c, respuesta)
+
+    inicio = time.perf_counter()
+    inicio_cpu = time.process_time()
+    await asyncio.gather(*(trabajador(c, cuota) for c, cuota in enumerate(_cuotas(clientes, peticiones))))
+    duracion = time.perf_counter() - inicio
+    # CPU de todo el proceso (app y cliente httpx) por petición
+    cpu = time.process_time() - inicio_cpu
+
+    return {
+        "peticiones": len(latencias),
+        "errores": errores,
+        "p50_ms": round(_percentil(latencias, 0.50) * 1000, 2),
+        "p95_ms": round(_percentil(latencias, 0.95) * 1000, 2),
+        "p99_ms": round(_percentil(latencias, 0.99) * 1000, 2),
+        "rps": round(len(latencias) / duracion, 1),
+        "cpu_ms": round(cpu / max(len(latencias), 1) * 1000, 3),
+    }
+
+
+async def _correr(args, escala: Dict[str, int]) -> Dict[str, Any]:
+    import httpx
+    from app.main import app
+    from scripts import generar_datos
+
+    ctx = Contexto(
+        rng=random.Random(args.semilla),
+        usuarios=escala["usuarios"],
+        productos=escala["productos"],
+        password=generar_datos.PASSWORD,
+        categorias=generar_datos.CATEGORIAS,
+        username_de=generar_datos.username_de,
+        email_de=generar_datos.email_de,
+    )
+    resultados = {}
+    async with app.router.lifespan_context(app):
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://bench/api/v1") as cliente_http:
+            # Un usuario (y una sesión) por cliente concurrente
+            ctx.ids_usuario = [1 + i % escala["usuarios"] for i in range(args.concurrencia)]
+            for usuario_id in ctx.ids_usuario:
+                r = await cliente_http.post("/auth/login-simple", json={
+                    "email": ctx.email_de(usuario_id), "password": ctx.password})
+                r.raise_for_status()
+                ctx.headers.append({"Authorization": f"Bearer {r.json()['access_token']}"})
+                ctx.refresh.append(r.json()["refresh_token"])
+            _preparar_contexto(ctx, args.concurrencia, args.peticiones)
+
+            for escenario in ESCENARIOS:
+                if args.solo and args.solo not in escenario.nombre:
+                    continue
+                peticiones = args.peticiones_costosas if escenario.costoso else args.peticiones
+                resultado = await _correr_escenario(cliente_http, escenario, ctx, args.concurrencia, peticiones)
+                resultados[escenario.nombre] = resultado
+                errores = f"  errores={resultado['errores']}" if resultado["errores"] else ""
+                print(f"{escenario.nombre:<52} p50={resultado['p50_ms']:>8.2f}  p95={resultado['p95_ms']:>8.2f}  "
+                      f"p99={resultado['p99_ms']:>8.2f} ms  {resultado['rps']:>8.1f} req/s  "
+                      f"cpu={resultado['cpu_ms']:>7.2f} ms/req{errores}")
+    return resultados
+
+
+# --- Baselines ---
+
+def _commit_actual() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _comparar(actual: Dict[str, Any], base: Dict[str, Any], tolerancia: float) -> List[str]:
+    """Escenarios con p95 o throughput peores que la base más allá de la tolerancia"""
+    regresiones = []
+    print(f"\n📈 Comparación con {base['meta'].get('commit') or 'base'} ({base['meta']['fecha']})")
+    for nombre, res in actual.items():
+        previo = base["resultados"].get(nombre)
+        if previo is None:
+            continue
+        delta_p95 = res["p95_ms"] / previo["p95_ms"] - 1 if previo["p95_ms"] else 0.0
+        delta_rps = res["rps"] / previo["rps"] - 1 if previo["rps"] else 0.0
+        regresion = delta_p95 > tolerancia or delta_rps < -tolerancia
+        marca = "❌" if regresion else "  "
+        print(f"{marca} {nombre:<52} p95 {delta_p95:+7.1%}   req/s {delta_rps:+7.1%}")
+        if regresion:
+            regresiones.append(nombre)
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark en proceso de todos los endpoints de la API v1")
+    parser.add_argument("--escala", choices=ESCALAS, default="chica")
+    parser.add_argument("--usuarios", type=int, help="Pisa la cantidad de usuarios de la escala")
+    parser.add_argument("--productos", type=int, help="Pisa la cantidad de productos de la escala")
+    parser.add_argument("--mensajes", type=int, help="Pisa la cantidad de mensajes de la escala")
+    parser.add_argument("--db", help="Base SQLite a usar; si ya tiene datos no se vuelve a poblar")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--concurrencia", type=int, default=16, help="Clientes concurrentes")
+    parser.add_argument("--peticiones", type=int, default=500, help="Peticiones por escenario")
+    parser.add_argument("--peticiones-costosas", type=int, default=40,
+                        help="Peticiones para los escenarios con bcrypt (login, register)")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="Deshabilitar la caché de respuestas de los GET públicos (RESPONSE_CACHE_ENABLED)")
+    parser.add_argument("--solo", help="Correr solo los escenarios cuyo nombre contenga este texto")
+    parser.add_argument("--guardar", help="Guardar los resultados como baseline JSON")
+    parser.add_argument("--comparar", help="Baseline JSON contra la que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.20,
+                        help="Empeoramiento admitido de p95 y throughput (0.20 = 20%%)")
+    args = parser.parse_args()
+
+    # Directorio de trabajo temporal: lo que la app escribe con rutas relativas
+    # (notifications.log, email_notifications.log) no cae en el repositorio
+    tmp = tempfile.TemporaryDirectory()
+    ruta_db = os.path.abspath(args.db) if args.db else os.path.join(tmp.name, "bench.db")
+    existia = os.path.exists(ruta_db)
+
+    # La configuración se lee al importar app: se fija antes de cualquier import
+    os.environ["DATABASE_URL"] = f"sqlite:///{ruta_db}"
+    os.environ["LOGIN_RATE_LIMIT_ENABLED"] = "false"
+    if args.sin_cache:
+        os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Importa la configuración (y lee .env) desde el directorio actual, antes de cambiarlo
+    from scripts import generar_datos
+
+    base = generar_datos.ESCALAS[args.escala]
+    escala = generar_datos.conteos_para(
+        args.usuarios or base["usuarios"],
+        args.productos or base["productos"],
+        args.mensajes or base["mensajes"],
+    )
+
+    print(f"📊 BENCHMARK API v1 ({args.escala}: {escala}, {args.concurrencia} clientes)")
+    print("=" * 50)
+    directorio_original = os.getcwd()
+    os.chdir(tmp.name)
+    try:
+        if not existia:
+            inicio = time.perf_counter()
+            generar_datos.generar(escala, args.semilla)
+            print(f"🌱 Datos generados en {time.perf_counter() - inicio:.1f}s ({ruta_db})")
+
+        resultados = asyncio.run(_correr(args, escala))
+    finally:
+        os.chdir(directorio_original)
+        tmp.cleanup()
+
+    corrida = {
+        "meta": {
+            "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _commit_actual(),
+            "python": platform.python_version(),
+            "escala": escala,
+            "concurrencia": args.concurrencia,
+            "peticiones": args.peticiones,
+        },
+        "resultados": resultados,
+    }
+    if args.guardar:
+        os.makedirs(os.path.dirname(os.path.abspath(args.guardar)), exist_ok=True)
+        with open(args.guardar, "w", encoding="utf-8") as archivo:
+            json.dump(corrida, archivo, indent=2, ensure_ascii=False)
+        print(f"\n💾 Baseline guardada en {args.guardar}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            base = json.load(archivo)
+        regresiones = _comparar(resultados, base, args.tolerancia)
+        if regresiones:
+            print(f"\n❌ {len(regresiones)} escenario(s) con regresión de más de {args.tolerancia:.0%}")
+            sys.exit(1)
+        print("\n✅ Sin regresiones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_bus.py - Entrega y latencia del bus de invalidación entre procesos
+#
+# Uso (desde ecommerce_backend/):
+#   python -m benchmarks.bench_bus --workers 4 --eventos 5000
+#
+# Levanta --workers subprocesos que escuchan en el bus (como workers de
+# uvicorn) y publica --eventos invalidaciones desde este proceso. Cada worker
+# informa cuántos eventos recibió y con qué latencia (el id de cada evento es
+# el time_ns de la publicación).
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import List
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)]
+
+
+def _worker(directorio: str, eventos: int, espera: float) -> dict:
+    """Corre dentro del subproceso: escucha hasta recibir todos los eventos o agotar la espera"""
+    from app.core.bus_invalidacion import BusInvalidacion
+
+    latencias: List[float] = []
+    completo = threading.Event()
+
+    def al_invalidar(publicado_ns: int):
+        # El benchmark publica como id el time_ns del momento de publicar
+        latencias.append((time.time_ns() - publicado_ns) / 1e6)
+        if len(latencias) >= eventos:
+            completo.set()
+
+    bus = BusInvalidacion()
+    bus.suscribir("producto", al_invalidar)
+    bus.iniciar(directorio)
+    print("listo", flush=True)
+    completo.wait(espera)
+    bus.detener()
+    return {
+        "recibidos": len(latencias),
+        "p50_ms": round(_percentil(latencias, 0.50), 3),
+        "p99_ms": round(_percentil(latencias, 0.99), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del bus de invalidación entre workers")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--eventos", type=int, default=5000)
+    parser.add_argument("--espera", type=float, default=30.0, help="Segundos máximos de espera por worker")
+    parser.add_argument("--hijo", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args.hijo:
+        print(json.dumps(_worker(args.hijo, args.eventos, args.espera)))
+        return
+
+    from app.core.bus_invalidacion import BusInvalidacion
+
+    print(f"📊 BENCHMARK BUS DE INVALIDACIÓN ({args.workers} workers, {args.eventos} eventos)")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as directorio:
+        hijos = [
+            subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.bench_bus", "--hijo", directorio,
+                 "--eventos", str(args.eventos), "--espera", str(args.espera)],
+                stdout=subprocess.PIPE, text=True
+            )
+            for _ in range(args.workers)
+        ]
+        for hijo in hijos:
+            hijo.stdout.readline()  # "listo"
+
+        bus = BusInvalidacion()
+        bus.iniciar(directorio)
+        inicio = time.perf_counter()
+        for i in range(args.eventos):
+            bus.publicar("producto", time.time_ns())
+            if i % 200 == 199:
+                time.sleep(0.001)  # Ritmo de escrituras realista: no llenar los buffers de golpe
+        publicacion = time.perf_counter() - inicio
+        resultados = [json.loads(hijo.communicate()[0].strip().splitlines()[-1]) for hijo in hijos]
+        bus.detener()
+
+    print(f"Publicación: {publicacion / args.eventos * 1e6:.1f} µs por evento "
+          f"({args.workers} destinatarios), {bus.perdidos} no entregados")
+    for numero, resultado in enumerate(resultados):
+        print(f"worker {numero}: {resultado}")
+    entregados = sum(r["recibidos"] for r in resultados)
+    print(f"\n📬 Entregados: {entregados}/{args.eventos * args.workers}")
+
+
+if __name__ == "__main__":
+    main()
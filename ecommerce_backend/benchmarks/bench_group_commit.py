@@ -0,0 +1,106 @@
+# benchmarks/bench_group_commit.py - Throughput de escrituras con y sin group commit
+#
+# Uso (desde ecommerce_backend/):
+#   python -m benchmarks.bench_group_commit --hilos 16 --mensajes 200
+#
+# Cada modo corre en un subproceso propio con una base SQLite temporal, porque
+# el escritor de group commit se configura al importar app.database.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def _ejecutar_modo(hilos: int, mensajes: int) -> dict:
+    """Corre dentro del subproceso: crea datos mínimos y mide create_mensaje"""
+    from app import database
+    from app.database import SessionLocal, create_tables
+    from app.crud.mensaje import create_mensaje, create_conversacion
+    from app.models.usuario import Usuario
+
+    create_tables()
+    db = SessionLocal()
+    u1 = Usuario(email="a@bench.com", username="bench_a", password_hash="x", nombre="A", apellido="A")
+    u2 = Usuario(email="b@bench.com", username="bench_b", password_hash="x", nombre="B", apellido="B")
+    db.add_all([u1, u2])
+    db.commit()
+    conversacion_id = create_conversacion(db, u1.id, u2.id).id
+    remitente_id = u1.id
+    db.close()
+
+    errores = []
+
+    def trabajador():
+        for i in range(mensajes):
+            session = SessionLocal()
+            try:
+                create_mensaje(session, conversacion_id, remitente_id, f"mensaje {i}")
+            except Exception as e:
+                errores.append(e)
+            finally:
+                session.close()
+
+    threads = [threading.Thread(target=trabajador) for _ in range(hilos)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duracion = time.perf_counter() - inicio
+
+    total = hilos * mensajes
+    resultado = {
+        "escrituras": total,
+        "errores": len(errores),
+        "segundos": round(duracion, 3),
+        "escrituras_por_segundo": round(total / duracion, 1),
+    }
+    if database.escritor is not None:
+        resultado["lotes"] = database.escritor.lotes
+        resultado["promedio_por_lote"] = round(
+            database.escritor.unidades / max(database.escritor.lotes, 1), 1
+        )
+        database.escritor.detener()
+    return resultado
+
+
+def _lanzar(group_commit: bool, hilos: int, mensajes: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        env["GROUP_COMMIT_ENABLED"] = "true" if group_commit else "false"
+        salida = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_group_commit", "--hijo",
+             "--hilos", str(hilos), "--mensajes", str(mensajes)],
+            env=env, capture_output=True, text=True, check=True
+        )
+        return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de group commit sobre SQLite")
+    parser.add_argument("--hilos", type=int, default=16)
+    parser.add_argument("--mensajes", type=int, default=200, help="Mensajes por hilo")
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        print(json.dumps(_ejecutar_modo(args.hilos, args.mensajes)))
+        return
+
+    print("📊 BENCHMARK GROUP COMMIT (create_mensaje)")
+    print("=" * 50)
+    sin = _lanzar(False, args.hilos, args.mensajes)
+    print(f"Commit por request : {sin}")
+    con = _lanzar(True, args.hilos, args.mensajes)
+    print(f"Group commit       : {con}")
+    mejora = con["escrituras_por_segundo"] / sin["escrituras_por_segundo"]
+    print(f"\n🚀 Mejora de throughput: x{mejora:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/bench_login.py - Throughput de login y latencia del catálogo durante una ráfaga
+#
+# Uso (desde ecommerce_backend/):
+#   python -m benchmarks.bench_login --hilos 16 --logins 20 --rounds 10
+#
+# Cada configuración del pool de contraseñas corre en un subproceso propio con
+# una base SQLite temporal, porque el pool se configura desde settings.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+CONFIGURACIONES = [
+    ("thread x2", {"PASSWORD_POOL_KIND": "thread", "PASSWORD_POOL_SIZE": "2"}),
+    ("thread x4", {"PASSWORD_POOL_KIND": "thread", "PASSWORD_POOL_SIZE": "4"}),
+    ("process x4", {"PASSWORD_POOL_KIND": "process", "PASSWORD_POOL_SIZE": "4"}),
+]
+
+
+def _percentil(valores, p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)]
+
+
+def _ejecutar_modo(hilos: int, logins: int) -> dict:
+    """Corre dentro del subproceso: crea usuarios y mide logins + lecturas del catálogo"""
+    from fastapi.testclient import TestClient
+    from app.database import SessionLocal, create_tables
+    from app.core.security import get_password_hash, estadisticas_passwords
+    from app.models.usuario import Usuario
+    from app.models.producto import Producto
+
+    create_tables()
+    db = SessionLocal()
+    password_hash = get_password_hash("bench123")
+    usuarios = [
+        Usuario(email=f"u{i}@bench.com", username=f"bench_{i}", password_hash=password_hash,
+                nombre="Bench", apellido="User")
+        for i in range(hilos)
+    ]
+    db.add_all(usuarios)
+    db.flush()
+    db.add_all([
+        Producto(nombre=f"Producto {i}", precio=10 + i, stock=100, vendedor_id=usuarios[0].id)
+        for i in range(50)
+    ])
+    db.commit()
+    db.close()
+
+    from app.main import app
+
+    errores = []
+    latencias_catalogo = []
+    terminado = threading.Event()
+
+    with TestClient(app) as client:
+        def login(i: int):
+            for _ in range(logins):
+                r = client.post("/api/v1/auth/login-simple",
+                                json={"email": f"u{i}@bench.com", "password": "bench123"})
+                if r.status_code != 200:
+                    errores.append(r.status_code)
+
+        def catalogo():
+            while not terminado.is_set():
+                inicio = time.perf_counter()
+                client.get("/api/v1/products/?page_size=20")
+                latencias_catalogo.append((time.perf_counter() - inicio) * 1000)
+
+        lector = threading.Thread(target=catalogo)
+        lector.start()
+        threads = [threading.Thread(target=login, args=(i,)) for i in range(hilos)]
+        inicio = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        duracion = time.perf_counter() - inicio
+        terminado.set()
+        lector.join()
+
+    total = hilos * logins
+    return {
+        "logins": total,
+        "errores": len(errores),
+        "logins_por_segundo": round(total / duracion, 1),
+        "catalogo_p50_ms": round(statistics.median(latencias_catalogo), 1) if latencias_catalogo else 0.0,
+        "catalogo_p95_ms": round(_percentil(latencias_catalogo, 0.95), 1),
+        "pool": estadisticas_passwords.resumen(),
+    }
+
+
+def _lanzar(entorno: dict, hilos: int, logins: int, rounds: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.update(entorno)
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        env["BCRYPT_ROUNDS"] = str(rounds)
+        # Todos los clientes comparten la IP de TestClient
+        env["LOGIN_RATE_LIMIT_ENABLED"] = "false"
+        salida = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_login", "--hijo",
+             "--hilos", str(hilos), "--logins", str(logins)],
+            env=env, capture_output=True, text=True, check=True
+        )
+        return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de login con el pool de bcrypt")
+    parser.add_argument("--hilos", type=int, default=16, help="Clientes haciendo login en paralelo")
+    parser.add_argument("--logins", type=int, default=20, help="Logins por cliente")
+    parser.add_argument("--rounds", type=int, default=10, help="Costo de bcrypt (BCRYPT_ROUNDS)")
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        print(json.dumps(_ejecutar_modo(args.hilos, args.logins)))
+        return
+
+    print(f"📊 BENCHMARK LOGIN (bcrypt rounds={args.rounds})")
+    print("=" * 50)
+    for nombre, entorno in CONFIGURACIONES:
+        resultado = _lanzar(entorno, args.hilos, args.logins, args.rounds)
+        print(f"{nombre:<11}: {resultado}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/bench_middleware.py - Costo por request del stack de middleware
+#
+# Uso (desde ecommerce_backend/):
+#   python -m benchmarks.bench_middleware --requests 20000
+#
+# Se llama a la aplicación ASGI directamente (sin HTTP ni cliente) con una ruta
+# trivial, así la diferencia entre variantes es solo el costo del middleware.
+import argparse
+import asyncio
+import json
+import os
+import time
+import traceback
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def _app_base() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def _app_sin_middleware() -> FastAPI:
+    return _app_base()
+
+
+def _app_base_http_middleware() -> FastAPI:
+    """El middleware anterior: @app.middleware("http") con print del traceback"""
+    app = _app_base()
+
+    @app.middleware("http")
+    async def catch_exceptions_middleware(request: Request, call_next):
+        try:
+            return await call_next(request)
+        except Exception as e:
+            print(traceback.format_exc())
+            return JSONResponse(status_code=500, content={"detail": str(e), "type": type(e).__name__})
+
+    return app
+
+
+def _app_asgi_puro() -> FastAPI:
+    """El stack actual: ErrorHandlingMiddleware + RequestContextMiddleware"""
+    from app.middleware import ErrorHandlingMiddleware, RequestContextMiddleware
+
+    app = _app_base()
+    app.add_middleware(ErrorHandlingMiddleware)
+    app.add_middleware(RequestContextMiddleware)
+    return app
+
+
+VARIANTES = [
+    ("sin middleware", _app_sin_middleware),
+    ("BaseHTTPMiddleware (antes)", _app_base_http_middleware),
+    ("ASGI puro (ahora)", _app_asgi_puro),
+]
+
+
+async def _medir(app, requests: int) -> float:
+    """Microsegundos promedio por request"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # Calentamiento (construye el stack de middleware de Starlette)
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+
+    inicio = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - inicio) / requests * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overhead por request del middleware")
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    # El log de acceso pasa por la cola igual que en producción (a /dev/null)
+    from app.core.logs import configurar_logging, detener_logging
+    descarte = open(os.devnull, "w")
+    configurar_logging(stream=descarte)
+
+    print("📊 BENCHMARK MIDDLEWARE (µs por request, ruta trivial)")
+    print("=" * 50)
+    resultados = {}
+    try:
+        for nombre, fabrica in VARIANTES:
+            resultados[nombre] = round(asyncio.run(_medir(fabrica(), args.requests)), 1)
+            print(f"{nombre:<28}: {resultados[nombre]} µs")
+    finally:
+        detener_logging()
+        descarte.close()
+
+    base = resultados["sin middleware"]
+    antes = resultados["BaseHTTPMiddleware (antes)"] - base
+    ahora = resultados["ASGI puro (ahora)"] - base
+    print(f"\n🚀 Overhead del middleware: {antes:.1f} µs -> {ahora:.1f} µs")
+    print(json.dumps(resultados))
+
+
+if __name__ == "__main__":
+    main()
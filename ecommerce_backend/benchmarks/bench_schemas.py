@@ -0,0 +1,196 @@
+# benchmarks/bench_schemas.py - Validación y serialización de páginas de 100 items
+#
+# Uso (desde ecommerce_backend/):
+#   python -m benchmarks.bench_schemas
+#   python -m benchmarks.bench_schemas --items 100 --repeticiones 300
+#
+# Compara, sobre los mismos datos y sin base de datos:
+#   antes:   schemas al estilo v1 (class Config, @validator, .from_orm()/.dict())
+#            y JSON con la librería estándar, como la API antes de migrar a v2
+#   después: schemas de app/schemas con los TypeAdapter precompilados
+#            (validate_python + dump_json, directo a bytes)
+import argparse
+import json
+import time
+import warnings
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from pydantic import BaseModel
+
+
+def _modelos_v1():
+    """Copia de los schemas como estaban antes de la migración (API compatible con v1)"""
+    from pydantic import validator
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+
+        class ProductoCreate(BaseModel):
+            nombre: str
+            descripcion: Optional[str] = None
+            precio: float
+            stock: int = 0
+            categoria: Optional[str] = None
+            imagen_url: Optional[str] = None
+
+            @validator('nombre')
+            def validate_nombre(cls, v):
+                if len(v.strip()) < 3:
+                    raise ValueError('El nombre debe tener al menos 3 caracteres')
+                return v.strip()
+
+            @validator('precio')
+            def validate_precio(cls, v):
+                if v <= 0:
+                    raise ValueError('El precio debe ser mayor a 0')
+                return v
+
+            @validator('stock')
+            def validate_stock(cls, v):
+                if v < 0:
+                    raise ValueError('El stock no puede ser negativo')
+                return v
+
+        class ProductoResponse(BaseModel):
+            id: int
+            nombre: str
+            descripcion: Optional[str]
+            precio: float
+            stock: int
+            categoria: Optional[str]
+            imagen_url: Optional[str]
+            vendedor_id: int
+            is_active: bool
+            created_at: datetime
+            updated_at: datetime
+
+            class Config:
+                from_attributes = True
+
+        class ProductosPaginados(BaseModel):
+            total: int
+            page: int
+            page_size: int
+            productos: List[ProductoResponse]
+
+        class MensajeConRemitente(BaseModel):
+            id: int
+            conversacion_id: int
+            remitente_id: int
+            remitente_username: str
+            remitente_nombre: str
+            contenido: str
+            created_at: datetime
+            is_read: bool
+
+            class Config:
+                from_attributes = True
+
+    return ProductoCreate, ProductoResponse, ProductosPaginados, MensajeConRemitente
+
+
+def _datos(items: int):
+    """Productos ORM (sin sesión), mensajes y payloads de alta"""
+    from app.models.producto import Producto
+
+    base = datetime(2026, 1, 1)
+    productos = [
+        Producto(id=i, nombre=f"Producto {i}", descripcion=f"Descripción del producto {i}" * 3,
+                 precio=10 + i * 0.5, stock=i % 50, categoria="hogar",
+                 imagen_url=f"https://img.ejemplo.com/p/{i}.jpg", vendedor_id=1 + i % 7,
+                 is_active=True, created_at=base + timedelta(minutes=i), updated_at=base + timedelta(minutes=i))
+        for i in range(1, items + 1)
+    ]
+    mensajes = [
+        {"id": i, "conversacion_id": 1, "remitente_id": 1 + i % 2, "remitente_username": f"usuario{1 + i % 2}",
+         "remitente_nombre": "Nombre Apellido", "contenido": f"mensaje número {i} " * 4,
+         "created_at": base + timedelta(seconds=i), "is_read": i % 3 == 0}
+        for i in range(1, items + 1)
+    ]
+    altas = [
+        {"nombre": f"  Producto nuevo {i} ", "descripcion": "alta", "precio": 9.5 + i, "stock": i,
+         "categoria": "hogar"}
+        for i in range(1, items + 1)
+    ]
+    return productos, mensajes, altas
+
+
+def _isoformat(valor: datetime) -> str:
+    return valor.isoformat()
+
+
+def _medir(funcion: Callable[[], object], repeticiones: int) -> float:
+    """Segundos por repetición (mejor de 3 tandas)"""
+    funcion()
+    mejor = float("inf")
+    for _ in range(3):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            funcion()
+        mejor = min(mejor, (time.perf_counter() - inicio) / repeticiones)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de schemas Pydantic (v1-compat vs v2 nativo)")
+    parser.add_argument("--items", type=int, default=100, help="Items por página")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    from app.schemas.producto import ProductoCreate, PAGINA_PRODUCTOS
+    from app.schemas.mensaje import LISTA_MENSAJES
+
+    CreateV1, ResponseV1, PaginaV1, MensajeV1 = _modelos_v1()
+    productos, mensajes, altas = _datos(args.items)
+    pagina = {"total": 5000, "page": 1, "page_size": args.items, "productos": productos}
+
+    def _json_v1(modelo: BaseModel) -> bytes:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return json.dumps(modelo.dict(), default=_isoformat).encode("utf-8")
+
+    def pagina_antes():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            items = [ResponseV1.from_orm(p) for p in productos]
+        return _json_v1(PaginaV1(total=5000, page=1, page_size=args.items, productos=items))
+
+    def pagina_despues():
+        return PAGINA_PRODUCTOS.dump_json(PAGINA_PRODUCTOS.validate_python(pagina, from_attributes=True))
+
+    def _json_v1_dict(modelo: BaseModel) -> dict:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return modelo.dict()
+
+    def mensajes_antes():
+        return json.dumps([_json_v1_dict(MensajeV1(**m)) for m in mensajes], default=_isoformat).encode("utf-8")
+
+    def mensajes_despues():
+        return LISTA_MENSAJES.dump_json(LISTA_MENSAJES.validate_python(mensajes))
+
+    def altas_antes():
+        return [CreateV1(**a) for a in altas]
+
+    def altas_despues():
+        return [ProductoCreate.model_validate(a) for a in altas]
+
+    assert json.loads(pagina_antes()) == json.loads(pagina_despues())
+    assert json.loads(mensajes_antes()) == json.loads(mensajes_despues())
+
+    print(f"📊 BENCHMARK SCHEMAS ({args.items} items por página, {args.repeticiones} repeticiones)")
+    print("=" * 72)
+    for nombre, antes, despues in (
+        ("GET /products/ (ORM → JSON)", pagina_antes, pagina_despues),
+        ("GET /conversations/{id}/messages", mensajes_antes, mensajes_despues),
+        ("ProductoCreate (validadores)", altas_antes, altas_despues),
+    ):
+        t_antes = _medir(antes, args.repeticiones)
+        t_despues = _medir(despues, args.repeticiones)
+        print(f"{nombre:<34} antes {args.items / t_antes:>10,.0f} items/s   "
+              f"después {args.items / t_despues:>10,.0f} items/s   x{t_antes / t_despues:.2f}")
+
+
+if __name__ == "__main__":
+    main()
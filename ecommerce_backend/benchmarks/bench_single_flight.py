@@ -0,0 +1,132 @@
+# benchmarks/bench_single_flight.py - Lecturas concurrentes idénticas con y sin single-flight
+#
+# Uso (desde ecommerce_backend/):
+#   python -m benchmarks.bench_single_flight --hilos 32 --segundos 5
+#   python -m benchmarks.bench_single_flight --db /tmp/media.db --escala media
+#
+# Simula una estampida: todos los hilos piden lo mismo a la vez (un producto
+# viral, la primera página del catálogo, sus calificaciones), cada operación
+# con su propia SessionLectura como un request GET. Se mide con
+# SINGLE_FLIGHT_ENABLED apagado y prendido sobre la misma base.
+import argparse
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+ESCALAS = ("chica", "media", "grande")  # ver scripts/generar_datos.py
+
+
+def _escenarios() -> Dict[str, Callable]:
+    from app.crud.producto import get_producto_by_id, get_productos, get_productos_count
+    from app.crud.calificacion import get_calificaciones_producto, get_promedio_calificacion
+
+    def producto_viral(db):
+        get_producto_by_id(db, 7)
+
+    def primera_pagina(db):
+        get_productos(db, skip=0, limit=20)
+        get_productos_count(db)
+
+    def calificaciones(db):
+        get_calificaciones_producto(db, 7, 0, 10)
+        get_promedio_calificacion(db, 7)
+
+    return {
+        "producto viral": producto_viral,
+        "primera página": primera_pagina,
+        "calificaciones": calificaciones,
+    }
+
+
+def _medir(operacion: Callable, hilos: int, segundos: float) -> dict:
+    from sqlalchemy import event
+    from app.database import SessionLectura, engine_lectura
+    from app.core.single_flight import single_flight
+
+    consultas = [0]
+
+    def contar(*_):
+        consultas[0] += 1
+
+    event.listen(engine_lectura, "before_cursor_execute", contar)
+    antes = {g: list(c) for g, c in single_flight.contadores.items()}
+    operaciones = [0] * hilos
+    barrera = threading.Barrier(hilos)
+    fin = [0.0]
+
+    def trabajador(numero: int):
+        barrera.wait()
+        while time.perf_counter() < fin[0]:
+            db = SessionLectura()
+            try:
+                operacion(db)
+            finally:
+                db.close()
+            operaciones[numero] += 1
+
+    fin[0] = time.perf_counter() + segundos
+    threads = [threading.Thread(target=trabajador, args=(i,)) for i in range(hilos)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duracion = time.perf_counter() - inicio
+    event.remove(engine_lectura, "before_cursor_execute", contar)
+
+    coalescidas = sum(c[1] - antes.get(g, [0, 0])[1] for g, c in single_flight.contadores.items())
+    total = sum(operaciones)
+    return {
+        "ops_por_segundo": total / duracion,
+        "consultas_por_op": consultas[0] / max(total, 1),
+        "coalescidas": coalescidas,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de single-flight en lecturas del catálogo")
+    parser.add_argument("--escala", choices=ESCALAS, default="chica")
+    parser.add_argument("--db", help="Base SQLite a usar; si ya tiene datos no se vuelve a poblar")
+    parser.add_argument("--hilos", type=int, default=32)
+    parser.add_argument("--segundos", type=float, default=5.0, help="Duración de cada modo por escenario")
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    tmp = None
+    ruta_db = args.db
+    if ruta_db is None:
+        tmp = tempfile.TemporaryDirectory()
+        ruta_db = os.path.join(tmp.name, "bench.db")
+    existia = os.path.exists(ruta_db)
+
+    # La configuración se lee al importar app: se fija antes de cualquier import
+    os.environ["DATABASE_URL"] = f"sqlite:///{ruta_db}"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from app.core.config import settings
+    from scripts import generar_datos
+
+    print(f"📊 BENCHMARK SINGLE-FLIGHT (escala {args.escala}, {args.hilos} hilos, {args.segundos:g}s por modo)")
+    print("=" * 72)
+    try:
+        if not existia:
+            base = generar_datos.ESCALAS[args.escala]
+            generar_datos.generar(generar_datos.conteos_para(**base), args.semilla)
+
+        for nombre, operacion in _escenarios().items():
+            resultados: List[dict] = []
+            for habilitado in (False, True):
+                settings.SINGLE_FLIGHT_ENABLED = habilitado
+                resultados.append(_medir(operacion, args.hilos, args.segundos))
+            sin, con = resultados
+            print(f"{nombre:<16} sin: {sin['ops_por_segundo']:>8.0f} ops/s {sin['consultas_por_op']:.2f} consultas/op   "
+                  f"con: {con['ops_por_segundo']:>8.0f} ops/s {con['consultas_por_op']:.2f} consultas/op "
+                  f"({con['coalescidas']} coalescidas)   x{con['ops_por_segundo'] / max(sin['ops_por_segundo'], 0.1):.2f}")
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# benchmarks/bench_sqlite.py - Carga mixta lectura/escritura con y sin el perfil de SQLite
+#
+# Uso (desde ecommerce_backend/):
+#   python -m benchmarks.bench_sqlite --escala chica --hilos 8 --segundos 10
+#   python -m benchmarks.bench_sqlite --escala media --escrituras 0.2
+#
+# Se genera una sola base con scripts/generar_datos.py y cada modo corre en un
+# subproceso propio sobre una copia (el perfil se aplica al importar
+# app.database). Los hilos mezclan lecturas del catálogo y de conversaciones con
+# altas de mensajes durante --segundos.
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import List
+
+ESCALAS = ("chica", "media", "grande")  # ver scripts/generar_datos.py
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)]
+
+
+def _preparar(escala: str, semilla: int) -> None:
+    """Corre dentro del subproceso: puebla la base de DATABASE_URL"""
+    from scripts import generar_datos
+
+    base = generar_datos.ESCALAS[escala]
+    generar_datos.generar(generar_datos.conteos_para(**base), semilla=semilla)
+
+
+def _ejecutar_modo(hilos: int, segundos: float, escrituras: float, semilla: int) -> dict:
+    """Corre dentro del subproceso: mide la carga mixta sobre la base ya poblada"""
+    from sqlalchemy import func, select
+    from app import database
+    from app.database import SessionLocal
+    from app.crud.mensaje import create_mensaje, get_mensajes_conversacion
+    from app.crud.producto import get_producto_by_id, get_productos
+    from app.models.mensaje import Conversacion
+    from app.models.producto import Producto
+
+    db = SessionLocal()
+    productos = db.execute(select(func.max(Producto.id))).scalar()
+    conversaciones = db.execute(
+        select(Conversacion.id, Conversacion.usuario1_id).order_by(Conversacion.id)
+    ).all()
+    journal = db.connection().exec_driver_sql("PRAGMA journal_mode").scalar()
+    db.close()
+
+    def leer_catalogo(session, rng):
+        get_productos(session, skip=rng.randint(0, 200), limit=20)
+
+    def leer_producto(session, rng):
+        get_producto_by_id(session, rng.randint(1, productos))
+
+    def leer_conversacion(session, rng):
+        get_mensajes_conversacion(session, rng.choice(conversaciones)[0], limit=50)
+
+    def escribir_mensaje(session, rng):
+        conversacion_id, remitente_id = rng.choice(conversaciones)
+        create_mensaje(session, conversacion_id, remitente_id, "mensaje de carga")
+
+    lecturas = [leer_catalogo, leer_producto, leer_conversacion]
+    latencias = {"lectura": [], "escritura": []}
+    errores = []
+    cerrojo = threading.Lock()
+    fin = time.perf_counter() + segundos
+
+    def trabajador(numero: int):
+        rng = random.Random(semilla + numero)
+        propias = {"lectura": [], "escritura": []}
+        while time.perf_counter() < fin:
+            es_escritura = rng.random() < escrituras
+            operacion = escribir_mensaje if es_escritura else rng.choice(lecturas)
+            session = SessionLocal()
+            inicio = time.perf_counter()
+            try:
+                operacion(session, rng)
+                propias["escritura" if es_escritura else "lectura"].append(time.perf_counter() - inicio)
+            except Exception as e:
+                with cerrojo:
+                    errores.append(repr(e))
+            finally:
+                session.close()
+        with cerrojo:
+            for tipo, valores in propias.items():
+                latencias[tipo].extend(valores)
+
+    threads = [threading.Thread(target=trabajador, args=(i,)) for i in range(hilos)]
+    inicio = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duracion = time.perf_counter() - inicio
+
+    if database.escritor is not None:
+        database.escritor.detener()
+
+    total = len(latencias["lectura"]) + len(latencias["escritura"])
+    return {
+        "journal_mode": journal,
+        "operaciones": total,
+        "ops_por_segundo": round(total / duracion, 1),
+        "lecturas_por_segundo": round(len(latencias["lectura"]) / duracion, 1),
+        "escrituras_por_segundo": round(len(latencias["escritura"]) / duracion, 1),
+        "p95_lectura_ms": round(_percentil(latencias["lectura"], 0.95) * 1000, 2),
+        "p95_escritura_ms": round(_percentil(latencias["escritura"], 0.95) * 1000, 2),
+        "errores": len(errores),
+        "primer_error": errores[0] if errores else None,
+    }
+
+
+def _subproceso(db_path: str, perfil: bool, argumentos: List[str]) -> dict:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{db_path}"
+    env["SQLITE_PERFORMANCE_PROFILE"] = "true" if perfil else "false"
+    env["LOG_LEVEL"] = "WARNING"
+    salida = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_sqlite", *argumentos],
+        env=env, capture_output=True, text=True
+    )
+    if salida.returncode != 0:
+        raise RuntimeError(f"Falló el subproceso:\n{salida.stderr}")
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del perfil de rendimiento de SQLite")
+    parser.add_argument("--escala", choices=ESCALAS, default="chica")
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--segundos", type=float, default=10.0, help="Duración de cada modo")
+    parser.add_argument("--escrituras", type=float, default=0.1, help="Fracción de operaciones que escriben")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--preparar", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.preparar:
+        _preparar(args.escala, args.semilla)
+        print(json.dumps({"ok": True}))
+        return
+    if args.hijo:
+        print(json.dumps(_ejecutar_modo(args.hilos, args.segundos, args.escrituras, args.semilla)))
+        return
+
+    print(f"📊 BENCHMARK PERFIL SQLITE (escala {args.escala}, {args.hilos} hilos, "
+          f"{args.escrituras:.0%} escrituras, {args.segundos:g}s por modo)")
+    print("=" * 60)
+    carga = ["--hijo", "--hilos", str(args.hilos), "--segundos", str(args.segundos),
+             "--escrituras", str(args.escrituras), "--semilla", str(args.semilla)]
+    with tempfile.TemporaryDirectory() as tmp:
+        original = os.path.join(tmp, "original.db")
+        _subproceso(original, False, ["--preparar", "--escala", args.escala, "--semilla", str(args.semilla)])
+
+        resultados = {}
+        for nombre, perfil in (("sin perfil", False), ("con perfil", True)):
+            copia = os.path.join(tmp, f"{'con' if perfil else 'sin'}_perfil.db")
+            shutil.copyfile(original, copia)
+            resultados[nombre] = _subproceso(copia, perfil, carga)
+            print(f"{nombre:<11}: {resultados[nombre]}")
+
+    mejora = resultados["con perfil"]["ops_por_segundo"] / max(resultados["sin perfil"]["ops_por_segundo"], 0.1)
+    print(f"\n🚀 Mejora de throughput: x{mejora:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Comandos de mantenimiento (se ejecutan con: python -m scripts.<nombre>)
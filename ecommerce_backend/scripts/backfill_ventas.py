@@ -0,0 +1,34 @@
+# scripts/backfill_ventas.py - Recalcula el rollup de ventas diarias
+#
+# Uso (desde ecommerce_backend/):
+#   python -m scripts.backfill_ventas                     # todo el historial
+#   python -m scripts.backfill_ventas --desde 2025-01-01  # solo desde una fecha
+import argparse
+import time
+from datetime import date
+
+from app.database import SessionLocal
+from app.crud.venta import reconstruir_ventas_diarias
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill de ventas_diarias_producto")
+    parser.add_argument(
+        "--desde",
+        type=date.fromisoformat,
+        default=None,
+        help="Recalcular solo desde este día (YYYY-MM-DD)"
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        inicio = time.perf_counter()
+        filas = reconstruir_ventas_diarias(db, desde=args.desde)
+        print(f"✅ Rollup recalculado: {filas} filas en {time.perf_counter() - inicio:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
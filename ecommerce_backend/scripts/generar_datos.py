@@ -0,0 +1,363 @@
+# scripts/generar_datos.py - Datos sintéticos masivos para pruebas de capacidad
+#
+# Uso (desde ecommerce_backend/):
+#   python -m scripts.generar_datos --escala media
+#   python -m scripts.generar_datos --usuarios 50000 --productos 1000000 --mensajes 5000000 --semilla 7
+#   DATABASE_URL=sqlite:////tmp/grande.db python -m scripts.generar_datos --escala grande
+#
+# Genera usuarios, productos, calificaciones, conversaciones, mensajes y pedidos
+# con las mismas relaciones que la app, y con popularidad Zipf: pocos productos
+# concentran la mayoría de las ventas y calificaciones, pocos vendedores la
+# mayoría de las publicaciones y pocos usuarios la mayoría de la actividad.
+#
+# Con la misma semilla y --fecha-base se obtiene el mismo dataset (salvo el salt
+# del hash de la contraseña).
+# Todos los usuarios tienen la contraseña PASSWORD (un único hash precalculado).
+# Al final se recalculan los rollups (ventas diarias, rankings, relacionados).
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import event
+
+from app.database import SessionLocal, create_tables, engine
+from app.core.security import get_password_hash
+from app.models.usuario import Usuario
+from app.models.producto import Producto
+from app.models.calificacion import CalificacionProducto
+from app.models.mensaje import Conversacion, Mensaje
+from app.models.pedido import Pedido, ItemPedido
+
+ESCALAS = {
+    "chica": {"usuarios": 1_000, "productos": 5_000, "mensajes": 20_000},
+    "media": {"usuarios": 10_000, "productos": 100_000, "mensajes": 500_000},
+    "grande": {"usuarios": 10_000, "productos": 500_000, "mensajes": 5_000_000},
+}
+PASSWORD = "datos123"
+LOTE = 50_000
+DIAS_HISTORIA = 365
+
+CATEGORIAS = ["electronica", "hogar", "moda", "deportes", "libros", "juguetes", "jardin", "mascotas",
+              "belleza", "automotor", "musica", "oficina"]
+CIUDADES = [("Buenos Aires", "CABA"), ("Córdoba", "Córdoba"), ("Rosario", "Santa Fe"),
+            ("Mendoza", "Mendoza"), ("La Plata", "Buenos Aires"), ("Salta", "Salta")]
+ESTADOS_PEDIDO = ["entregado", "enviado", "confirmado", "pendiente", "cancelado"]
+PESOS_ESTADO = [60, 10, 15, 10, 5]
+
+
+def username_de(usuario_id: int) -> str:
+    return f"usuario{usuario_id}"
+
+
+def email_de(usuario_id: int) -> str:
+    return f"usuario{usuario_id}@ejemplo.com"
+
+
+class Zipf:
+    """
+    Muestreo de ids con popularidad Zipf (el i-ésimo más popular pesa 1/i^s)
+
+    El orden de popularidad es una permutación aleatoria de los ids, para que
+    los más populares no sean siempre los primeros insertados.
+    """
+
+    def __init__(self, ids: Sequence[int], s: float, rng: random.Random):
+        self.ids = list(ids)
+        rng.shuffle(self.ids)
+        self.acumulados = []
+        total = 0.0
+        for rango in range(1, len(self.ids) + 1):
+            total += 1.0 / rango ** s
+            self.acumulados.append(total)
+
+    def muestra(self, rng: random.Random, k: int) -> List[int]:
+        return rng.choices(self.ids, cum_weights=self.acumulados, k=k)
+
+
+def _insertar(conn, tabla, filas: Iterable[Dict], nombre: str) -> int:
+    """Inserta por lotes con Core (executemany, sin unit of work del ORM)"""
+    inicio = time.perf_counter()
+    total = 0
+    lote: List[Dict] = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= LOTE:
+            conn.execute(tabla.insert(), lote)
+            total += len(lote)
+            lote = []
+    if lote:
+        conn.execute(tabla.insert(), lote)
+        total += len(lote)
+    duracion = time.perf_counter() - inicio
+    print(f"   {nombre:<16} {total:>10,} filas  {duracion:6.1f}s  ({total / max(duracion, 1e-9):,.0f} filas/s)")
+    return total
+
+
+class _Generador:
+    def __init__(self, conteos: Dict[str, int], semilla: int, zipf: float, fecha_base: date):
+        self.c = conteos
+        self.rng = random.Random(semilla)
+        self.zipf = zipf
+        self.hasta = datetime.combine(fecha_base, datetime.min.time())
+        self.vendedores = max(conteos["usuarios"] // 10, 1)
+        self.precios: List[float] = []
+
+    def fecha(self, desde: Optional[datetime] = None) -> datetime:
+        """Momento al azar dentro de la historia (o posterior a `desde`)"""
+        inicio = desde or self.hasta - timedelta(days=DIAS_HISTORIA)
+        segundos = max(int((self.hasta - inicio).total_seconds()), 1)
+        return inicio + timedelta(seconds=self.rng.randrange(segundos))
+
+    def usuarios(self, password_hash: str) -> Iterator[Dict]:
+        rng = self.rng
+        for i in range(1, self.c["usuarios"] + 1):
+            ciudad, provincia = rng.choice(CIUDADES)
+            alta = self.fecha()
+            yield {
+                "id": i, "email": email_de(i), "username": username_de(i), "password_hash": password_hash,
+                "nombre": f"Nombre{i}", "apellido": f"Apellido{i}", "telefono": f"11{rng.randrange(10**8):08d}",
+                "direccion": f"Calle {rng.randrange(1, 5000)}", "ciudad": ciudad, "provincia": provincia,
+                "codigo_postal": str(rng.randrange(1000, 9999)), "is_active": rng.random() > 0.01,
+                "created_at": alta, "updated_at": alta,
+            }
+
+    def productos(self) -> Iterator[Dict]:
+        rng = self.rng
+        vendedores = Zipf(range(1, self.vendedores + 1), self.zipf, rng)
+        categorias = Zipf(range(len(CATEGORIAS)), self.zipf, rng)
+        por_lote = 10_000
+        for base in range(0, self.c["productos"], por_lote):
+            n = min(por_lote, self.c["productos"] - base)
+            for offset, (vendedor_id, categoria) in enumerate(
+                zip(vendedores.muestra(rng, n), categorias.muestra(rng, n))
+            ):
+                i = base + offset + 1
+                precio = round(min(rng.lognormvariate(3.5, 1.0), 99_999), 2)
+                self.precios.append(precio)
+                alta = self.fecha()
+                yield {
+                    "id": i, "nombre": f"{CATEGORIAS[categoria].capitalize()} modelo {i}",
+                    "descripcion": f"Producto {i} de {CATEGORIAS[categoria]}, publicado por el vendedor {vendedor_id}.",
+                    "precio": precio, "stock": rng.randrange(0, 500), "categoria": CATEGORIAS[categoria],
+                    "imagen_url": f"https://img.ejemplo.com/p/{i}.jpg", "vendedor_id": vendedor_id,
+                    "is_active": rng.random() > 0.02, "created_at": alta, "updated_at": alta,
+                }
+
+    def calificaciones(self, productos: Zipf, usuarios: Zipf) -> Iterator[Dict]:
+        rng = self.rng
+        vistas = set()
+        objetivo = self.c["calificaciones"]
+        intentos = 0
+        while len(vistas) < objetivo and intentos < objetivo * 3:
+            n = min(LOTE, objetivo - len(vistas))
+            intentos += n
+            for par in zip(productos.muestra(rng, n), usuarios.muestra(rng, n)):
+                if par in vistas:
+                    continue
+                vistas.add(par)
+                yield {
+                    "producto_id": par[0], "usuario_id": par[1],
+                    # Sesgo hacia las 4 y 5 estrellas, como en un catálogo real
+                    "puntuacion": rng.choices((1, 2, 3, 4, 5), weights=(5, 5, 15, 35, 40))[0],
+                    "comentario": None if rng.random() < 0.6 else f"Opinión sobre el producto {par[0]}",
+                    "created_at": self.fecha(),
+                }
+
+    def conversaciones(self, usuarios: Zipf, pares: List[tuple]) -> Iterator[Dict]:
+        """Un comprador (por actividad) le escribe a un vendedor (por popularidad)"""
+        rng = self.rng
+        vendedores = Zipf(range(1, self.vendedores + 1), self.zipf, rng)
+        vistas = set()
+        objetivo = self.c["conversaciones"]
+        intentos = 0
+        while len(pares) < objetivo and intentos < objetivo * 3:
+            n = min(LOTE, objetivo - len(pares))
+            intentos += n
+            for comprador, vendedor in zip(usuarios.muestra(rng, n), vendedores.muestra(rng, n)):
+                clave = (min(comprador, vendedor), max(comprador, vendedor))
+                if comprador == vendedor or clave in vistas:
+                    continue
+                vistas.add(clave)
+                alta = self.fecha()
+                pares.append((comprador, vendedor, alta))
+                yield {"id": len(pares), "usuario1_id": comprador, "usuario2_id": vendedor,
+                       "is_active": True, "created_at": alta, "updated_at": alta}
+
+    def mensajes(self, pares: List[tuple]) -> Iterator[Dict]:
+        rng = self.rng
+        conversaciones = Zipf(range(1, len(pares) + 1), self.zipf, rng)
+        restantes = self.c["mensajes"]
+        while restantes > 0:
+            n = min(LOTE, restantes)
+            restantes -= n
+            for conversacion_id in conversaciones.muestra(rng, n):
+                usuario1, usuario2, alta = pares[conversacion_id - 1]
+                yield {
+                    "conversacion_id": conversacion_id, "remitente_id": usuario1 if rng.random() < 0.5 else usuario2,
+                    "contenido": f"Mensaje sobre la conversación {conversacion_id}", "created_at": self.fecha(alta),
+                    "is_read": rng.random() < 0.85,
+                }
+
+    def pedidos(self, conn, productos: Zipf, usuarios: Zipf) -> None:
+        """Pedidos e items en la misma pasada (cada lote de pedidos antes que sus items)"""
+        rng = self.rng
+        inicio = time.perf_counter()
+        total_items = 0
+        pedido_id = 0
+        objetivo = self.c["pedidos"]
+        while pedido_id < objetivo:
+            n = min(LOTE // 2, objetivo - pedido_id)
+            pedidos: List[Dict] = []
+            items: List[Dict] = []
+            for usuario_id in usuarios.muestra(rng, n):
+                pedido_id += 1
+                total = 0.0
+                for producto_id in set(productos.muestra(rng, rng.choices((1, 2, 3, 4), weights=(50, 30, 15, 5))[0])):
+                    cantidad = rng.choices((1, 2, 3), weights=(80, 15, 5))[0]
+                    precio = self.precios[producto_id - 1]
+                    subtotal = round(precio * cantidad, 2)
+                    total += subtotal
+                    items.append({"pedido_id": pedido_id, "producto_id": producto_id, "cantidad": cantidad,
+                                  "precio_unitario": precio, "subtotal": subtotal})
+                fecha = self.fecha()
+                estado = rng.choices(ESTADOS_PEDIDO, weights=PESOS_ESTADO)[0]
+                pedidos.append({
+                    "id": pedido_id, "usuario_id": usuario_id, "total": round(total, 2), "estado": estado,
+                    "direccion_envio": f"Calle {rng.randrange(1, 5000)}", "fecha_pedido": fecha,
+                    "fecha_entrega": fecha + timedelta(days=rng.randint(2, 10)) if estado == "entregado" else None,
+                    "notas": None,
+                })
+            conn.execute(Pedido.__table__.insert(), pedidos)
+            conn.execute(ItemPedido.__table__.insert(), items)
+            total_items += len(items)
+        duracion = time.perf_counter() - inicio
+        print(f"   {'pedidos':<16} {pedido_id:>10,} filas  {duracion:6.1f}s  (+{total_items:,} items)")
+
+
+def _pragmas_carga(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.close()
+
+
+def _cargar(gen: _Generador, conteos: Dict[str, int], password_hash: str) -> None:
+    rng = gen.rng
+    inicio = time.perf_counter()
+    with engine.begin() as conn:
+        _insertar(conn, Usuario.__table__, gen.usuarios(password_hash), "usuarios")
+        _insertar(conn, Producto.__table__, gen.productos(), "productos")
+    actividad = Zipf(range(1, conteos["usuarios"] + 1), gen.zipf, rng)
+    popularidad = Zipf(range(1, conteos["productos"] + 1), gen.zipf, rng)
+    with engine.begin() as conn:
+        _insertar(conn, CalificacionProducto.__table__, gen.calificaciones(popularidad, actividad), "calificaciones")
+    pares: List[tuple] = []
+    with engine.begin() as conn:
+        _insertar(conn, Conversacion.__table__, gen.conversaciones(actividad, pares), "conversaciones")
+    if pares:
+        with engine.begin() as conn:
+            _insertar(conn, Mensaje.__table__, gen.mensajes(pares), "mensajes")
+    with engine.begin() as conn:
+        gen.pedidos(conn, popularidad, actividad)
+    print(f"✅ Datos cargados en {time.perf_counter() - inicio:.1f}s")
+
+
+def conteos_para(usuarios: int, productos: int, mensajes: int,
+                 conversaciones: Optional[int] = None, calificaciones: Optional[int] = None,
+                 pedidos: Optional[int] = None) -> Dict[str, int]:
+    """Completa las cantidades no indicadas en proporción a las principales"""
+    return {
+        "usuarios": usuarios,
+        "productos": productos,
+        "mensajes": mensajes,
+        "conversaciones": conversaciones or max(mensajes // 20, 1),
+        "calificaciones": calificaciones or productos * 2,
+        "pedidos": pedidos or usuarios * 3,
+    }
+
+
+def generar(conteos: Dict[str, int], semilla: int = 42, zipf: float = 1.0,
+            fecha_base: Optional[date] = None, derivados: bool = True) -> None:
+    """
+    Carga el dataset completo en la base configurada (DATABASE_URL)
+
+    Raises:
+        RuntimeError: Si la base ya tiene usuarios (los ids se asignan desde 1)
+    """
+    create_tables()
+    with engine.connect() as conn:
+        if conn.execute(Usuario.__table__.select().limit(1)).first() is not None:
+            raise RuntimeError("La base ya tiene usuarios: generar_datos necesita tablas vacías")
+
+    gen = _Generador(conteos, semilla, zipf, fecha_base or date.today())
+    # Un único hash: bcrypt por usuario haría que la carga tarde horas
+    password_hash = get_password_hash(PASSWORD)
+
+    carga_rapida = engine.dialect.name == "sqlite"
+    if carga_rapida:
+        # Solo durante la carga: si se corta a la mitad, se vuelve a generar
+        event.listen(engine, "connect", _pragmas_carga)
+        engine.dispose()
+    try:
+        _cargar(gen, conteos, password_hash)
+    finally:
+        if carga_rapida:
+            event.remove(engine, "connect", _pragmas_carga)
+            engine.dispose()
+
+    if derivados:
+        from app.crud.venta import reconstruir_ventas_diarias
+        from app.crud.ranking import reconstruir_puntajes
+        from app.crud.recomendacion import reconstruir_coocurrencias
+
+        db = SessionLocal()
+        try:
+            for nombre, reconstruir in (
+                ("ventas diarias", reconstruir_ventas_diarias),
+                ("rankings", reconstruir_puntajes),
+                ("relacionados", reconstruir_coocurrencias),
+            ):
+                paso = time.perf_counter()
+                filas = reconstruir(db)
+                print(f"   {nombre:<16} {filas:>10,} filas  {time.perf_counter() - paso:6.1f}s")
+        finally:
+            db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera un dataset sintético para pruebas de capacidad")
+    parser.add_argument("--escala", choices=sorted(ESCALAS), default="chica")
+    parser.add_argument("--usuarios", type=int, help="Pisa la cantidad de la escala")
+    parser.add_argument("--productos", type=int, help="Pisa la cantidad de la escala")
+    parser.add_argument("--mensajes", type=int, help="Pisa la cantidad de la escala")
+    parser.add_argument("--conversaciones", type=int, help="Por defecto, mensajes / 20")
+    parser.add_argument("--calificaciones", type=int, help="Por defecto, productos * 2")
+    parser.add_argument("--pedidos", type=int, help="Por defecto, usuarios * 3")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--zipf", type=float, default=1.0, help="Exponente de popularidad (mayor = más concentrada)")
+    parser.add_argument(
+        "--fecha-base",
+        type=date.fromisoformat,
+        default=None,
+        help="Último día de la historia generada (YYYY-MM-DD, por defecto hoy)"
+    )
+    parser.add_argument("--sin-derivados", action="store_true", help="No recalcular rollups ni rankings")
+    args = parser.parse_args()
+
+    escala = ESCALAS[args.escala]
+    conteos = conteos_para(
+        args.usuarios or escala["usuarios"],
+        args.productos or escala["productos"],
+        args.mensajes or escala["mensajes"],
+        conversaciones=args.conversaciones,
+        calificaciones=args.calificaciones,
+        pedidos=args.pedidos,
+    )
+    print(f"🌱 Generando dataset (semilla {args.semilla}): {conteos}")
+    generar(conteos, args.semilla, args.zipf, args.fecha_base, derivados=not args.sin_derivados)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# scripts/provisionar_usuarios.py - Alta masiva de usuarios desde un CSV
+#
+# Uso (desde ecommerce_backend/):
+#   python -m scripts.provisionar_usuarios clientes.csv
+#   python -m scripts.provisionar_usuarios clientes.csv --lote 2000 --procesos 8
+#
+# El CSV debe tener encabezado con al menos: email, username, password, nombre,
+# apellido. Columnas opcionales: telefono, direccion, ciudad, provincia,
+# codigo_postal. Los usuarios cuyo email o username ya existen se omiten.
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+
+from pydantic import ValidationError
+
+from app.database import SessionLocal
+from app.models.usuario import Usuario
+from app.schemas.usuario import UsuarioCreate
+from app.core.security import get_password_hash
+from app.crud.utils import insert_dialecto
+
+COLUMNAS_OPCIONALES = ("telefono", "direccion", "ciudad", "provincia", "codigo_postal")
+
+
+def _leer_csv(ruta: str) -> List[UsuarioCreate]:
+    """Lee y valida las filas con las mismas reglas que el registro"""
+    validos = []
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        for numero, fila in enumerate(csv.DictReader(archivo), start=2):
+            datos = {k: (v.strip() or None) if isinstance(v, str) else v for k, v in fila.items() if k}
+            try:
+                validos.append(UsuarioCreate(**datos))
+            except ValidationError as e:
+                errores = "; ".join(err["msg"] for err in e.errors())
+                print(f"⚠️  Línea {numero} omitida: {errores}")
+    return validos
+
+
+def _insertar_lote(filas: List[Dict]) -> int:
+    """Inserta un lote en una sola sentencia; ignora emails/usernames ya existentes"""
+    db = SessionLocal()
+    try:
+        tabla = Usuario.__table__
+        stmt = insert_dialecto(db, tabla)
+        if stmt is None:
+            # Otros motores: sin ON CONFLICT, se filtran los existentes antes
+            existentes = {
+                valor
+                for fila in db.query(Usuario.email, Usuario.username).filter(
+                    Usuario.email.in_([f["email"] for f in filas])
+                    | Usuario.username.in_([f["username"] for f in filas])
+                )
+                for valor in fila
+            }
+            filas = [f for f in filas if f["email"] not in existentes and f["username"] not in existentes]
+            if not filas:
+                return 0
+            resultado = db.execute(tabla.insert(), filas)
+        else:
+            resultado = db.execute(stmt.on_conflict_do_nothing(), filas)
+        db.commit()
+        return resultado.rowcount
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alta masiva de usuarios desde un CSV")
+    parser.add_argument("archivo", help="Ruta del CSV")
+    parser.add_argument("--lote", type=int, default=1000, help="Usuarios por INSERT")
+    parser.add_argument(
+        "--procesos",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Procesos para calcular los hashes de bcrypt (por defecto, todos los núcleos)"
+    )
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    usuarios = _leer_csv(args.archivo)
+    print(f"📄 {len(usuarios)} usuarios válidos en {args.archivo}")
+    if not usuarios:
+        return
+
+    insertados = 0
+    ahora = datetime.utcnow()
+    with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+        # bcrypt es el cuello de botella: los hashes se calculan en paralelo
+        # mientras el proceso principal va insertando los lotes ya listos
+        hashes = pool.map(
+            get_password_hash,
+            (u.password for u in usuarios),
+            chunksize=max(1, min(64, len(usuarios) // (args.procesos * 4) or 1))
+        )
+        lote: List[Dict] = []
+        for usuario, password_hash in zip(usuarios, hashes):
+            fila = {
+                "email": usuario.email,
+                "username": usuario.username,
+                "password_hash": password_hash,
+                "nombre": usuario.nombre,
+                "apellido": usuario.apellido,
+                "is_active": True,
+                "created_at": ahora,
+                "updated_at": ahora,
+            }
+            fila.update({col: getattr(usuario, col) for col in COLUMNAS_OPCIONALES})
+            lote.append(fila)
+            if len(lote) >= args.lote:
+                insertados += _insertar_lote(lote)
+                lote = []
+        if lote:
+            insertados += _insertar_lote(lote)
+
+    duracion = time.perf_counter() - inicio
+    print(f"✅ {insertados} usuarios creados, {len(usuarios) - insertados} ya existían "
+          f"({duracion:.2f}s, {len(usuarios) / duracion:.0f} usuarios/s)")
+
+
+if __name__ == "__main__":
+    main()
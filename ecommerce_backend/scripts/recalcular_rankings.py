@@ -0,0 +1,22 @@
+# scripts/recalcular_rankings.py - Recalcula los puntajes de ranking del catálogo
+#
+# Uso (desde ecommerce_backend/):
+#   python -m scripts.recalcular_rankings
+import time
+
+from app.database import SessionLocal
+from app.crud.ranking import reconstruir_puntajes
+
+
+def main():
+    db = SessionLocal()
+    try:
+        inicio = time.perf_counter()
+        productos = reconstruir_puntajes(db)
+        print(f"✅ Puntajes recalculados para {productos} productos en {time.perf_counter() - inicio:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
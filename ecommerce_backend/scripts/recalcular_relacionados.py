@@ -0,0 +1,22 @@
+# scripts/recalcular_relacionados.py - Recalcula "comprados juntos frecuentemente"
+#
+# Uso (desde ecommerce_backend/):
+#   python -m scripts.recalcular_relacionados
+import time
+
+from app.database import SessionLocal
+from app.crud.recomendacion import reconstruir_coocurrencias
+
+
+def main():
+    db = SessionLocal()
+    try:
+        inicio = time.perf_counter()
+        pares = reconstruir_coocurrencias(db)
+        print(f"✅ {pares} pares de productos recalculados en {time.perf_counter() - inicio:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# tests/test_crud/test_group_commit.py - Errores del escritor de group commit
+import sqlite3
+import threading
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from app.core.group_commit import GroupCommitExecutor
+
+
+def _factory(ruta: str):
+    """Sesiones como las del escritor real: BEGIN IMMEDIATE explícito, busy_timeout corto"""
+    engine = create_engine(f"sqlite:///{ruta}", connect_args={"check_same_thread": False, "timeout": 0.1})
+
+    @event.listens_for(engine, "connect")
+    def _desactivar_autobegin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE IF NOT EXISTS t (id INTEGER PRIMARY KEY, v TEXT)")
+    return sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+def _insertar(valor):
+    def unidad(session):
+        session.execute(text("INSERT INTO t (v) VALUES (:v)"), {"v": valor})
+        return valor
+    return unidad
+
+
+def _fallar(session):
+    raise ValueError("unidad inválida")
+
+
+def test_unidad_fallida_no_afecta_al_resto(tmp_path):
+    executor = GroupCommitExecutor(_factory(str(tmp_path / "db.sqlite")), max_delay_ms=50, timeout=5)
+    futuros = [executor.submit(_insertar("a")), executor.submit(_fallar), executor.submit(_insertar("b"))]
+    try:
+        assert futuros[0].result(timeout=5) == "a"
+        with pytest.raises(ValueError):
+            futuros[1].result(timeout=5)
+        assert futuros[2].result(timeout=5) == "b"
+    finally:
+        executor.detener()
+
+
+def test_base_bloqueada_resuelve_a_todos_y_el_escritor_sigue(tmp_path):
+    ruta = str(tmp_path / "db.sqlite")
+    executor = GroupCommitExecutor(_factory(ruta), max_delay_ms=50, timeout=5)
+    # Otro proceso con el lock de escritura: BEGIN IMMEDIATE falla con SQLITE_BUSY
+    bloqueo = sqlite3.connect(ruta, isolation_level=None)
+    bloqueo.execute("BEGIN IMMEDIATE")
+    try:
+        futuros = [executor.submit(_insertar(str(i))) for i in range(5)]
+        for futuro in futuros:
+            with pytest.raises(Exception):
+                futuro.result(timeout=5)
+    finally:
+        bloqueo.rollback()
+        bloqueo.close()
+
+    try:
+        # Liberado el lock, el mismo escritor sigue confirmando
+        assert executor.run(_insertar("despues")) == "despues"
+    finally:
+        executor.detener()
+
+
+def test_session_factory_que_falla_no_mata_al_escritor():
+    llamadas = []
+
+    def factory_rota():
+        llamadas.append(1)
+        raise RuntimeError("sin conexión")
+
+    executor = GroupCommitExecutor(factory_rota, timeout=5)
+    try:
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                executor.run(_fallar)
+        assert len(llamadas) == 2
+    finally:
+        executor.detener()
+
+
+def test_run_con_timeout_si_el_escritor_no_responde(tmp_path):
+    ruta = str(tmp_path / "db.sqlite")
+    executor = GroupCommitExecutor(_factory(ruta), timeout=0.2)
+    liberar = threading.Event()
+
+    def lenta(session):
+        liberar.wait(5)
+
+    bloqueante = executor.submit(lenta)
+    try:
+        with pytest.raises(TimeoutError):
+            executor.run(_insertar("x"))
+    finally:
+        liberar.set()
+        bloqueante.result(timeout=5)
+        executor.detener()
@@ -0,0 +1,60 @@
+# tests/test_crud/test_ranking.py - Catálogo ordenado por puntajes precalculados
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.models.base import Base
+from app.models.producto import Producto
+from app.models.usuario import Usuario
+from app.models.ranking import PuntajeProducto
+from app.schemas.producto import ProductoCreate
+from app.crud.producto import create_producto, get_productos, _aplicar_orden
+from app.crud.ranking import registrar_calificacion_ranking, registrar_ventas_ranking
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ranking.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+    session.add(Usuario(email="v@ejemplo.com", username="vendedor", password_hash="x", nombre="V", apellido="V"))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _crear_productos(db, cantidad):
+    vendedor = db.query(Usuario).one()
+    return [
+        create_producto(db, ProductoCreate(nombre=f"Producto {i}", precio=10, stock=100), vendedor.id).id
+        for i in range(cantidad)
+    ]
+
+
+def test_cada_producto_nuevo_tiene_su_fila_de_puntajes(db):
+    ids = _crear_productos(db, 3)
+    puntajes = db.query(PuntajeProducto).order_by(PuntajeProducto.producto_id).all()
+    assert [p.producto_id for p in puntajes] == ids
+    assert all(p.tendencia is not None and p.valoracion is not None for p in puntajes)
+
+
+def test_orden_por_ventas_y_calificaciones(db):
+    a, b, c = _crear_productos(db, 3)
+    registrar_ventas_ranking(db, datetime(2026, 1, 1), [(b, 5), (c, 1)])
+    registrar_calificacion_ranking(db, c, 5, 1)
+    db.commit()
+
+    assert [p.id for p in get_productos(db, orden="best_selling")] == [b, c, a]
+    assert [p.id for p in get_productos(db, orden="trending")] == [b, c, a]
+    assert [p.id for p in get_productos(db, orden="top_rated")][0] == c
+
+
+@pytest.mark.parametrize("orden", ["trending", "best_selling", "top_rated"])
+def test_orden_usa_el_indice_sin_ordenar_el_catalogo(db, orden):
+    _crear_productos(db, 3)
+    query = _aplicar_orden(db.query(Producto).filter(Producto.is_active == True), orden).limit(20)
+    sql = str(query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+    plan = " | ".join(fila[-1] for fila in db.execute(text("EXPLAIN QUERY PLAN " + sql)))
+    assert "USING COVERING INDEX ix_puntajes_producto_" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,52 @@
+# tests/test_crud/test_recomendacion.py - "Comprados juntos" en el checkout y top-K en lote
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.models.base import Base
+from app.models.producto import Producto
+from app.models.usuario import Usuario
+from app.models.recomendacion import ProductoCompradoJunto, ProductoRelacionado
+from app.crud import recomendacion
+from app.crud.recomendacion import refrescar_top_k_pendientes, registrar_coocurrencias_pedido
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'recomendaciones.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+    session.add(Usuario(id=1, email="v@ejemplo.com", username="vendedor", password_hash="x", nombre="V", apellido="V"))
+    session.add_all(Producto(id=i, nombre=f"Producto {i}", precio=1, stock=10, vendedor_id=1) for i in range(1, 41))
+    session.commit()
+    recomendacion._pendientes.clear()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_pares_en_una_sola_sentencia_y_acotados(db):
+    sentencias = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *a: sentencias.append(a[2]))
+    registrar_coocurrencias_pedido(db, range(1, 41))
+    db.commit()
+
+    assert len([s for s in sentencias if "productos_comprados_juntos" in s]) == 1
+    n = settings.RECOMENDACIONES_MAX_PRODUCTOS
+    assert db.query(ProductoCompradoJunto).count() == n * (n - 1)
+    # El top-K no se toca dentro de la transacción del pedido
+    assert db.query(ProductoRelacionado).count() == 0
+
+
+def test_top_k_se_regenera_en_lote(db):
+    registrar_coocurrencias_pedido(db, [1, 2, 3])
+    registrar_coocurrencias_pedido(db, [1, 2])
+    db.commit()
+
+    assert refrescar_top_k_pendientes(db) == 3
+    vecinos = db.query(ProductoRelacionado).filter(
+        ProductoRelacionado.producto_id == 1
+    ).order_by(ProductoRelacionado.posicion).all()
+    assert [(v.relacionado_id, v.veces) for v in vecinos] == [(2, 2), (3, 1)]
+    # Ya no queda nada pendiente
+    assert refrescar_top_k_pendientes(db) == 0
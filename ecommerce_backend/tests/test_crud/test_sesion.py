@@ -0,0 +1,94 @@
+# tests/test_crud/test_sesion.py - Rotación de refresh tokens y revocación de sesiones
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.security import decode_token
+from app.models.base import Base
+from app.models.usuario import Usuario
+from app.models.sesion import SesionRevocada
+from app.crud import sesion
+from app.crud.sesion import (
+    cargar_revocaciones,
+    crear_sesion,
+    revocar_sesion,
+    rotar_refresh_token,
+    sesion_revocada
+)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sesiones.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+    session.add(Usuario(id=1, email="ana@ejemplo.com", username="ana", password_hash="x", nombre="A", apellido="A"))
+    session.commit()
+    # Igual que el lifespan: el filtro se carga antes del primer request
+    cargar_revocaciones(session)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _payload(token: str) -> dict:
+    return decode_token(token, HTTPException(status_code=401), tipo="refresh")
+
+
+def test_rotacion_entrega_un_token_nuevo_de_la_misma_familia(db):
+    token, familia = crear_sesion(db, 1, "ana")
+
+    usuario_id, nuevo, familia_nueva = rotar_refresh_token(db, _payload(token))
+
+    assert (usuario_id, familia_nueva) == (1, familia)
+    assert _payload(nuevo)["jti"] != _payload(token)["jti"]
+    assert not sesion_revocada(db, familia)
+    # El nuevo se puede canjear a su vez
+    assert rotar_refresh_token(db, _payload(nuevo))[2] == familia
+
+
+def test_reutilizar_un_token_revoca_la_familia(db):
+    token, familia = crear_sesion(db, 1, "ana")
+    _, nuevo, _ = rotar_refresh_token(db, _payload(token))
+
+    with pytest.raises(ValueError, match="reutilizado"):
+        rotar_refresh_token(db, _payload(token))
+
+    assert sesion_revocada(db, familia)
+    # Tampoco sirve el token legítimo más reciente de esa familia
+    with pytest.raises(ValueError, match="revocada"):
+        rotar_refresh_token(db, _payload(nuevo))
+
+
+def test_logout_revoca_la_sesion(db):
+    token, familia = crear_sesion(db, 1, "ana")
+    otro_token, otra_familia = crear_sesion(db, 1, "ana")
+
+    revocar_sesion(db, _payload(token))
+
+    assert sesion_revocada(db, familia)
+    assert not sesion_revocada(db, otra_familia)
+    with pytest.raises(ValueError, match="revocada"):
+        rotar_refresh_token(db, _payload(token))
+    assert rotar_refresh_token(db, _payload(otro_token))[2] == otra_familia
+
+
+def test_sincroniza_por_id_aunque_la_hora_sea_anterior(db, monkeypatch):
+    monkeypatch.setattr(settings, "REVOCACION_SYNC_SECONDS", 0.0)
+    token, _ = crear_sesion(db, 1, "ana")
+    _, familia = crear_sesion(db, 1, "ana")
+    revocar_sesion(db, _payload(token))
+    assert not sesion_revocada(db, familia)
+
+    # Revocación de otro proceso que confirma tarde: su hora queda antes de la última vista
+    db.add(SesionRevocada(
+        familia=familia, usuario_id=1, motivo="logout",
+        expira_en=datetime.utcnow() + timedelta(days=1),
+        revocada_en=datetime.utcnow() - timedelta(hours=1)
+    ))
+    db.commit()
+
+    assert sesion_revocada(db, familia)
+    assert sesion._revocaciones.max_id == db.query(func.max(SesionRevocada.id)).scalar()
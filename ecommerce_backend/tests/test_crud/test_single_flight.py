@@ -0,0 +1,93 @@
+# tests/test_crud/test_single_flight.py - Coalescencia de lecturas e invalidaciones
+import threading
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.single_flight import SingleFlight, coalescer, single_flight
+from app.models.base import Base
+from app.models.producto import Producto
+from app.models.usuario import Usuario
+
+
+def _esperar(condicion, plazo: float = 5.0) -> None:
+    limite = time.monotonic() + plazo
+    while not condicion():
+        assert time.monotonic() < limite, "no se cumplió a tiempo"
+        time.sleep(0.005)
+
+
+def _en_hilo(funcion):
+    resultado = {}
+    hilo = threading.Thread(target=lambda: resultado.setdefault("valor", funcion()))
+    hilo.start()
+    return hilo, resultado
+
+
+def test_despues_de_invalidar_no_se_suma_a_la_lectura_en_curso():
+    sf = SingleFlight()
+    liberar = threading.Event()
+    lecturas = []
+
+    def leer():
+        lecturas.append(None)
+        numero = len(lecturas)
+        if numero == 1:
+            liberar.wait(5)
+        return numero
+
+    lider, r_lider = _en_hilo(lambda: sf.ejecutar("g", "k", leer))
+    _esperar(lambda: sf.en_curso() == 1)
+    antes, r_antes = _en_hilo(lambda: sf.ejecutar("g", "k", leer))
+    _esperar(lambda: sf.contadores["g"][1] == 1)
+
+    sf.invalidar("g")
+    # Llegó después de la escritura: ejecuta por su cuenta aunque la otra siga en curso
+    assert sf.ejecutar("g", "k", leer) == (2, False)
+
+    liberar.set()
+    lider.join()
+    antes.join()
+    assert r_lider["valor"] == (1, False)
+    assert r_antes["valor"] == (1, True)
+
+
+@pytest.fixture
+def sesiones(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'single_flight.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    fabrica = sessionmaker(bind=engine, autoflush=False, info={"solo_lectura": True})
+    with fabrica() as session:
+        session.add(Usuario(id=1, email="v@ejemplo.com", username="vendedor", password_hash="x", nombre="V", apellido="V"))
+        session.add_all(Producto(id=i, nombre=f"Producto {i}", precio=i, stock=10, vendedor_id=1) for i in (1, 2))
+        session.commit()
+    yield fabrica
+    engine.dispose()
+
+
+def test_quien_espera_recibe_instancias_propias(sesiones):
+    liberar = threading.Event()
+
+    @coalescer("prueba")
+    def listar(db):
+        productos = db.query(Producto).order_by(Producto.id).all()
+        liberar.wait(5)
+        return productos
+
+    coalescidas = single_flight.contadores.get("prueba", [0, 0])[1]
+    db_lider, db_espera = sesiones(), sesiones()
+    lider, r_lider = _en_hilo(lambda: listar(db_lider))
+    _esperar(lambda: single_flight.en_curso() == 1)
+    espera, r_espera = _en_hilo(lambda: listar(db_espera))
+    _esperar(lambda: single_flight.contadores["prueba"][1] == coalescidas + 1)
+    liberar.set()
+    lider.join()
+    espera.join()
+
+    propios, copiados = r_lider["valor"], r_espera["valor"]
+    assert [(p.id, p.nombre, p.precio) for p in copiados] == [(1, "Producto 1", 1), (2, "Producto 2", 2)]
+    for propio, copia in zip(propios, copiados):
+        assert copia is not propio
+        assert copia in db_espera and propio not in db_espera
+    db_lider.close()
+    db_espera.close()